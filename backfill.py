@@ -0,0 +1,163 @@
+import argparse
+import json
+import logging
+import os
+import re
+import traceback
+
+import pandas as pd
+
+from batch_writer import split_row
+from citation_graph import CitationGraph
+from judgment_db import JudgmentDatabase
+from main_2 import run_programs
+from pipeline_logging import setup_logging
+from profiles import PROFILES, apply_profile
+from program_registry import is_program_column, load_programs
+from search_index import INDEXED_PROGRAMS, SearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Programs whose columns feed the citation graph
+GRAPH_PROGRAMS = {2, 7, 9}
+
+
+def find_batch_files(output_dir, base_filename):
+    """Final batch workbooks ({base}_batch_N.xlsx) in batch order; temp files are skipped."""
+    pattern = re.compile(rf"{re.escape(base_filename)}_batch_(\d+)\.xlsx$")
+    batches = []
+    for file in os.listdir(output_dir):
+        match = pattern.match(file)
+        if match:
+            batches.append((int(match.group(1)), os.path.join(output_dir, file)))
+    return [path for _, path in sorted(batches)]
+
+
+def load_progress(results_log):
+    """Results already computed by an interrupted backfill, keyed by File Name."""
+    results = {}
+    if os.path.exists(results_log):
+        with open(results_log, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # partial last line of a killed run
+                results[result["File Name"]] = result
+    return results
+
+
+def patch_workbook(path, results, program_numbers):
+    """Replace the selected programs' columns of one batch workbook, joining on File Name."""
+    df = pd.read_excel(path)
+    results = {name: split_row(result) for name, result in results.items()}
+    old_columns = [c for c in df.columns if any(is_program_column(c, n) for n in program_numbers)]
+    new_columns = []
+    for result in results.values():
+        for column in result:
+            if column != "File Name" and column not in new_columns:
+                new_columns.append(column)
+
+    patched = df["File Name"].isin(list(results))
+    for column in new_columns:
+        values = df["File Name"].map(lambda name: results.get(name, {}).get(column))
+        if column in df.columns:
+            df[column] = df[column].astype(object).where(~patched, values)
+        else:
+            df[column] = values.where(patched, None)
+    # Columns of the old run the new one no longer produces (e.g. stale errors)
+    stale = [c for c in old_columns if c not in new_columns]
+    df.loc[patched, stale] = None
+    df = df.drop(columns=[c for c in stale if df[c].isna().all()])
+
+    tmp_path = f"{os.path.splitext(path)[0]}_backfill_temp.xlsx"
+    df.to_excel(tmp_path, index=False, engine='openpyxl')
+    os.replace(tmp_path, path)
+    return int(patched.sum())
+
+
+def backfill_columns(input_folder, output_base_file, program_numbers, profile=None):
+    """Re-run only the selected programs over the files already in the batch outputs and
+    rewrite their columns in place. Progress is kept in its own files next to the
+    outputs, so an interrupted backfill resumes where it stopped."""
+    try:
+        apply_profile(profile, program_numbers)
+        programs = load_programs(program_numbers)
+        program_numbers = [number for number, _, _ in programs]
+        output_dir = os.path.dirname(output_base_file)
+        base_filename = os.path.splitext(os.path.basename(output_base_file))[0]
+        batch_files = find_batch_files(output_dir, base_filename)
+        if not batch_files:
+            logger.error(f"No batch outputs found for {base_filename} in {output_dir}")
+            print(f"No batch outputs found for {base_filename} in {output_dir}")
+            return
+
+        tag = "_".join(str(n) for n in program_numbers)
+        results_log = os.path.join(output_dir, f"backfill_{tag}_results.jsonl")
+        batches_log = os.path.join(output_dir, f"backfill_{tag}_batches.txt")
+        results = load_progress(results_log)
+        done_batches = set()
+        if os.path.exists(batches_log):
+            with open(batches_log, 'r') as f:
+                done_batches = set(f.read().splitlines())
+
+        citation_graph = CitationGraph(os.path.join(output_dir, 'citation_graph.sqlite')) if GRAPH_PROGRAMS & set(program_numbers) else None
+        search_index = SearchIndex(os.path.join(output_dir, 'search_index.sqlite')) if INDEXED_PROGRAMS & set(program_numbers) else None
+        judgment_db = JudgmentDatabase(os.path.join(output_dir, 'judgments.sqlite'))
+
+        for batch_file in batch_files:
+            if os.path.basename(batch_file) in done_batches:
+                continue
+            file_names = pd.read_excel(batch_file, usecols=["File Name"])["File Name"].dropna().tolist()
+            logger.info(f"Backfilling programs {program_numbers} for {len(file_names)} files in {batch_file}")
+            print(f"Backfilling {os.path.basename(batch_file)} ({len(file_names)} files)")
+
+            batch_results = {}
+            for pdf_file in file_names:
+                if pdf_file not in results:
+                    pdf_path = os.path.join(input_folder, pdf_file)
+                    if not os.path.exists(pdf_path):
+                        logger.warning(f"Skipping {pdf_file}: not found in {input_folder}")
+                        continue
+                    results[pdf_file] = run_programs(pdf_path, pdf_file, programs)
+                    with open(results_log, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(results[pdf_file], default=str) + '\n')
+                batch_results[pdf_file] = results[pdf_file]
+
+            patched = patch_workbook(batch_file, batch_results, program_numbers)
+            patched_rows = [row for row in pd.read_excel(batch_file).to_dict('records') if row["File Name"] in batch_results]
+            for row in patched_rows:
+                if citation_graph:
+                    citation_graph.add_judgment(
+                        row["File Name"],
+                        [row.get("Citation (Program 2)"), row.get("Citation (Program 7)")],
+                        row.get("Precedent Citations (Program 9)")
+                    )
+                if search_index:
+                    search_index.add_row(row)
+            judgment_db.add_rows(patched_rows)
+            with open(batches_log, 'a') as f:
+                f.write(os.path.basename(batch_file) + '\n')
+            logger.info(f"Patched {patched} rows in {batch_file}")
+            print(f"Patched {patched} rows in {os.path.basename(batch_file)}")
+
+        if citation_graph:
+            citation_graph.close()
+        if search_index:
+            search_index.close()
+        judgment_db.close()
+        print(f"Backfill of programs {program_numbers} complete")
+    except Exception as e:
+        logger.error(f"Error in backfill: {str(e)}\n{traceback.format_exc()}")
+        print(f"Error in backfill: {str(e)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run selected programs and patch their columns in existing batch outputs")
+    parser.add_argument("--input", required=True, help="folder with the source PDFs")
+    parser.add_argument("--output", required=True, help="base output file used by main_2 (e.g. output/combined_legal_details.xlsx)")
+    parser.add_argument("--programs", required=True, type=int, nargs="+", help="program numbers to re-run, e.g. 11 or 9 11")
+    parser.add_argument("--profile", choices=list(PROFILES), help="speed/accuracy profile (default: $PIPELINE_PROFILE or balanced)")
+    args = parser.parse_args()
+    setup_logging()
+    backfill_columns(args.input, args.output, args.programs, args.profile)
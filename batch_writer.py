@@ -0,0 +1,155 @@
+import argparse
+import json
+import logging
+import math
+import os
+import re
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Longest string Excel accepts in one cell
+EXCEL_CELL_LIMIT = 32767
+
+# Long-text columns and how many overflow columns each always gets, so their
+# layout is the same in every batch. Any other column that overflows gets as
+# many `_1`, `_2`, ... columns as its longest value needs.
+OVERFLOW_SCHEMA: Dict[str, int] = {
+    "Headnotes (Program 1)": 1,
+    "List of Acts (Program 6)": 0,
+    "Precedent Citations (Program 9)": 0,
+    "Conclusion (Program 12)": 0,
+}
+
+_PROGRAM_SUFFIX = re.compile(r"^(.*?)(\s\(Program \d+.*\))$")
+
+
+# "Headnotes (Program 1)", 2 -> "Headnotes_2 (Program 1)"
+def overflow_column(column: str, part: int) -> str:
+    match = _PROGRAM_SUFFIX.match(column)
+    if match:
+        return f"{match.group(1)}_{part}{match.group(2)}"
+    return f"{column}_{part}"
+
+
+# Cut a cell value into Excel-sized pieces; the first piece stays in the column itself
+def split_cell(value, limit: int = EXCEL_CELL_LIMIT) -> List:
+    if not isinstance(value, str) or len(value) <= limit:
+        return [value]
+    return [value[i:i + limit] for i in range(0, len(value), limit)]
+
+
+# Spread over-long cells of one row over their overflow columns
+def split_row(row: dict, limit: int = EXCEL_CELL_LIMIT) -> dict:
+    split = {}
+    for column, value in row.items():
+        parts = split_cell(value, limit)
+        split[column] = parts[0]
+        for i, part in enumerate(parts[1:], 1):
+            split[overflow_column(column, i)] = part
+    return split
+
+
+def _read_spool(spool_path: str) -> Iterator[dict]:
+    with open(spool_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial last line of a killed run
+
+
+# Output columns in first-seen order, each followed by its overflow columns
+def plan_columns(rows, limit: int = EXCEL_CELL_LIMIT) -> List[str]:
+    order: List[str] = []
+    parts: Dict[str, int] = {}
+    for row in rows:
+        for column, value in row.items():
+            if column not in parts:
+                order.append(column)
+                parts[column] = OVERFLOW_SCHEMA.get(column, 0)
+            if isinstance(value, str) and len(value) > limit:
+                parts[column] = max(parts[column], math.ceil(len(value) / limit) - 1)
+    columns = []
+    for column in order:
+        columns.append(column)
+        columns.extend(overflow_column(column, i) for i in range(1, parts[column] + 1))
+    return columns
+
+
+def write_workbook(rows_factory, output_path: str, limit: int = EXCEL_CELL_LIMIT) -> int:
+    """Write rows to an xlsx file in xlsxwriter's constant_memory mode. `rows_factory`
+    returns a fresh iterator of row dicts; it is read twice (columns, then cells),
+    so only one row is in memory at a time. Returns the number of rows written."""
+    import xlsxwriter
+
+    columns = plan_columns(rows_factory(), limit)
+    tmp_path = f"{os.path.splitext(output_path)[0]}_writing.xlsx"
+    workbook = xlsxwriter.Workbook(tmp_path, {
+        'constant_memory': True,
+        'strings_to_numbers': False,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+    try:
+        worksheet = workbook.add_worksheet()
+        header = workbook.add_format({'bold': True, 'border': 1})
+        for col, column in enumerate(columns):
+            worksheet.write_string(0, col, column, header)
+        index = {column: col for col, column in enumerate(columns)}
+        count = 0
+        for count, row in enumerate(rows_factory(), 1):
+            cells = split_row(row, limit)
+            # constant_memory flushes a row once the next begins, so cells go left to right
+            for col, value in sorted((index[c], v) for c, v in cells.items()):
+                if value is None or (isinstance(value, float) and math.isnan(value)):
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    worksheet.write_string(count, col, str(value))
+                else:
+                    worksheet.write_number(count, col, value)
+    finally:
+        workbook.close()
+    os.replace(tmp_path, output_path)
+    return count
+
+
+class BatchWriter:
+    """Collects the results of one batch. Each row is appended to a JSON lines spool
+    next to the output as soon as it arrives (the intermediate save), and close()
+    streams the spool into the final workbook, overflowing long cells instead of
+    failing. Memory use does not grow with the batch."""
+
+    def __init__(self, output_path: str, spool_path: Optional[str] = None):
+        self.output_path = output_path
+        self.spool_path = spool_path or f"{os.path.splitext(output_path)[0]}_temp.jsonl"
+        self.rows = 0
+        self._spool = open(self.spool_path, 'a', encoding='utf-8')
+
+    def write_row(self, row: dict):
+        self._spool.write(json.dumps(row, default=str) + '\n')
+        self._spool.flush()
+        self.rows += 1
+
+    def read_rows(self) -> Iterator[dict]:
+        """The rows written so far, read back from the spool one at a time."""
+        self._spool.flush()
+        return _read_spool(self.spool_path)
+
+    def close(self) -> int:
+        """Write the workbook and remove the spool; the spool is kept if writing fails."""
+        if not self._spool.closed:
+            self._spool.close()
+        count = write_workbook(lambda: _read_spool(self.spool_path), self.output_path)
+        os.remove(self.spool_path)
+        logger.info(f"Wrote {count} rows to {self.output_path}")
+        return count
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Write the workbook of an interrupted batch from its _temp.jsonl spool")
+    parser.add_argument("spool", help="spool file, e.g. output/combined_legal_details_batch_3_temp.jsonl")
+    parser.add_argument("output", help="workbook to write")
+    args = parser.parse_args()
+    print(f"Wrote {write_workbook(lambda: _read_spool(args.spool), args.output)} rows to {args.output}")
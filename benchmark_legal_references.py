@@ -0,0 +1,88 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+from program_4 import ACT_MATCHER, RULE_MATCHER, extract_text_from_pdf
+
+# Patterns used by program_4 before StatuteMatcher; kept as the reference for output comparison
+LEGACY_PATTERNS = {
+    "act": r'(?:(?:A of\s+|like those contained in\s+|of\s+|s\s+)?)([A-Z][a-zA-Z\s]*(?:\s*\([A-Za-z\s,]+\))*\s*(?:[Aa][Cc][Tt]|[Aa][Cc][Tt][Ss])(?:,\s+\d{4}|\s+\d{4}|,\s*\d{4}(?:\s*\([A-Za-z\s]+\))?))',
+    "rule": r'(?:(?:A of\s+|like those contained in\s+|of\s+|s\s+)?)([A-Z][a-zA-Z\s]*(?:\s*\([A-Za-z\s,]+\))*\s*(?:[Rr][Uu][Ll][Ee]|[Rr][Uu][Ll][Ee][Ss])(?:,\s+\d{4}|\s+\d{4}|,\s*\d{4}(?:\s*\([A-Za-z\s]+\))?))'
+}
+MATCHERS = {"act": ACT_MATCHER, "rule": RULE_MATCHER}
+
+# Inputs that make the legacy patterns backtrack: long word runs that never reach "Act, YYYY"
+PATHOLOGICAL_INPUTS = {
+    "words without keyword": lambda n: "the appellant submitted that " * n,
+    "keyword without year": lambda n: "the Contract Act and the facts " * n,
+    "parenthesised qualifiers": lambda n: "Indian (Central, State) (Amendment) " * n,
+    "single unbroken run": lambda n: "a" * (30 * n)
+}
+SIZES = [125, 250, 500, 1000, 2000, 4000, 8000]
+LEGACY_MAX_SIZE = 250  # the legacy patterns take seconds per call beyond this
+REPEATS = 3
+MAX_GROWTH = 3.0  # doubling the input may at most triple the time
+
+
+def time_call(func, text, repeats=1):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# Time both implementations on growing pathological inputs; returns False if the new one is not linear
+def run_benchmarks() -> bool:
+    linear = True
+    for name, build in PATHOLOGICAL_INPUTS.items():
+        print(f"\n{name}")
+        previous = None
+        for size in SIZES:
+            text = build(size)
+            new_time = sum(time_call(matcher.findall, text, REPEATS) for matcher in MATCHERS.values())
+            legacy = ""
+            if size <= LEGACY_MAX_SIZE:
+                legacy_time = sum(time_call(lambda t: re.findall(p, t, re.IGNORECASE), text) for p in LEGACY_PATTERNS.values())
+                legacy = f"  legacy {legacy_time * 1000:9.2f} ms"
+            growth = f"  x{new_time / previous:.2f}" if previous else ""
+            print(f"  {len(text):>8} chars  matcher {new_time * 1000:7.2f} ms{growth}{legacy}")
+            if previous and new_time > 0.005 and new_time / previous > MAX_GROWTH:
+                linear = False
+            previous = new_time
+    return linear
+
+
+# Compare matcher output with the legacy patterns on PDFs or text files in a folder
+def compare_corpus(folder: str) -> bool:
+    mismatches = 0
+    files = [f for f in sorted(os.listdir(folder)) if f.lower().endswith((".pdf", ".txt"))]
+    for file_name in files:
+        path = os.path.join(folder, file_name)
+        if file_name.lower().endswith(".pdf"):
+            text = extract_text_from_pdf(path)
+        else:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        text = re.sub(r'\n\s*', ' ', text)
+        for kind, pattern in LEGACY_PATTERNS.items():
+            if re.findall(pattern, text, re.IGNORECASE) != MATCHERS[kind].findall(text):
+                mismatches += 1
+                print(f"Mismatch ({kind}) in {file_name}")
+    print(f"\nCompared {len(files)} files, {mismatches} mismatches")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the program 4 act/rule matcher")
+    parser.add_argument("--corpus", help="folder of PDFs or .txt files to compare against the legacy patterns")
+    args = parser.parse_args()
+
+    ok = run_benchmarks()
+    if args.corpus:
+        ok = compare_corpus(args.corpus) and ok
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,200 @@
+import argparse
+import logging
+import sqlite3
+from typing import Iterable, List, Optional, Tuple
+
+from citation_parser import format_citation, group_parallel_citations, parse_citations
+
+logger = logging.getLogger(__name__)
+
+# Nodes are judgments keyed by normalised citation; a judgment reported in several
+# reporters ("[2024] 1 S.C.R. 123 : 2024 INSC 12") has one node and one alias per citation.
+# Edges run from the citing judgment to the cited one.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    label TEXT NOT NULL,
+    year INTEGER,
+    file_name TEXT
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    citation TEXT PRIMARY KEY,
+    node_id INTEGER NOT NULL REFERENCES nodes(id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS edges (
+    src INTEGER NOT NULL REFERENCES nodes(id),
+    dst INTEGER NOT NULL REFERENCES nodes(id),
+    PRIMARY KEY (src, dst)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_by_dst ON edges (dst, src);
+CREATE INDEX IF NOT EXISTS nodes_by_file ON nodes (file_name);
+"""
+
+
+class CitationGraph:
+    """Incremental citation graph over the processed corpus, stored as SQLite adjacency tables."""
+
+    def __init__(self, db_path: str):
+        # The pipeline writes from its output stage thread; only one thread uses the graph at a time
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _node_for(self, citations: List[str], year: Optional[int], file_name: Optional[str] = None,
+                  survivor: Optional[int] = None) -> int:
+        """Return the node of any of the citations, creating it (and its aliases) if needed.
+        Nodes created earlier for parallel citations of the same judgment are merged into one,
+        `survivor` when it is among them, so a node the caller holds is never deleted."""
+        node_ids = []
+        for citation in citations:
+            row = self.conn.execute("SELECT node_id FROM aliases WHERE citation = ?", (citation,)).fetchone()
+            if row and row[0] not in node_ids:
+                node_ids.append(row[0])
+        if file_name:
+            row = self.conn.execute("SELECT id FROM nodes WHERE file_name = ?", (file_name,)).fetchone()
+            if row and row[0] not in node_ids:
+                node_ids.append(row[0])
+        if survivor in node_ids:
+            node_ids.remove(survivor)
+            node_ids.insert(0, survivor)
+        node_id = node_ids[0] if node_ids else None
+        for duplicate in node_ids[1:]:
+            self._merge(duplicate, node_id)
+        if node_id is None:
+            node_id = self.conn.execute(
+                "INSERT INTO nodes (label, year) VALUES (?, ?)", (citations[0] if citations else file_name, year)
+            ).lastrowid
+        if file_name:
+            self.conn.execute("UPDATE nodes SET file_name = ? WHERE id = ?", (file_name, node_id))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO aliases (citation, node_id) VALUES (?, ?)", [(c, node_id) for c in citations]
+        )
+        return node_id
+
+    def _merge(self, old_id: int, new_id: int):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO edges (src, dst) SELECT ?, dst FROM edges WHERE src = ? AND dst != ?",
+            (new_id, old_id, new_id)
+        )
+        self.conn.execute(
+            "INSERT OR IGNORE INTO edges (src, dst) SELECT src, ? FROM edges WHERE dst = ? AND src != ?",
+            (new_id, old_id, new_id)
+        )
+        self.conn.execute("DELETE FROM edges WHERE src = ? OR dst = ?", (old_id, old_id))
+        self.conn.execute("UPDATE aliases SET node_id = ? WHERE node_id = ?", (new_id, old_id))
+        self.conn.execute("DELETE FROM nodes WHERE id = ?", (old_id,))
+
+    def add_judgment(self, file_name: str, own_citations: Iterable[str], cited_text: str) -> int:
+        """Record one processed judgment and the reporter citations found in its precedent text.
+        Re-adding a file replaces its outgoing edges; nothing else is rebuilt."""
+        own = list(dict.fromkeys(
+            format_citation(c) for text in own_citations if isinstance(text, str) for c in parse_citations(text)
+        ))
+        years = [c.year for text in own_citations if isinstance(text, str) for c in parse_citations(text)]
+        with self.conn:
+            src = self._node_for(own, years[0] if years else None, file_name)
+            self.conn.execute("DELETE FROM edges WHERE src = ?", (src,))
+            # Parallel citations of one cited judgment ("(2010) 5 SCC 1 : AIR 2010 SC 100") share a node
+            cited = group_parallel_citations(cited_text) if isinstance(cited_text, str) else ()
+            for group in cited:
+                dst = self._node_for(list(dict.fromkeys(format_citation(c) for c in group)), group[0].year, survivor=src)
+                if dst != src:
+                    self.conn.execute("INSERT OR IGNORE INTO edges (src, dst) VALUES (?, ?)", (src, dst))
+        logger.info(f"Citation graph: {file_name} cites {len(cited)} reported judgments")
+        return src
+
+    def _lookup(self, citation: str) -> Optional[int]:
+        parsed = parse_citations(citation)
+        key = format_citation(parsed[0]) if parsed else citation
+        row = self.conn.execute("SELECT node_id FROM aliases WHERE citation = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def in_degree(self, citation: str) -> int:
+        node_id = self._lookup(citation)
+        if node_id is None:
+            return 0
+        return self.conn.execute("SELECT COUNT(*) FROM edges WHERE dst = ?", (node_id,)).fetchone()[0]
+
+    def out_degree(self, citation: str) -> int:
+        node_id = self._lookup(citation)
+        if node_id is None:
+            return 0
+        return self.conn.execute("SELECT COUNT(*) FROM edges WHERE src = ?", (node_id,)).fetchone()[0]
+
+    def cited_by(self, citation: str, year: Optional[int] = None) -> List[Tuple[str, Optional[str]]]:
+        """(label, file name) of the judgments citing `citation`, optionally only those of one year."""
+        node_id = self._lookup(citation)
+        if node_id is None:
+            return []
+        query = "SELECT n.label, n.file_name FROM edges e JOIN nodes n ON n.id = e.src WHERE e.dst = ?"
+        params = [node_id]
+        if year is not None:
+            query += " AND n.year = ?"
+            params.append(year)
+        return self.conn.execute(query + " ORDER BY n.label", params).fetchall()
+
+    def cites(self, citation: str) -> List[Tuple[str, Optional[str]]]:
+        """(label, file name) of the judgments `citation` cites."""
+        node_id = self._lookup(citation)
+        if node_id is None:
+            return []
+        return self.conn.execute(
+            "SELECT n.label, n.file_name FROM edges e JOIN nodes n ON n.id = e.dst WHERE e.src = ? ORDER BY n.label",
+            (node_id,)
+        ).fetchall()
+
+    def most_cited(self, limit: int = 20) -> List[Tuple[str, int]]:
+        return self.conn.execute(
+            "SELECT n.label, COUNT(*) AS cnt FROM edges e JOIN nodes n ON n.id = e.dst "
+            "GROUP BY e.dst ORDER BY cnt DESC, n.label LIMIT ?",
+            (limit,)
+        ).fetchall()
+
+    def add_workbook(self, xlsx_path: str) -> int:
+        """Load an existing batch workbook (File Name, citation and precedent columns)."""
+        import pandas as pd
+
+        df = pd.read_excel(xlsx_path)
+        for _, row in df.iterrows():
+            self.add_judgment(
+                row["File Name"],
+                [row.get("Citation (Program 2)"), row.get("Citation (Program 7)")],
+                row.get("Precedent Citations (Program 9)")
+            )
+        return len(df)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Query the corpus citation graph")
+    parser.add_argument("db", help="citation graph database (citation_graph.sqlite in the output folder)")
+    parser.add_argument("--import-xlsx", nargs="+", default=[], help="add existing batch workbooks to the graph")
+    parser.add_argument("--cited-by", help="judgments citing this citation")
+    parser.add_argument("--year", type=int, help="only citing judgments of this year (with --cited-by)")
+    parser.add_argument("--cites", help="judgments cited by this citation")
+    parser.add_argument("--degree", help="in- and out-degree of this citation")
+    parser.add_argument("--top", type=int, help="most cited judgments")
+    args = parser.parse_args()
+
+    with CitationGraph(args.db) as graph:
+        for path in args.import_xlsx:
+            print(f"Imported {graph.add_workbook(path)} rows from {path}")
+        if args.cited_by:
+            for label, file_name in graph.cited_by(args.cited_by, args.year):
+                print(f"{label}\t{file_name or ''}")
+        if args.cites:
+            for label, file_name in graph.cites(args.cites):
+                print(f"{label}\t{file_name or ''}")
+        if args.degree:
+            print(f"in: {graph.in_degree(args.degree)}  out: {graph.out_degree(args.degree)}")
+        if args.top:
+            for label, count in graph.most_cited(args.top):
+                print(f"{count}\t{label}")
@@ -0,0 +1,103 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+# One grammar for the law reports cited in Supreme Court judgments, matched in a single pass:
+#   [2024] 1 S.C.R. 123    (2019) 11 SCC 1    AIR 1950 SC 27    2024 INSC 12
+_CITATION_PATTERN = re.compile(
+    r"\[\s*(?P<scr_year>\d{4})\s*\]\s*(?P<scr_volume>\d{1,2})\s*S\.?\s?C\.?\s?R\.?\s*(?P<scr_page>\d{1,5})\b"
+    r"|\(\s*(?P<scc_year>\d{4})\s*\)\s*(?P<scc_volume>\d{1,2})\s*S\.?\s?C\.?\s?C\.?\s*(?P<scc_page>\d{1,5})\b"
+    r"|\bA\.?I\.?R\.?\s*(?P<air_year>\d{4})\s*S\.?\s?C\.?\s*(?P<air_page>\d{1,5})\b"
+    r"|\b(?P<insc_year>\d{4})\s*INSC\s*(?P<insc_page>\d{1,5})\b",
+    re.IGNORECASE
+)
+
+# "[2024] 1 S.C.R." with the page number printed at the start of the header line instead
+_PAGELESS_SCR_PATTERN = re.compile(r"^(?P<page>\d{1,5})?\D*?\[\s*(?P<year>\d{4})\s*\]\s*(?P<volume>\d{1,2})\s*S\.?\s?C\.?\s?R\.?\s*$", re.IGNORECASE)
+
+REPORTERS = {"scr": "SCR", "scc": "SCC", "air": "AIR", "insc": "INSC"}
+
+# OCR confusions inside numbers (O for 0, I/l for 1, T for 7)
+_OCR_DIGITS = str.maketrans("OoIlT", "00117")
+_OCR_NUMBER = re.compile(r"\b[\dOoIlT]*\d[\dOoIlT]*\b")
+
+
+class ReporterCitation(NamedTuple):
+    reporter: str
+    year: int
+    volume: Optional[int]
+    page: int
+    start: int
+    end: int
+
+    def __str__(self) -> str:
+        return format_citation(self)
+
+
+# Render a citation in its reporter's standard form
+def format_citation(citation: ReporterCitation) -> str:
+    if citation.reporter == "SCR":
+        return f"[{citation.year}] {citation.volume} S.C.R. {citation.page}"
+    if citation.reporter == "SCC":
+        return f"({citation.year}) {citation.volume} SCC {citation.page}"
+    if citation.reporter == "AIR":
+        return f"AIR {citation.year} SC {citation.page}"
+    return f"{citation.year} INSC {citation.page}"
+
+
+# Repair digits misread by OCR, leaving words such as INSC untouched
+def repair_ocr_digits(text: str) -> str:
+    return _OCR_NUMBER.sub(lambda m: m.group(0).translate(_OCR_DIGITS), text)
+
+
+# All reporter citations in the text, in order of appearance
+@lru_cache(maxsize=32)
+def parse_citations(text: str) -> Tuple[ReporterCitation, ...]:
+    citations = []
+    for match in _CITATION_PATTERN.finditer(text):
+        prefix = next(p for p in REPORTERS if match.group(f"{p}_year"))
+        volume = match.group(f"{prefix}_volume") if prefix in ("scr", "scc") else None
+        citations.append(ReporterCitation(
+            reporter=REPORTERS[prefix],
+            year=int(match.group(f"{prefix}_year")),
+            volume=int(volume) if volume else None,
+            page=int(match.group(f"{prefix}_page")),
+            start=match.start(),
+            end=match.end()
+        ))
+    return tuple(citations)
+
+
+# Text between two reports of the same judgment: "(2010) 5 SCC 1 : AIR 2010 SC 100"
+_PARALLEL_SEPARATOR = re.compile(r"\s*[:=]\s*")
+
+
+# Citations of the text grouped by judgment: parallel citations joined by ":" or "="
+# form one group, in order of appearance
+def group_parallel_citations(text: str) -> Tuple[Tuple[ReporterCitation, ...], ...]:
+    groups = []
+    for citation in parse_citations(text):
+        if groups and _PARALLEL_SEPARATOR.fullmatch(text, groups[-1][-1].end, citation.start):
+            groups[-1].append(citation)
+        else:
+            groups.append([citation])
+    return tuple(tuple(group) for group in groups)
+
+
+# Citation from a first-page header line, allowing for OCR noise and for the
+# SCR page number printed ahead of "[YYYY] V S.C.R."
+def parse_header_citation(line: str) -> Optional[ReporterCitation]:
+    repaired = repair_ocr_digits(line)
+    citations = parse_citations(repaired)
+    if citations:
+        return citations[0]
+    pageless = _PAGELESS_SCR_PATTERN.match(repaired.strip())
+    if pageless and pageless.group("page"):
+        return ReporterCitation("SCR", int(pageless.group("year")), int(pageless.group("volume")),
+                                int(pageless.group("page")), 0, len(line))
+    return None
+
+
+# Distinct citations in standard form, joined for a spreadsheet cell
+def join_citations(citations: Tuple[ReporterCitation, ...], separator: str = "; ") -> str:
+    return separator.join(dict.fromkeys(format_citation(c) for c in citations))
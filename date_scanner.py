@@ -0,0 +1,76 @@
+import re
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+# Month names and abbreviations, keyed by their first three letters
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+_MONTH = r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+_ORDINAL = r"(?:st|nd|rd|th)?"
+
+# One alternation covering every date form we recognise, so a document is tokenised in a single pass
+_DATE_PATTERN = re.compile(
+    r"\b(?:"
+    rf"(?P<dmy_day>\d{{1,2}}){_ORDINAL}(?:\s+day\s+of)?\s+(?P<dmy_month>{_MONTH})\.?,?\s+(?P<dmy_year>\d{{4}})"
+    rf"|(?P<mdy_month>{_MONTH})\.?\s+(?P<mdy_day>\d{{1,2}}){_ORDINAL},?\s+(?P<mdy_year>\d{{4}})"
+    rf"|(?P<my_month>{_MONTH})\.?,?\s+(?P<my_year>\d{{4}})"
+    r"|(?P<num_day>\d{1,2})[-/](?P<num_month>\d{1,2})[-/](?P<num_year>\d{4})"
+    r")\b",
+    re.IGNORECASE
+)
+
+# Date forms in the order program 1 prefers them for the judgment date
+FORM_PRIORITY = ("day_month_year", "month_day_year", "month_year", "numeric")
+
+_FORM_PREFIXES = {
+    "dmy": "day_month_year",
+    "mdy": "month_day_year",
+    "my": "month_year",
+    "num": "numeric"
+}
+
+
+class DateToken(NamedTuple):
+    text: str
+    start: int
+    end: int
+    date: date
+    form: str
+
+
+# Build a date from its raw parts; None for impossible dates such as 31 February
+@lru_cache(maxsize=4096)
+def parse_date(day: str, month: str, year: str) -> Optional[date]:
+    month_number = int(month) if month.isdigit() else MONTHS.get(month[:3].lower())
+    if not month_number:
+        return None
+    try:
+        return date(int(year), month_number, int(day))
+    except ValueError:
+        return None
+
+
+# Tokenise all candidate dates in the text with their offsets
+@lru_cache(maxsize=32)
+def scan_dates(text: str) -> Tuple[DateToken, ...]:
+    tokens = []
+    for match in _DATE_PATTERN.finditer(text):
+        prefix = next(p for p in _FORM_PREFIXES if match.group(f"{p}_year"))
+        day = match.group(f"{prefix}_day") if prefix != "my" else "1"
+        parsed = parse_date(day, match.group(f"{prefix}_month"), match.group(f"{prefix}_year"))
+        if parsed:
+            tokens.append(DateToken(match.group(0), match.start(), match.end(), parsed, _FORM_PREFIXES[prefix]))
+    return tuple(tokens)
+
+
+# Return the earliest token of the most preferred form present
+def first_date(tokens: Sequence[DateToken], forms: Sequence[str] = FORM_PRIORITY) -> Optional[DateToken]:
+    for form in forms:
+        for token in tokens:
+            if token.form == form:
+                return token
+    return None
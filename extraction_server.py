@@ -0,0 +1,187 @@
+import argparse
+import json
+import logging
+import os
+import socketserver
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from main_2 import configure_run, parse_program_list, run_programs
+from nlp_models import NLP_PROGRAMS, get_nlp
+from pipeline_logging import setup_logging
+from profiles import PROFILES
+from program_registry import load_programs, select_programs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+
+# Programs are not thread-safe (shared spaCy pipelines, module-level caches), so
+# requests are served one extraction at a time
+_extract_lock = threading.Lock()
+
+
+class ExtractionHandler(BaseHTTPRequestHandler):
+    """POST /extract with a JSON body {"path": ..., "programs": [...]} or with the raw
+    PDF bytes (Content-Type: application/pdf, ?name=...&programs=1,2); GET /health."""
+
+    server_version = "ExtractionServer/1.0"
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send_json(200, {"status": "ok", "programs": self.server.programs, "uptime_s": round(time.time() - self.server.started, 1)})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/extract":
+            self._send_json(404, {"error": "Not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_UPLOAD_BYTES:
+            self._send_json(413, {"error": "Request too large"})
+            return
+        body = self.rfile.read(length)
+        query = parse_qs(url.query)
+        try:
+            if self.headers.get("Content-Type", "").startswith("application/pdf"):
+                programs = parse_program_list(query["programs"][0]) if "programs" in query else None
+                name = os.path.basename(query.get("name", ["upload.pdf"])[0])
+                result = self._extract_bytes(body, name, programs)
+            else:
+                request = json.loads(body or b"{}")
+                if "path" not in request:
+                    self._send_json(400, {"error": "Expected a JSON body with \"path\" or an application/pdf body"})
+                    return
+                if not os.path.isfile(request["path"]):
+                    self._send_json(404, {"error": f"No such file: {request['path']}"})
+                    return
+                programs = request.get("programs")
+                if isinstance(programs, str):
+                    programs = parse_program_list(programs)
+                result = self._extract_path(request["path"], os.path.basename(request["path"]), programs)
+        except (ValueError, TypeError, argparse.ArgumentTypeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            logger.error(f"Extraction request failed: {e}")
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, result)
+
+    def _extract_path(self, pdf_path, name, program_numbers):
+        programs = self.server.get_programs(program_numbers)
+        start = time.perf_counter()
+        with _extract_lock:
+            result = run_programs(pdf_path, name, programs)
+        logger.info(f"Extracted {name} in {time.perf_counter() - start:.2f}s")
+        return result
+
+    def _extract_bytes(self, data, name, program_numbers):
+        fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return self._extract_path(tmp_path, name, program_numbers)
+        finally:
+            os.remove(tmp_path)
+
+
+class _ServerMixin:
+    def setup_programs(self, program_numbers):
+        # Import the programs and load the spaCy model before the first request;
+        # the programs themselves only load it on first use
+        self.programs = select_programs(program_numbers)
+        self.started = time.time()
+        load_programs(self.programs)
+        if NLP_PROGRAMS & set(self.programs):
+            get_nlp()
+
+    def get_programs(self, program_numbers):
+        requested = select_programs(program_numbers) if program_numbers else self.programs
+        not_loaded = [n for n in requested if n not in self.programs]
+        if not_loaded:
+            raise ValueError(f"Program(s) {not_loaded} are not loaded by this server (loaded: {self.programs})")
+        return load_programs(requested)
+
+
+class ExtractionHTTPServer(_ServerMixin, HTTPServer):
+    pass
+
+
+class ExtractionUnixServer(_ServerMixin, socketserver.UnixStreamServer):
+    pass
+
+
+def serve(port=DEFAULT_PORT, socket_path=None, program_numbers=None, skip_ocr=False, text_store=None, profile=None):
+    """Load the selected programs once and serve extraction requests until interrupted.
+    Listens on 127.0.0.1:port, or on a Unix socket when socket_path is given."""
+    configure_run(program_numbers, skip_ocr, text_store, profile=profile)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = ExtractionUnixServer(socket_path, ExtractionHandler)
+        where = socket_path
+    else:
+        server = ExtractionHTTPServer(("127.0.0.1", port), ExtractionHandler)
+        where = f"http://127.0.0.1:{port}"
+    server.setup_programs(program_numbers)
+    logger.info(f"Extraction server ready on {where} with programs {server.programs}")
+    print(f"Extraction server ready on {where} with programs {server.programs}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+# Client helper: extract one PDF through a running server on localhost
+def request_extraction(pdf_path, port=DEFAULT_PORT, programs=None, timeout=600):
+    import urllib.request
+
+    payload = {"path": os.path.abspath(pdf_path)}
+    if programs:
+        payload["programs"] = list(programs)
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/extract",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve PDF extraction over localhost HTTP or a Unix socket, keeping models loaded")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"localhost port (default {DEFAULT_PORT})")
+    parser.add_argument("--socket", help="listen on this Unix socket path instead of a TCP port")
+    parser.add_argument("--programs", type=parse_program_list, help="programs to load, e.g. 1,2,7 (default: all)")
+    parser.add_argument("--skip-ocr", action="store_true", help="do not OCR first pages without a text layer (program 7)")
+    parser.add_argument("--text-store", help="folder of the persistent page text store")
+    parser.add_argument("--profile", choices=list(PROFILES), help="speed/accuracy profile (default: $PIPELINE_PROFILE or balanced)")
+    args = parser.parse_args()
+    setup_logging()
+    serve(args.port, args.socket, args.programs, args.skip_ocr, args.text_store, args.profile)
@@ -0,0 +1,230 @@
+import os
+import re
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from page_text_store import get_page_texts, get_stored_pages, resolve_engine
+
+logger = logging.getLogger(__name__)
+
+# Pages read for the header: judges can spill onto page 3, the order footer onto page 2
+HEADER_PAGES = 3
+
+# Case type mappings
+CASE_CATEGORIES = {
+    "Civil": [
+        "Advisory Jurisdiction", "Arbitration Petition", "Civil Appeal", "Civil Miscellaneous Petition",
+        "Original Suit", "Review Petition (Civil)", "Special Leave Petition (Civil)",
+        "Suo Motu Writ Petition (Civil)", "Suo Motu Contempt Petition (Civil)",
+        "Suo Motu Transfer Petition (Civil)", "Transfer Petition (Civil)", "Transferred Case (Civil)",
+        "Writ Petition (Civil)", "Contempt Petition (Civil)", "Curative Petition (Civil)",
+        "Election Petition (Civil)"
+    ],
+    "Criminal": [
+        "Review Petition (Criminal)", "Special Leave Petition (Criminal)", "Suo Motu Writ (Criminal)",
+        "Suo Motu Contempt Petition (Criminal)", "Suo Motu Transfer Petition (Criminal)",
+        "Suo Motu Writ Petition (Criminal)", "Transfer Petition (Criminal)", "Transferred Case (Criminal)",
+        "Writ Petition (Criminal)", "Contempt Petition (Criminal)", "Criminal Appeal",
+        "Criminal Miscellaneous Petition", "Curative Petition (Criminal)", "Death Reference Case",
+        "Motion (CRL)"
+    ],
+    "Others": [
+        "Ref. U/A 317(1)", "Ref. U/S 14 RTI", "Ref. U/S 143", "Ref. U/S 17 RTI", "Special Reference Case",
+        "Tax Reference Case", "Disciplinary Jurisdiction", "Excise Reference No", "Habeas Corpus Petition",
+        "Miscellaneous Application", "All Sea"
+    ]
+}
+
+# Short form to full form mapping (case-insensitive)
+SUBCATEGORY_SHORT_FORMS = {
+    "writ petition (c)": "Writ Petition (Civil)",
+    "smw (civil)": "Suo Motu Writ Petition (Civil)",
+    "smw (crl)": "Suo Motu Writ (Criminal)",
+    "writ petition (crl)": "Writ Petition (Criminal)",
+    "slp (civil)": "Special Leave Petition (Civil)",
+    "slp (crl)": "Special Leave Petition (Criminal)",
+    "suo motu writ (civil)": "Suo Motu Writ Petition (Civil)",
+    "suo motu writ (crl)": "Suo Motu Writ (Criminal)",
+    "motion (crl)": "Motion (CRL)",
+    "ref. u/a 317(1)": "Ref. U/A 317(1)",
+    "ref. u/s 14 rti": "Ref. U/S 14 RTI",
+    "ref. u/s 143": "Ref. U/S 143",
+    "ref. u/s 17 rti": "Ref. U/S 17 RTI"
+}
+
+# Normalize subcategory to full form
+def normalize_subcategory(subcat: str) -> str:
+    subcat_lower = subcat.lower().strip()
+    for short_form, full_form in SUBCATEGORY_SHORT_FORMS.items():
+        if re.fullmatch(re.escape(short_form), subcat_lower, re.IGNORECASE):
+            return full_form
+    return subcat
+
+# Normalize subcategory and fold the reference variants into "Special Reference Case"
+def canonical_subcategory(subcat: str) -> str:
+    subcategory = normalize_subcategory(subcat.strip())
+    if subcategory in ["Special Reference", "Reference Case", "Reference"]:
+        subcategory = "Special Reference Case"
+    return subcategory
+
+ALL_SUBCATEGORIES = CASE_CATEGORIES["Civil"] + CASE_CATEGORIES["Criminal"] + CASE_CATEGORIES["Others"] + list(SUBCATEGORY_SHORT_FORMS.keys())
+_SUBCAT_ALTERNATION = '|'.join(re.escape(subcat) for subcat in ALL_SUBCATEGORIES)
+
+CITATION_PATTERN = re.compile(r'\[\d{4}\]\s+\d+\s+S\.C\.R\.\s+\d+\s*:\s*\d+\s+INSC\s+\d+', re.IGNORECASE)
+SUBCATEGORY_PATTERN = re.compile(r'\b(' + _SUBCAT_ALTERNATION + r'|special\s*reference|reference\s*case|reference)\b\s*(?:no\.?\s*[0-9/]+\s*(?:of\s*\d{4})?)?', re.IGNORECASE)
+PAREN_SUBCATEGORY_PATTERN = re.compile(r'\(\s*(' + _SUBCAT_ALTERNATION + r'|special\s*reference|reference\s*case|reference)\s*(?:no\.?\s*[0-9/]+\s*(?:of\s*\d{4})?)?\s*\)', re.IGNORECASE)
+TITLE_PATTERN = re.compile(r'([^\n]+?)\s+v(?:s|ersus)?\.?\s+([^\n\(]+)(?:\s*\((' + _SUBCAT_ALTERNATION + r')\b\s*(?:no\.?\s*[0-9/]+\s*(?:of\s*\d{4})?)?\))?', re.IGNORECASE)
+SPLIT_TITLE_SUBCAT_PATTERN = re.compile(r'(.+?)\s*\((' + _SUBCAT_ALTERNATION + r')\b\s*(?:no\.?\s*[0-9/]+\s*(?:of\s*\d{4})?)?\)', re.IGNORECASE)
+IN_RE_PATTERN = re.compile(r'(In\s+Re[\s:]+)(.+?)(?=\s*(?:etc\.|\(|$))', re.IGNORECASE)
+CASE_NUMBER_PATTERN = re.compile(r'(?:[\)\(]?\s*)?(?:Nos\.?|No\.?|Number)?\s*([A-Za-z\s]*?(?:C\.A\.|Cr\.A\.|Civil Appeal|Criminal Appeal|Writ Petition|SLP|Review Petition)?\s*\d+(?:[-–/]\d+)?\s*(?:of|\/)\s*\d{4})', re.IGNORECASE)
+BENCH_PATTERN = re.compile(r'\[([\w\s\.\*&\-\,]+(?:\s+and\s+[\w\s\.\*&\-]+)?)\s*,?\s*(?:J\.J\.|J\.|CJI)\s*\]', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class DocumentHeader:
+    """Fields parsed once from the opening pages of a judgment."""
+    first_page_text: str = ""
+    citation: str = "Not found"
+    title: Optional[str] = None
+    parties: Optional[Tuple[str, str]] = None
+    case_numbers: Tuple[str, ...] = ()
+    subcategory: Optional[str] = None
+    bench: Tuple[str, ...] = ()
+    document_type: str = "Judgment"
+    page_count: int = 0
+
+
+def _clean_title(title: str) -> str:
+    title = re.sub(r'\s+', ' ', title).strip()
+    return re.sub(r'\s*\(.*?\)$', '', title).strip()
+
+def _strip_etc(name: str) -> str:
+    return re.sub(r'\s*etc\.?$', '', name.strip(), flags=re.IGNORECASE)
+
+# Case title, parties and subcategory from the first lines of the first page
+def parse_title(lines: List[str]) -> Tuple[Optional[str], Optional[Tuple[str, str]], Optional[str]]:
+    # Single-line title
+    match = TITLE_PATTERN.search('\n'.join(lines))
+    if match:
+        filer = match.group(1).strip()
+        against = _strip_etc(match.group(2))
+        subcategory = canonical_subcategory(match.group(3)) if match.group(3) else None
+        return _clean_title(f"{filer} v. {against}"), (filer, against), subcategory
+
+    # Line-by-line approach for split titles
+    next_lines = lines[1:8]
+    for i, line in enumerate(next_lines):
+        versus_match = re.search(r'^\s*v(?:s|ersus)?\.?\s+(.+)', line.strip(), re.IGNORECASE)
+        if versus_match and i > 0:
+            first_party = next_lines[i - 1].strip()
+            second_party = _strip_etc(versus_match.group(1))
+            subcategory = None
+            subcat_match = SPLIT_TITLE_SUBCAT_PATTERN.search(second_party)
+            if subcat_match:
+                second_party = subcat_match.group(1).strip()
+                subcategory = canonical_subcategory(subcat_match.group(2))
+            if first_party and second_party:
+                return _clean_title(f"{first_party} v. {second_party}"), (first_party, second_party), subcategory
+
+    # "In Re" cases, with the subcategory on the title line or the lines after it
+    combined_lines = re.sub(r'\s+', ' ', ' '.join(line.strip() for line in next_lines if line.strip())).strip()
+    in_re_match = IN_RE_PATTERN.search(combined_lines)
+    if in_re_match:
+        title = re.sub(r'\s+', ' ', _strip_etc(f"In Re: {in_re_match.group(2).strip()}")).strip()
+        title_line_index = next((i for i, line in enumerate(lines) if IN_RE_PATTERN.search(line)), None)
+        subcategory = None
+        if title_line_index is not None:
+            subcat_match = PAREN_SUBCATEGORY_PATTERN.search(lines[title_line_index])
+            if subcat_match:
+                subcategory = canonical_subcategory(subcat_match.group(1))
+            else:
+                subcategory = find_subcategory(lines[title_line_index + 1:8])
+        return title, None, subcategory
+
+    return None, None, None
+
+# First subcategory found in the given lines, parenthesised forms first
+def find_subcategory(lines: List[str]) -> Optional[str]:
+    for line in lines:
+        subcat_match = PAREN_SUBCATEGORY_PATTERN.search(line) or SUBCATEGORY_PATTERN.search(line)
+        if subcat_match:
+            return canonical_subcategory(subcat_match.group(1))
+    return None
+
+# Case numbers on the first page, dropping ones contained in another
+def parse_case_numbers(first_page_text: str) -> Tuple[str, ...]:
+    case_nos = []
+    for cn in (m.strip() for m in CASE_NUMBER_PATTERN.findall(first_page_text)):
+        if all(cn not in existing and existing not in cn for existing in case_nos):
+            case_nos.append(cn)
+    return tuple(case_nos)
+
+# Judges named in the "[..., J.]" bench line
+def parse_bench(text: str) -> Tuple[str, ...]:
+    judge_names = []
+    match = BENCH_PATTERN.search(text)
+    if match:
+        for name in re.split(r'\s+and\s+|,', match.group(1)):
+            clean_name = name.strip()
+            # Exclude judge suffixes
+            if clean_name and clean_name.upper() not in ["J", "JJ", "CJI"] and clean_name not in judge_names:
+                judge_names.append(clean_name)
+    return tuple(judge_names)
+
+# "Order" when the Supreme Court footer is followed by ORDER, otherwise "Judgment"
+def parse_document_type(text: str) -> str:
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        if "judgment / order of the supreme court" in line.lower():
+            for j in range(1, 3):
+                if i + j < len(lines):
+                    next_line = lines[i + j].strip().lower()
+                    if next_line.startswith("order"):
+                        return "Order"
+            break
+    return "Judgment"
+
+# Parse the header fields from the text of the opening pages
+def parse_header_pages(pages_text: List[str], page_count: int) -> DocumentHeader:
+    first_page_text = pages_text[0] if pages_text else ""
+    cleaned_lines = re.sub(r'[^\x20-\x7E\n\r\t]', '', first_page_text).splitlines()[:10]
+
+    citation = "Not found"
+    citation_match = CITATION_PATTERN.search(cleaned_lines[0].strip()) if cleaned_lines else None
+    if citation_match:
+        citation = citation_match.group(0).strip()
+
+    title, parties, subcategory = parse_title(cleaned_lines)
+    header = DocumentHeader(
+        first_page_text=first_page_text,
+        citation=citation,
+        title=title,
+        parties=parties,
+        case_numbers=parse_case_numbers(first_page_text),
+        subcategory=subcategory,
+        bench=parse_bench("\n".join(pages_text[:3])),
+        document_type=parse_document_type("\n".join(pages_text[:2])),
+        page_count=page_count
+    )
+    logger.info(f"Parsed header: Citation='{header.citation}', Title='{header.title}', Subcategory='{header.subcategory}'")
+    return header
+
+@lru_cache(maxsize=64)
+def _parse_header_cached(pdf_path: str, mtime: float) -> DocumentHeader:
+    stored = get_stored_pages(pdf_path, "pdfplumber", HEADER_PAGES)
+    if stored:
+        return parse_header_pages(*stored)
+    # Another engine stands in for pdfplumber (profile); share its whole-document text
+    if resolve_engine("pdfplumber") != "pdfplumber":
+        pages_text = get_page_texts(pdf_path, "pdfplumber")
+        return parse_header_pages(pages_text[:HEADER_PAGES], len(pages_text))
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        pages_text = [page.extract_text() or "" for page in pdf.pages[:HEADER_PAGES]]
+        return parse_header_pages(pages_text, len(pdf.pages))
+
+# Parse the header of a PDF once; later calls for the same unchanged file reuse the result
+def parse_header(pdf_path: str) -> DocumentHeader:
+    return _parse_header_cached(pdf_path, os.path.getmtime(pdf_path))
@@ -0,0 +1,75 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Cold-start budget (ms of cumulative import time) per entry point. Importing a
+# module must not load spaCy, pandas, PDF or OCR libraries; those are imported
+# by the code paths that use them.
+IMPORT_BUDGET_MS = {
+    "main_2": 300,
+    "extraction_server": 300,
+    **{f"program_{n}": 300 for n in range(1, 13)},
+}
+
+# Libraries that must not be loaded by a plain import of an entry point
+HEAVY_MODULES = ("spacy", "pandas", "pdfplumber", "fitz", "PyPDF2", "pytesseract", "pdf2image", "langdetect")
+
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$")
+
+
+# Import a module in a fresh interpreter with -X importtime; returns
+# {module: cumulative µs} and the error output if the import failed
+def measure_imports(module: str) -> Tuple[Dict[str, int], Optional[str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    timings, errors = {}, []
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            timings[match.group(4)] = int(match.group(2))
+        elif not line.startswith("import time:"):
+            errors.append(line)
+    return timings, ("\n".join(errors) or f"exit code {proc.returncode}") if proc.returncode else None
+
+
+# Check one module against its budget; returns (passed, report lines)
+def check_module(module: str, budget_ms: float, runs: int = 3, top: int = 5) -> Tuple[bool, List[str]]:
+    best = None
+    for _ in range(runs):
+        timings, error = measure_imports(module)
+        if error:
+            return False, [f"{module}: import failed\n{error}"]
+        if best is None or timings.get(module, 0) < best.get(module, 0):
+            best = timings
+    total_ms = best.get(module, 0) / 1000
+    heavy = [name for name in best if name.split(".")[0] in HEAVY_MODULES]
+    passed = total_ms <= budget_ms and not heavy
+    lines = [f"{module}: {total_ms:.1f} ms (budget {budget_ms} ms) {'OK' if passed else 'OVER'}"]
+    if heavy:
+        lines.append(f"  loads heavy modules at import: {', '.join(sorted({h.split('.')[0] for h in heavy}))}")
+    slowest = sorted(((t, name) for name, t in best.items() if name != module), reverse=True)[:top]
+    lines.extend(f"  {t / 1000:8.1f} ms  {name}" for t, name in slowest)
+    return passed, lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check cold-start import time against the per-module budget")
+    parser.add_argument("modules", nargs="*", help="modules to check (default: all in IMPORT_BUDGET_MS)")
+    parser.add_argument("--runs", type=int, default=3, help="imports per module; the fastest counts")
+    parser.add_argument("--budget", type=float, help="override the budget (ms) for every checked module")
+    args = parser.parse_args()
+
+    failed = []
+    for module in args.modules or list(IMPORT_BUDGET_MS):
+        passed, lines = check_module(module, args.budget or IMPORT_BUDGET_MS.get(module, 300), args.runs)
+        print("\n".join(lines))
+        if not passed:
+            failed.append(module)
+    if failed:
+        print(f"Over budget: {', '.join(failed)}")
+        sys.exit(1)
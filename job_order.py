@@ -0,0 +1,74 @@
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Page count from the PDF's page tree (no page is parsed); None if PyMuPDF is
+# missing or the file cannot be opened
+def page_count(pdf_path: str) -> Optional[int]:
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return None
+    try:
+        with fitz.open(pdf_path) as doc:
+            return doc.page_count
+    except Exception as e:
+        logger.warning(f"Could not count pages of {pdf_path}: {e}")
+        return None
+
+
+def load_cache(cache_path: str) -> Dict[str, list]:
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable page count cache {cache_path}: {e}")
+    return {}
+
+
+def estimate_sizes(input_folder: str, pdf_files: List[str], cache_path: Optional[str] = None) -> Dict[str, float]:
+    """Estimated work per PDF, in pages. Page counts are cached by file name, size and
+    mtime in `cache_path`, so only new or changed files are opened. Files whose pages
+    cannot be counted are estimated from their size at the corpus' bytes per page."""
+    cache = load_cache(cache_path)
+    sizes, pages = {}, {}
+    changed = False
+    for pdf_file in pdf_files:
+        stat = os.stat(os.path.join(input_folder, pdf_file))
+        entry = cache.get(pdf_file)
+        if entry and entry[:2] == [stat.st_size, stat.st_mtime]:
+            count = entry[2]
+        else:
+            count = page_count(os.path.join(input_folder, pdf_file))
+            cache[pdf_file] = [stat.st_size, stat.st_mtime, count]
+            changed = True
+        sizes[pdf_file] = stat.st_size
+        if count:
+            pages[pdf_file] = count
+    if changed and cache_path:
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+
+    bytes_per_page = sum(sizes[f] for f in pages) / sum(pages.values()) if pages else None
+    return {
+        pdf_file: pages.get(pdf_file) or (sizes[pdf_file] / bytes_per_page if bytes_per_page else sizes[pdf_file])
+        for pdf_file in pdf_files
+    }
+
+
+# Longest job first: with several workers the largest judgments start early, so a
+# long one picked up last does not leave the other workers idle at the end of the batch
+def longest_first(input_folder: str, pdf_files: List[str], cache_path: Optional[str] = None) -> List[str]:
+    estimates = estimate_sizes(input_folder, pdf_files, cache_path)
+    ordered = sorted(pdf_files, key=lambda pdf_file: estimates[pdf_file], reverse=True)
+    if ordered:
+        logger.info(f"Longest-first order: largest {ordered[0]} (estimate {estimates[ordered[0]]:.0f}), "
+                    f"smallest {ordered[-1]} (estimate {estimates[ordered[-1]]:.0f})")
+    return ordered
@@ -0,0 +1,382 @@
+import argparse
+import logging
+import math
+import re
+import sqlite3
+from typing import Iterable, List, Optional, Tuple
+
+from batch_writer import overflow_column
+from citation_parser import format_citation, parse_citations
+from date_scanner import scan_dates
+
+logger = logging.getLogger(__name__)
+
+# One row per judgment plus child tables for the values the programs join into
+# strings (judges, parties, acts, act IDs, hearing dates, citations). Re-adding a
+# file replaces the values of the programs whose columns the row has and keeps the
+# rest, so a run over some of the programs does not blank the others; act IDs and
+# citations, which several programs supply, record their program for this.
+SCHEMA = """
+PRAGMA foreign_keys = ON;
+CREATE TABLE IF NOT EXISTS judgments (
+    id INTEGER PRIMARY KEY,
+    file_name TEXT NOT NULL UNIQUE,
+    case_no TEXT,
+    title TEXT,
+    citation TEXT,
+    judgment_date TEXT,
+    year INTEGER,
+    category TEXT,
+    subcategory TEXT,
+    document_type TEXT,
+    language TEXT,
+    page_count INTEGER,
+    case_result TEXT
+);
+CREATE TABLE IF NOT EXISTS judges (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS judgment_judges (
+    judgment_id INTEGER NOT NULL REFERENCES judgments(id) ON DELETE CASCADE,
+    judge_id INTEGER NOT NULL REFERENCES judges(id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (judgment_id, judge_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS parties (
+    judgment_id INTEGER NOT NULL REFERENCES judgments(id) ON DELETE CASCADE,
+    side TEXT NOT NULL,
+    name TEXT,
+    role TEXT,
+    identity TEXT,
+    action TEXT,
+    other_attributes TEXT
+);
+CREATE TABLE IF NOT EXISTS acts (
+    judgment_id INTEGER NOT NULL REFERENCES judgments(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS act_ids (
+    judgment_id INTEGER NOT NULL REFERENCES judgments(id) ON DELETE CASCADE,
+    act_id TEXT NOT NULL,
+    program INTEGER NOT NULL,
+    PRIMARY KEY (judgment_id, act_id, program)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hearing_dates (
+    judgment_id INTEGER NOT NULL REFERENCES judgments(id) ON DELETE CASCADE,
+    hearing_date TEXT NOT NULL,
+    PRIMARY KEY (judgment_id, hearing_date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS citations (
+    judgment_id INTEGER NOT NULL REFERENCES judgments(id) ON DELETE CASCADE,
+    direction TEXT NOT NULL,
+    citation TEXT NOT NULL,
+    reporter TEXT NOT NULL,
+    year INTEGER,
+    program INTEGER NOT NULL,
+    PRIMARY KEY (judgment_id, direction, citation, program)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS judgments_by_year ON judgments (year);
+CREATE INDEX IF NOT EXISTS judgments_by_category ON judgments (category, year);
+CREATE INDEX IF NOT EXISTS judgment_judges_by_judge ON judgment_judges (judge_id, judgment_id);
+CREATE INDEX IF NOT EXISTS parties_by_judgment ON parties (judgment_id);
+CREATE INDEX IF NOT EXISTS acts_by_judgment ON acts (judgment_id);
+CREATE INDEX IF NOT EXISTS acts_by_name ON acts (name);
+CREATE INDEX IF NOT EXISTS act_ids_by_act ON act_ids (act_id, judgment_id);
+CREATE INDEX IF NOT EXISTS hearing_dates_by_date ON hearing_dates (hearing_date);
+CREATE INDEX IF NOT EXISTS citations_by_citation ON citations (citation, direction);
+"""
+
+# Program 4 columns stored in `acts`, by kind
+ACT_COLUMNS = {
+    "act": "Acts (Program 4)",
+    "rule": "Rules (Program 4)",
+    "law": "Laws (Program 4)",
+    "procedure": "Procedures (Program 4)",
+    "penal_code": "Penal Codes (Program 4)",
+    "constitution": "Constitutions (Program 4)",
+}
+
+ACT_ID_COLUMNS = ("Act IDs (Program 3)", "Act IDs (Program 4)", "Act IDs (Program 6)")
+
+# Program 2 party columns, per side: (name, role, identity, action, other attributes)
+PARTY_COLUMNS = {
+    "filer": ("Filer Name", "Filed By", "Filer Identity", "Filer Action", "Filer Other Attributes"),
+    "against": ("Against Name", "Against Who", "Against Identity", "Against Action", "Against Other Attributes"),
+}
+
+# Source columns of each judgments column (with several, the first one found wins)
+JUDGMENT_COLUMNS = {
+    "case_no": ("Case No. (Program 1)",),
+    "title": ("Case Title (Program 1)", "Case Title (Program 2)"),
+    "citation": ("Citation (Program 7)", "Citation (Program 2)"),
+    "judgment_date": ("Judgment Date (Program 1)",),
+    "year": ("Year (Program 1)", "Judgment Date (Program 1)"),
+    "category": ("Category (Program 2)",),
+    "subcategory": ("Subcategory (Program 2)",),
+    "document_type": ("Type (Program 1)",),
+    "language": ("Language of the Document (Program 3)",),
+    "page_count": ("Page Count (Program 1)",),
+    "case_result": ("case_result",),
+}
+
+# Citation columns by direction, each stored with its program
+CITATION_COLUMNS = {
+    "own": ("Citation (Program 7)", "Citation (Program 2)"),
+    "cited": ("Precedent Citations (Program 9)", "Reporter Citations (Program 5)"),
+}
+
+_PROGRAM_NUMBER = re.compile(r"\(Program (\d+)\)")
+
+# Placeholder values the programs write when nothing was found
+_EMPTY_VALUES = {"", "not found", "none", "nan", "unknown"}
+
+# ", " joins act names, but "Code of Civil Procedure, 1908" keeps its year
+_LIST_SEPARATOR = re.compile(r",(?!\s*\d{4}\b)\s*")
+
+
+def _value(row: dict, *columns: str) -> Optional[str]:
+    """First non-placeholder value among the columns (with its overflow columns appended)."""
+    for column in columns:
+        value = row.get(column)
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            continue
+        text = str(value)
+        part = 1
+        while isinstance(row.get(overflow_column(column, part)), str):
+            text += row[overflow_column(column, part)]
+            part += 1
+        if text.strip().lower() not in _EMPTY_VALUES:
+            return text.strip()
+    return None
+
+
+# Whether the program of any of the columns ran for this row
+def _present(row: dict, columns) -> bool:
+    return any(column in row for column in columns)
+
+
+def _program(column: str) -> int:
+    return int(_PROGRAM_NUMBER.search(column).group(1))
+
+
+def _split_list(text: Optional[str], separator=_LIST_SEPARATOR) -> List[str]:
+    if not text:
+        return []
+    return list(dict.fromkeys(item.strip() for item in separator.split(text) if item.strip()))
+
+
+def _int(text: Optional[str]) -> Optional[int]:
+    match = re.search(r"\d+", text) if text else None
+    return int(match.group(0)) if match else None
+
+
+def _iso_date(text: Optional[str]) -> Optional[str]:
+    tokens = scan_dates(text) if text else ()
+    return tokens[0].date.isoformat() if tokens else None
+
+
+def _citations(text: Optional[str]) -> List[Tuple[str, str, int]]:
+    return list({format_citation(c): (format_citation(c), c.reporter, c.year) for c in parse_citations(text or "")}.values())
+
+
+class JudgmentDatabase:
+    """Normalised SQLite store of the extracted metadata: one row per judgment, with
+    judges, parties, acts, act IDs, hearing dates and citations in child tables."""
+
+    def __init__(self, db_path: str):
+        # Written from the pipeline's main thread after each batch
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'act_ids'").fetchone():
+            self._migrate()
+        self.conn.executescript(SCHEMA)
+        self._judge_ids = dict(self.conn.execute("SELECT name, id FROM judges"))
+
+    def _migrate(self):
+        # Databases from before act IDs and citations recorded their program: those two
+        # tables are rebuilt empty (reload earlier batches with --import-xlsx)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(act_ids)")]
+        if "program" not in columns:
+            logger.warning("Judgment database: rebuilding act_ids and citations with a program column; "
+                           "reload earlier batches with --import-xlsx")
+            self.conn.executescript("DROP TABLE act_ids; DROP TABLE citations;")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _judge_id(self, name: str) -> int:
+        if name not in self._judge_ids:
+            self._judge_ids[name] = self.conn.execute("INSERT INTO judges (name) VALUES (?)", (name,)).lastrowid
+        return self._judge_ids[name]
+
+    def _replace_children(self, row: dict, columns, table: str, judgment_id: int,
+                          where: str = "", params: tuple = ()) -> bool:
+        """Clear this judgment's rows of a child table when the program of `columns`
+        ran; False (nothing to write) when it did not, so its stored rows are kept."""
+        if not _present(row, columns):
+            return False
+        self.conn.execute(f"DELETE FROM {table} WHERE judgment_id = ?{where}", (judgment_id, *params))
+        return True
+
+    def _add_row(self, row: dict) -> int:
+        file_name = row["File Name"]
+        own_citations = _citations(_value(row, "Citation (Program 7)", "Citation (Program 2)"))
+        judgment_date = _iso_date(_value(row, "Judgment Date (Program 1)"))
+        values = {
+            "case_no": _value(row, "Case No. (Program 1)"),
+            "title": _value(row, "Case Title (Program 1)", "Case Title (Program 2)"),
+            "citation": own_citations[0][0] if own_citations else _value(row, "Citation (Program 7)", "Citation (Program 2)"),
+            "judgment_date": judgment_date,
+            "year": _int(_value(row, "Year (Program 1)")) or (int(judgment_date[:4]) if judgment_date else None),
+            "category": _value(row, "Category (Program 2)"),
+            "subcategory": _value(row, "Subcategory (Program 2)"),
+            "document_type": _value(row, "Type (Program 1)"),
+            "language": _value(row, "Language of the Document (Program 3)"),
+            "page_count": _int(_value(row, "Page Count (Program 1)")),
+            "case_result": _value(row, "case_result"),
+        }
+        # Only columns whose programs ran are written; a value several programs supply
+        # keeps the stored one when the programs that ran found nothing
+        updates = []
+        for name, columns in JUDGMENT_COLUMNS.items():
+            if all(column in row for column in columns):
+                updates.append(f"{name} = excluded.{name}")
+            elif _present(row, columns):
+                updates.append(f"{name} = COALESCE(excluded.{name}, {name})")
+        self.conn.execute(
+            f"INSERT INTO judgments (file_name, {', '.join(values)}) VALUES (?{', ?' * len(values)}) "
+            f"ON CONFLICT (file_name) DO " + (f"UPDATE SET {', '.join(updates)}" if updates else "NOTHING"),
+            (file_name, *values.values())
+        )
+        judgment_id = self.conn.execute("SELECT id FROM judgments WHERE file_name = ?", (file_name,)).fetchone()[0]
+
+        if self._replace_children(row, ("Judge Names (Program 1)",), "judgment_judges", judgment_id):
+            judges = _split_list(_value(row, "Judge Names (Program 1)"))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO judgment_judges (judgment_id, judge_id, position) VALUES (?, ?, ?)",
+                [(judgment_id, self._judge_id(name), position) for position, name in enumerate(judges, 1)]
+            )
+
+        party_columns = [f"Party Details (Program 2) - {column}" for columns in PARTY_COLUMNS.values() for column in columns]
+        if self._replace_children(row, party_columns, "parties", judgment_id):
+            parties = []
+            for side, columns in PARTY_COLUMNS.items():
+                party = [_value(row, f"Party Details (Program 2) - {column}") for column in columns]
+                if any(party):
+                    parties.append((judgment_id, side, *party))
+            self.conn.executemany(
+                "INSERT INTO parties (judgment_id, side, name, role, identity, action, other_attributes) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                parties
+            )
+
+        if self._replace_children(row, tuple(ACT_COLUMNS.values()), "acts", judgment_id):
+            self.conn.executemany(
+                "INSERT INTO acts (judgment_id, kind, name) VALUES (?, ?, ?)",
+                [(judgment_id, kind, name) for kind, column in ACT_COLUMNS.items() for name in _split_list(_value(row, column))]
+            )
+
+        for column in ACT_ID_COLUMNS:
+            program = _program(column)
+            if self._replace_children(row, (column,), "act_ids", judgment_id, " AND program = ?", (program,)):
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO act_ids (judgment_id, act_id, program) VALUES (?, ?, ?)",
+                    [(judgment_id, act_id, program) for act_id in _split_list(_value(row, column))]
+                )
+
+        if self._replace_children(row, ("Hearing Dates (Program 2)",), "hearing_dates", judgment_id):
+            hearing_dates = [token.date.isoformat() for token in scan_dates(_value(row, "Hearing Dates (Program 2)") or "")]
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO hearing_dates (judgment_id, hearing_date) VALUES (?, ?)",
+                [(judgment_id, hearing_date) for hearing_date in hearing_dates]
+            )
+
+        for direction, columns in CITATION_COLUMNS.items():
+            for column in columns:
+                program = _program(column)
+                if self._replace_children(row, (column,), "citations", judgment_id,
+                                          " AND direction = ? AND program = ?", (direction, program)):
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO citations (judgment_id, direction, citation, reporter, year, program) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [(judgment_id, direction, *c, program) for c in _citations(_value(row, column))]
+                    )
+        return judgment_id
+
+    def add_rows(self, rows: Iterable[dict]) -> int:
+        """Insert (or replace) a batch of result rows in one transaction; returns the row count."""
+        count = 0
+        try:
+            with self.conn:
+                for count, row in enumerate(rows, 1):
+                    self._add_row(row)
+        except Exception:
+            # The judge cache may hold ids of the rolled-back inserts
+            self._judge_ids = dict(self.conn.execute("SELECT name, id FROM judges"))
+            raise
+        logger.info(f"Judgment database: stored {count} judgments")
+        return count
+
+    def judgments_per_judge_per_year(self, judge: Optional[str] = None) -> List[Tuple[str, Optional[int], int]]:
+        query = (
+            "SELECT j.name, g.year, COUNT(*) FROM judgment_judges jj "
+            "JOIN judges j ON j.id = jj.judge_id JOIN judgments g ON g.id = jj.judgment_id"
+        )
+        params = []
+        if judge:
+            query += " WHERE j.name = ?"
+            params.append(judge)
+        return self.conn.execute(query + " GROUP BY j.name, g.year ORDER BY j.name, g.year", params).fetchall()
+
+    def judgments_per_category_per_year(self) -> List[Tuple[Optional[str], Optional[int], int]]:
+        return self.conn.execute(
+            "SELECT category, year, COUNT(*) FROM judgments GROUP BY category, year ORDER BY category, year"
+        ).fetchall()
+
+    def most_cited_acts(self, limit: int = 20) -> List[Tuple[str, int]]:
+        return self.conn.execute(
+            "SELECT act_id, COUNT(DISTINCT judgment_id) AS cnt FROM act_ids GROUP BY act_id ORDER BY cnt DESC, act_id LIMIT ?",
+            (limit,)
+        ).fetchall()
+
+    def add_workbook(self, xlsx_path: str) -> int:
+        """Load an existing batch workbook in one transaction."""
+        import pandas as pd
+
+        return self.add_rows(pd.read_excel(xlsx_path).to_dict('records'))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Load and query the normalised judgment database")
+    parser.add_argument("db", help="judgment database (judgments.sqlite in the output folder)")
+    parser.add_argument("--import-xlsx", nargs="+", default=[], help="add existing batch workbooks to the database")
+    parser.add_argument("--judges", action="store_true", help="judgments per judge per year")
+    parser.add_argument("--judge", help="judgments per year of one judge")
+    parser.add_argument("--categories", action="store_true", help="judgments per category per year")
+    parser.add_argument("--top-acts", type=int, help="acts cited by the most judgments")
+    parser.add_argument("--sql", help="run a read-only SQL query and print its rows")
+    args = parser.parse_args()
+
+    with JudgmentDatabase(args.db) as db:
+        for path in args.import_xlsx:
+            print(f"Stored {db.add_workbook(path)} judgments from {path}")
+        if args.judges or args.judge:
+            for name, year, count in db.judgments_per_judge_per_year(args.judge):
+                print(f"{name}\t{year or ''}\t{count}")
+        if args.categories:
+            for category, year, count in db.judgments_per_category_per_year():
+                print(f"{category or ''}\t{year or ''}\t{count}")
+        if args.top_acts:
+            for act_id, count in db.most_cited_acts(args.top_acts):
+                print(f"{count}\t{act_id}")
+        if args.sql:
+            db.conn.execute("PRAGMA query_only = ON")
+            for row in db.conn.execute(args.sql):
+                print("\t".join("" if v is None else str(v) for v in row))
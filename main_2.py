@@ -1,31 +1,48 @@
 import os
-import pandas as pd
 import logging
 import time
+
+# Start of the process, for the time-to-first-PDF metric
+PROCESS_START = time.perf_counter()
+
 import re
 import traceback
 import shutil
+import threading
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import Manager
 from pathlib import Path
 
-# Placeholder imports for extraction programs (replace with actual imports)
-from program_1 import extract_legal_details as extract_1
-from program_2 import extract_parties as extract_2
-from program_3 import extract_judges as extract_3
-from program_4 import extract_legal_references as extract_4
-from program_6 import extract_acts as extract_6
-from program_7 import extract_citation as extract_7
-from program_8 import extract_background as extract_8
-from program_10 import extract_crime_info as extract_10
-from program_11 import extract_case_result as extract_11
-from program_12 import extract_case_details as extract_12
-
-logging.basicConfig(
-    filename='pipeline_log.txt',
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+import pdf_triage
+from batch_writer import BatchWriter
+from citation_graph import CitationGraph
+from header_parser import parse_header
+from job_order import longest_first
+from judgment_db import JudgmentDatabase
+from page_text_store import clear_page_override, configure_store, get_page_texts
+from pipeline_logging import document_context, new_correlation_id, setup_logging, setup_worker_logging, worker_listener
+from profiles import DEFAULT_PROFILE, PROFILES, active_profile, apply_profile, resolve_profile
+from program_registry import HEADER_PROGRAMS, load_programs, select_programs, text_engines
+from progress_reporter import ProgressReporter
+from search_index import INDEXED_PROGRAMS, SearchIndex
+from stage_pipeline import Stage, StagePipeline
+from worker_controller import ConcurrencyLimiter, WorkerController
+
 logger = logging.getLogger(__name__)
 
+# Documents waiting in front of each pipeline stage, and how often stage metrics are logged
+STAGE_QUEUE_SIZE = 2
+STAGE_REPORT_SECONDS = 60
+
+# How often the progress line and progress_status.json are refreshed
+PROGRESS_SECONDS = 5
+
+# Worker id -> (file, program, start time) of the program each process is running;
+# set by configure_run for pipeline runs and read by the progress reporter
+_program_status = None
+
 def check_disk_space(path):
     """Check available disk space in the output directory."""
     total, used, free = shutil.disk_usage(path)
@@ -58,8 +75,70 @@ def get_next_batch_number(output_dir, base_filename):
             batch_numbers.append(int(match.group(1)))
     return max(batch_numbers, default=0) + 1
 
-def process_pdfs(input_folder, output_base_file, batch_size=200, max_pdfs=700):
+def run_programs(pdf_path, pdf_file, programs, correlation_id=None):
+    """Run the given (number, extractor, name) programs on one PDF and merge their columns."""
+    # Every record logged while this PDF runs carries its file name and correlation ID
+    with document_context(pdf_file, correlation_id):
+        return _run_programs(pdf_path, pdf_file, programs)
+
+def _run_programs(pdf_path, pdf_file, programs):
+    result = {"File Name": pdf_file}
+    # Corrupt and empty files fail here once; scanned ones are OCR'd once for every program
+    triage = pdf_triage.prepare_document(pdf_path)
+    result["PDF Status (Triage)"] = triage.status
+    result["Profile (Pipeline)"] = active_profile()
+    if triage.error:
+        result["Error (Triage)"] = triage.error
+        return result
+    for i, prog, prog_name in programs:
+        if _program_status is not None:
+            _program_status[os.getpid()] = (pdf_file, f"Program {i} ({prog_name})", time.time())
+        try:
+            prog_result = prog(pdf_path)
+            if prog_result is None or not prog_result:
+                logger.warning(f"Program {i} ({prog_name}) returned empty result for {pdf_file}")
+                result[f"Error (Program {i} - {prog_name})"] = "Empty result"
+            else:
+                logger.info(f"Program {i} ({prog_name}) successful for {pdf_file}")
+                result.update(prog_result)
+        except Exception as e:
+            logger.error(f"Error in Program {i} ({prog_name}) for {pdf_file}: {str(e)}")
+            result[f"Error (Program {i} - {prog_name})"] = str(e)
+    clear_page_override(pdf_path)
+    if _program_status is not None:
+        _program_status[os.getpid()] = None
+    return result
+
+def configure_run(program_numbers=None, skip_ocr=False, text_store=None, program_status=None, profile=None,
+                  log_queue=None):
+    """Apply run options in this process (also used as the worker initializer)."""
+    global _program_status
+    _program_status = program_status
+    # Workers send their log records to the parent's listener, which writes pipeline_log.txt
+    if log_queue is not None:
+        setup_worker_logging(log_queue)
+    # Persist per-page PDF text so later runs skip PDF parsing (PDF_TEXT_STORE also enables it)
+    if text_store:
+        configure_store(text_store)
+    # Speed/accuracy profile (PIPELINE_PROFILE when not given); --skip-ocr still wins below
+    apply_profile(profile, program_numbers)
+    if skip_ocr:
+        pdf_triage.OCR_ENABLED = False
+    # Only touch program 7 when it is selected, so it is not imported otherwise
+    if skip_ocr and (not program_numbers or 7 in program_numbers):
+        import program_7
+        program_7.OCR_ENABLED = False
+
+def run_selected(pdf_path, pdf_file, program_numbers=None, correlation_id=None):
+    """Worker entry point: run the selected programs on one PDF."""
+    return run_programs(pdf_path, pdf_file, load_programs(program_numbers), correlation_id)
+
+def process_pdfs(input_folder, output_base_file, batch_size=200, max_pdfs=700, text_store=None,
+                 program_numbers=None, skip_ocr=False, workers=1, profile=None, min_workers=1, max_workers=None):
     try:
+        setup_logging()
+        profile = resolve_profile(profile)
+        
         # Validate input and output paths
         output_dir = os.path.dirname(output_base_file)
         if not validate_path(output_dir):
@@ -75,7 +154,15 @@ def process_pdfs(input_folder, output_base_file, batch_size=200, max_pdfs=700):
             return
         
         # Check for processed files log
-        processed_log = os.path.join(output_dir, 'processed_files_3.txt')
+        # A run over a subset of programs, or with a profile other than the default, keeps
+        # its own log, so a later full balanced run still processes those files
+        selected = select_programs(program_numbers)
+        log_name = 'processed_files_3'
+        if program_numbers:
+            log_name += f"_programs_{'_'.join(map(str, selected))}"
+        if profile != DEFAULT_PROFILE:
+            log_name += f"_{profile}"
+        processed_log = os.path.join(output_dir, f"{log_name}.txt")
         processed_files = set()
         if os.path.exists(processed_log):
             with open(processed_log, 'r') as f:
@@ -90,82 +177,179 @@ def process_pdfs(input_folder, output_base_file, batch_size=200, max_pdfs=700):
         
         # Take next batch
         batch_files = remaining_files[:batch_size]
-        all_results = []
         
-        for pdf_file in batch_files:
-            pdf_path = os.path.join(input_folder, pdf_file)
-            logger.info(f"Processing {pdf_file}")
-            print(f"Processing {pdf_file}")
-            
-            result = {"File Name": pdf_file}
+        # With max_workers the worker count adapts between min_workers and max_workers
+        # to CPU and memory headroom, starting from workers; the pool is sized for the maximum
+        pool_size = max(workers, max_workers or 0)
+        
+        # With several workers, start the longest PDFs first (page counts from a cached pre-scan)
+        if pool_size > 1:
+            batch_files = longest_first(input_folder, batch_files, os.path.join(output_dir, 'page_counts.json'))
+        
+        # Citation graph of the whole corpus; its edges come from program 9, so it is
+        # only opened when program 9 runs. Each processed PDF only adds its own edges.
+        citation_graph = CitationGraph(os.path.join(output_dir, 'citation_graph.sqlite')) if 9 in selected else None
+        
+        # Full-text index of headnotes, conclusions, results, titles and citations, updated per PDF
+        search_index = SearchIndex(os.path.join(output_dir, 'search_index.sqlite')) if INDEXED_PROGRAMS & set(selected) else None
+        
+        # Determine output file for this batch. Each result is appended to its
+        # _temp.jsonl spool as soon as it is written, and the workbook is streamed
+        # from the spool when the batch is done.
+        base_filename = os.path.splitext(os.path.basename(output_base_file))[0]
+        batch_number = get_next_batch_number(output_dir, base_filename)
+        output_file = os.path.join(output_dir, f"{base_filename}_batch_{batch_number}.xlsx")
+        writer = BatchWriter(output_file)
+        
+        # Stage 1: triage the PDF (OCR if scanned) and parse it into the shared page text
+        # caches (and the store) while the previous document is still being extracted.
+        # Skipped with several workers, where extraction happens in other processes.
+        def read_pdf(context):
+            with document_context(context["id"], context["correlation"]):
+                if pdf_triage.prepare_document(context["path"]).error:
+                    return
+                for engine in text_engines(selected):
+                    get_page_texts(context["path"], engine)
+                if HEADER_PROGRAMS & set(selected):
+                    parse_header(context["path"])
+        
+        # Stage 2: run the selected programs, in this process or in the worker pool
+        executor = None
+        manager = None
+        log_listener = None
+        controller = None
+        limiter = ConcurrencyLimiter(min(max(workers, min_workers), pool_size))
+        if pool_size > 1:
+            # Worker processes report their current program through a shared dict
+            manager = Manager()
+            program_status = manager.dict()
+        else:
+            program_status = {}
+        configure_run(program_numbers, skip_ocr, text_store, program_status, profile)
+        if pool_size > 1:
+            log_listener = worker_listener()
+            pool_lock = threading.Lock()
+            def new_pool():
+                return ProcessPoolExecutor(max_workers=pool_size, initializer=configure_run,
+                                           initargs=(program_numbers, skip_ocr, text_store, program_status, profile,
+                                                     log_listener.queue if log_listener else None))
+            executor = new_pool()
+            # A worker killed mid-PDF (out of memory, crash on a bad file) breaks the whole
+            # pool: replace it once for the documents caught by the break and retry each once
+            def submit(context, retry=True):
+                nonlocal executor
+                pool = executor
+                try:
+                    return pool.submit(run_selected, context["path"], context["id"], program_numbers,
+                                       context["correlation"]).result()
+                except BrokenProcessPool:
+                    with pool_lock:
+                        if executor is pool:
+                            logger.error(f"Worker pool broke while extracting {context['id']}; starting a new pool")
+                            pool.shutdown(wait=False)
+                            executor = new_pool()
+                    if not retry:
+                        raise
+                    return submit(context, retry=False)
+            # One extract thread per pool slot; the limiter decides how many run at once
+            def extract(context):
+                with limiter:
+                    return submit(context)
+            if max_workers:
+                controller = WorkerController(limiter, min_workers, pool_size)
+        else:
+            programs = load_programs(selected)
+            def extract(context):
+                return run_programs(context["path"], context["id"], programs, context["correlation"])
+        
+        # Stage 3: citation graph, spool (intermediate save) and processed-files log
+        def write_result(context):
+            pdf_file, result = context["id"], context["extract"]
+            if result is None:
+                result = {"File Name": pdf_file, "Error (Pipeline)": "Extraction failed"}
+            with document_context(pdf_file, context["correlation"]):
+                logger.info(f"Processed {pdf_file}")
+            progress.document_done(pdf_file, result)
             
-            programs = [
-                (extract_1, "Legal Details"),
-                (extract_2, "Parties"),
-                (extract_3, "Judges"),
-                (extract_4, "Legal References"),
-                (extract_6, "Acts"),
-                (extract_7, "Citation"),
-                (extract_8, "Background"),
-                (extract_10, "Crime Info"),
-                (extract_11, "Case Outcomes"),
-                (extract_12, "Case Details")
-            ]
+            writer.write_row(result)
+            if writer.rows == 1:
+                logger.info(f"Time to first PDF: {time.perf_counter() - PROCESS_START:.2f}s after process start")
             
-            for i, (prog, prog_name) in enumerate(programs, 1):
+            if citation_graph:
                 try:
-                    prog_result = prog(pdf_path)
-                    if prog_result is None or not prog_result:
-                        logger.warning(f"Program {i} ({prog_name}) returned empty result for {pdf_file}")
-                        result[f"Error (Program {i} - {prog_name})"] = "Empty result"
-                    else:
-                        logger.info(f"Program {i} ({prog_name}) successful for {pdf_file}")
-                        result.update(prog_result)
+                    citation_graph.add_judgment(
+                        pdf_file,
+                        [result.get("Citation (Program 2)"), result.get("Citation (Program 7)")],
+                        result.get("Precedent Citations (Program 9)")
+                    )
                 except Exception as e:
-                    logger.error(f"Error in Program {i} ({prog_name}) for {pdf_file}: {str(e)}")
-                    result[f"Error (Program {i} - {prog_name})"] = str(e)
+                    logger.error(f"Failed to update citation graph for {pdf_file}: {str(e)}")
             
-            all_results.append(result)
-            
-            # Save intermediate results to avoid data loss
-            try:
-                intermediate_df = pd.DataFrame(all_results)
-                base_filename = os.path.splitext(os.path.basename(output_base_file))[0]
-                batch_number = get_next_batch_number(output_dir, base_filename)
-                temp_output_file = os.path.join(output_dir, f"{base_filename}_batch_{batch_number}_temp.xlsx")
-                intermediate_df.to_excel(temp_output_file, index=False, engine='openpyxl')
-                logger.info(f"Intermediate results saved to {temp_output_file} for {pdf_file}")
-            except Exception as e:
-                logger.error(f"Failed to save intermediate results for {pdf_file}: {str(e)}")
-                print(f"Failed to save intermediate results for {pdf_file}: {str(e)}")
+            if search_index:
+                try:
+                    search_index.add_row(result)
+                except Exception as e:
+                    logger.error(f"Failed to update search index for {pdf_file}: {str(e)}")
             
-            # Add to processed files
+            # Add to processed files; a failed extraction is retried by the next run
+            if context["extract"] is None:
+                return
             with open(processed_log, 'a') as f:
                 f.write(pdf_file + '\n')
         
-        # Create output directory if it doesn't exist
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        stages = [Stage("extract", extract, workers=pool_size), Stage("write", write_result)]
+        if pool_size == 1:
+            stages.insert(0, Stage("read", read_pdf))
+        pipeline = StagePipeline(stages, queue_size=STAGE_QUEUE_SIZE)
         
-        # Determine output file for this batch
-        base_filename = os.path.splitext(os.path.basename(output_base_file))[0]
-        batch_number = get_next_batch_number(output_dir, base_filename)
-        output_file = os.path.join(output_dir, f"{base_filename}_batch_{batch_number}.xlsx")
+        # Terminal status line and progress_status.json: docs/min, ETA, errors, current program per worker
+        progress = ProgressReporter(
+            len(batch_files), os.path.join(output_dir, 'progress_status.json'), PROGRESS_SECONDS,
+            worker_status=program_status, extra=lambda: {"batch": batch_number, "profile": profile, "active_workers": limiter.limit,
+                           "stages": pipeline.snapshot()}
+        ).start()
+        if controller:
+            controller.start()
+        stage_metrics = pipeline.run(
+            ({"id": pdf_file, "path": os.path.join(input_folder, pdf_file), "correlation": new_correlation_id()}
+             for pdf_file in batch_files),
+            report_every=STAGE_REPORT_SECONDS
+        )
+        progress.stop()
+        logger.info(f"Stage metrics: {stage_metrics}")
+        if controller:
+            controller.stop()
+            logger.info(f"Worker count changed {controller.adjustments} times, ended at {limiter.limit}")
+        
+        if executor:
+            executor.shutdown()
+        if log_listener:
+            log_listener.stop()
+        if manager:
+            manager.shutdown()
+        if citation_graph:
+            citation_graph.close()
+        if search_index:
+            search_index.close()
+        
+        # Normalised judgment database (judges, parties, acts, citations), loaded from the spool in one transaction
+        try:
+            with JudgmentDatabase(os.path.join(output_dir, 'judgments.sqlite')) as judgment_db:
+                judgment_db.add_rows(writer.read_rows())
+        except Exception as e:
+            logger.error(f"Failed to update judgment database for batch {batch_number}: {str(e)}\n{traceback.format_exc()}")
+            print(f"Failed to update judgment database for batch {batch_number}: {str(e)}")
         
-        # Save final results
+        # Save final results. Long cells overflow into extra columns, so only a locked
+        # or unwritable file can make this fail; the spool is kept until it succeeds.
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                df = pd.DataFrame(all_results)
-                logger.info(f"Attempting to save to {output_file} with openpyxl (attempt {attempt + 1})")
-                df.to_excel(output_file, index=False, engine='openpyxl')
+                logger.info(f"Attempting to save to {output_file} (attempt {attempt + 1})")
+                writer.close()
                 logger.info(f"Batch {batch_number} processed. Results saved to {output_file}")
                 print(f"Batch {batch_number} of {len(batch_files)} PDFs processed. Results saved to {output_file}")
                 print(f"Please restart the program to process the next batch.")
-                # Remove temporary file if it exists
-                temp_output_file = os.path.join(output_dir, f"{base_filename}_batch_{batch_number}_temp.xlsx")
-                if os.path.exists(temp_output_file):
-                    os.remove(temp_output_file)
                 break
             except PermissionError as pe:
                 logger.error(f"Permission denied on attempt {attempt + 1} for {output_file}: {str(pe)}")
@@ -174,32 +358,41 @@ def process_pdfs(input_folder, output_base_file, batch_size=200, max_pdfs=700):
                 if attempt == max_retries - 1:
                     logger.error(f"Max retries reached for {output_file}. Please ensure the file is not open and you have write permissions.")
                     print(f"Max retries reached. Please ensure the file is not open and you have write permissions.")
+                    print(f"Results are kept in {writer.spool_path}; write them with: python batch_writer.py {writer.spool_path} {output_file}")
                     return
             except Exception as e:
                 logger.error(f"Unexpected error while saving to {output_file}: {str(e)}\n{traceback.format_exc()}")
                 print(f"Unexpected error while saving to {output_file}: {str(e)}")
-                # Try with xlsxwriter as a fallback
-                if attempt == max_retries - 1:
-                    try:
-                        logger.info(f"Attempting to save with xlsxwriter as fallback for {output_file}")
-                        df.to_excel(output_file, index=False, engine='xlsxwriter')
-                        logger.info(f"Batch {batch_number} processed. Results saved to {output_file} using xlsxwriter")
-                        print(f"Batch {batch_number} of {len(batch_files)} PDFs processed. Results saved to {output_file} using xlsxwriter")
-                        temp_output_file = os.path.join(output_dir, f"{base_filename}_batch_{batch_number}_temp.xlsx")
-                        if os.path.exists(temp_output_file):
-                            os.remove(temp_output_file)
-                        break
-                    except Exception as e2:
-                        logger.error(f"Failed to save with xlsxwriter to {output_file}: {str(e2)}\n{traceback.format_exc()}")
-                        print(f"Failed to save with xlsxwriter to {output_file}: {str(e2)}")
-                        print(f"Data was not saved. Check {temp_output_file} for intermediate results.")
-                        return
+                print(f"Results are kept in {writer.spool_path}; write them with: python batch_writer.py {writer.spool_path} {output_file}")
+                return
     
     except Exception as e:
         logger.error(f"Error in pipeline execution: {str(e)}\n{traceback.format_exc()}")
         print(f"Error in pipeline execution: {str(e)}")
 
+# Parse "1,2,7" (or "1 2 7") into program numbers
+def parse_program_list(value):
+    try:
+        return [int(part) for part in re.split(r"[,\s]+", value.strip()) if part]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid program list: {value}")
+
 if __name__ == "__main__":
-    input_folder = r"D:\ANVIA_PRODUCT_FILES\2025_sc\splitted_cases_2025\2025_judg_order\Judgment\civil\test_26_12_2025"
-    output_base_file = r"C:\Users\Roshan\Downloads\my_flask_app\output\combined_legal_details_2025_civil_test_26_12_2025.xlsx"
-    process_pdfs(input_folder, output_base_file)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract legal metadata from a folder of judgment PDFs into batch Excel files")
+    parser.add_argument("--input", required=True, help="folder with the PDFs")
+    parser.add_argument("--output", required=True, help="base output file, e.g. output/combined_legal_details.xlsx")
+    parser.add_argument("--batch-size", type=int, default=200, help="PDFs per run (default 200)")
+    parser.add_argument("--max-pdfs", type=int, default=700, help="PDFs considered in the input folder (default 700)")
+    parser.add_argument("--programs", type=parse_program_list, help="programs to run, e.g. 1,2,7 (default: all); others are not imported")
+    parser.add_argument("--skip-ocr", action="store_true", help="do not OCR first pages without a text layer (program 7)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default 1)")
+    parser.add_argument("--max-workers", type=int, help="adapt the worker count to CPU and memory headroom, up to this many (Linux)")
+    parser.add_argument("--min-workers", type=int, default=1, help="fewest workers when adapting (default 1)")
+    parser.add_argument("--text-store", help="folder of the persistent page text store")
+    parser.add_argument("--profile", choices=list(PROFILES), help="speed/accuracy profile (default: $PIPELINE_PROFILE or balanced)")
+    args = parser.parse_args()
+    
+    process_pdfs(args.input, args.output, batch_size=args.batch_size, max_pdfs=args.max_pdfs,
+                 text_store=args.text_store, program_numbers=args.programs,
+                 skip_ocr=args.skip_ocr, workers=args.workers, profile=args.profile,
+                 min_workers=args.min_workers, max_workers=args.max_workers)
@@ -0,0 +1,35 @@
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = "en_core_web_sm"
+
+# Programs that use the spaCy model
+NLP_PROGRAMS = {2, 3, 11}
+
+# Loaded pipelines (None after a failed load), shared by every program in the process
+_models: Dict[str, Optional[object]] = {}
+
+
+# Load a spaCy pipeline on first use instead of at import; programs 2, 3 and 11
+# share one instance. Returns None if the model cannot be loaded.
+def get_nlp(name: str = SPACY_MODEL):
+    if name not in _models:
+        try:
+            import spacy
+
+            _models[name] = spacy.load(name)
+            logger.info(f"spaCy model '{name}' loaded successfully.")
+        except Exception as e:
+            logger.error(f"Failed to load spaCy model '{name}': {e}")
+            _models[name] = None
+    return _models[name]
+
+
+# Like get_nlp, but raise for programs that cannot run without the model
+def require_nlp(name: str = SPACY_MODEL):
+    nlp = get_nlp(name)
+    if nlp is None:
+        raise RuntimeError(f"spaCy model '{name}' not loaded")
+    return nlp
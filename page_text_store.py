@@ -0,0 +1,236 @@
+import argparse
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import zlib
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Folder of the persistent store; unset means every run parses the PDFs again
+STORE_ENV = "PDF_TEXT_STORE"
+
+# Store file layout: magic, page count, (page count + 1) offsets into the data
+# section, then each page's text zlib-compressed. The file is memory-mapped on
+# read so a single page can be decompressed without touching the others.
+MAGIC = b"PGTX1\0"
+_HEADER = struct.Struct("<6sI")
+_OFFSET = struct.Struct("<Q")
+COMPRESSION_LEVEL = 6
+
+# Resolution of the page images OCR'd for scanned PDFs
+OCR_DPI = 300
+
+_store_dir: Optional[str] = os.environ.get(STORE_ENV) or None
+
+# Engine used in place of a program's own, e.g. PyMuPDF for everything in the "fast" profile
+_engine_aliases: Dict[str, str] = {}
+
+
+# Per-page text as each program's PDF library returns it; results differ between
+# libraries, so every engine has its own entry in the store
+def _pdfplumber_pages(pdf_path: str) -> List[str]:
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+def _pymupdf_pages(pdf_path: str) -> List[str]:
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        return [page.get_text() for page in doc]
+
+
+def _pypdf2_pages(pdf_path: str) -> List[str]:
+    import PyPDF2
+
+    with open(pdf_path, 'rb') as file:
+        return [page.extract_text() or "" for page in PyPDF2.PdfReader(file).pages]
+
+
+# OCR text of a scanned PDF, one page image at a time (see pdf_triage)
+def _ocr_pages(pdf_path: str) -> List[str]:
+    import pytesseract
+    from pdf2image import convert_from_path, pdfinfo_from_path
+
+    pages = []
+    for number in range(1, pdfinfo_from_path(pdf_path)["Pages"] + 1):
+        images = convert_from_path(pdf_path, dpi=OCR_DPI, first_page=number, last_page=number)
+        pages.append(pytesseract.image_to_string(images[0], lang='eng') if images else "")
+    return pages
+
+
+ENGINES: Dict[str, Callable[[str], List[str]]] = {
+    "pdfplumber": _pdfplumber_pages,
+    "pymupdf": _pymupdf_pages,
+    "pypdf2": _pypdf2_pages,
+    "ocr": _ocr_pages,
+}
+
+# Text served for a document instead of parsing it with the requested engine, e.g.
+# the OCR text of a scanned PDF for every program; keyed by absolute path
+_overrides: Dict[str, Tuple[str, ...]] = {}
+
+
+# Enable (or with None disable) the persistent store for this process
+def configure_store(store_dir: Optional[str]):
+    global _store_dir
+    _store_dir = store_dir
+    if store_dir:
+        os.makedirs(store_dir, exist_ok=True)
+    _load_pages.cache_clear()
+
+
+# Read every engine's text with `engine` instead (None restores each program's own engine)
+def use_engine(engine: Optional[str]):
+    _engine_aliases.clear()
+    if engine:
+        _engine_aliases.update({name: engine for name in ENGINES if name not in (engine, "ocr")})
+
+
+def resolve_engine(engine: str) -> str:
+    return _engine_aliases.get(engine, engine)
+
+
+# Serve these pages for the PDF to every engine until clear_page_override
+def set_page_override(pdf_path: str, pages: List[str]):
+    _overrides[os.path.abspath(pdf_path)] = tuple(pages)
+
+
+def clear_page_override(pdf_path: str):
+    _overrides.pop(os.path.abspath(pdf_path), None)
+
+
+@lru_cache(maxsize=1024)
+def content_hash(pdf_path: str, mtime: float, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _entry_path(store_dir: str, digest: str, engine: str) -> str:
+    return os.path.join(store_dir, engine, digest[:2], f"{digest}.pages")
+
+
+def write_entry(path: str, pages: List[str]):
+    blobs = [zlib.compress(page.encode("utf-8"), COMPRESSION_LEVEL) for page in pages]
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(pages)))
+        f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+        f.write(b"".join(blobs))
+    os.replace(tmp_path, path)
+
+
+class StoreEntry:
+    """Memory-mapped view of one stored document."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.page_count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a page text store entry: {path}")
+        self._offsets_start = _HEADER.size
+        self._data_start = self._offsets_start + _OFFSET.size * (self.page_count + 1)
+
+    def _offset(self, i: int) -> int:
+        return _OFFSET.unpack_from(self._map, self._offsets_start + _OFFSET.size * i)[0]
+
+    def page(self, i: int) -> str:
+        start, end = self._offset(i), self._offset(i + 1)
+        return zlib.decompress(self._map[self._data_start + start:self._data_start + end]).decode("utf-8")
+
+    def pages(self, max_pages: Optional[int] = None) -> List[str]:
+        count = self.page_count if max_pages is None else min(max_pages, self.page_count)
+        return [self.page(i) for i in range(count)]
+
+    def close(self):
+        self._map.close()
+
+
+@lru_cache(maxsize=16)
+def _load_pages(pdf_path: str, mtime: float, size: int, engine: str) -> Tuple[str, ...]:
+    if not _store_dir:
+        return tuple(ENGINES[engine](pdf_path))
+    entry_path = _entry_path(_store_dir, content_hash(pdf_path, mtime, size), engine)
+    if os.path.exists(entry_path):
+        try:
+            entry = StoreEntry(entry_path)
+            try:
+                return tuple(entry.pages())
+            finally:
+                entry.close()
+        except (ValueError, struct.error, zlib.error) as e:
+            logger.warning(f"Discarding unreadable store entry {entry_path}: {e}")
+    pages = ENGINES[engine](pdf_path)
+    write_entry(entry_path, pages)
+    return tuple(pages)
+
+
+# Per-page text of a PDF for one engine: from the store when it has the
+# document, otherwise parsed (and stored when the store is enabled). The last
+# few documents are also kept in memory, so programs sharing an engine parse
+# each PDF once per run.
+def get_page_texts(pdf_path: str, engine: str = "pdfplumber") -> List[str]:
+    override = _overrides.get(os.path.abspath(pdf_path))
+    if override is not None:
+        return list(override)
+    stat = os.stat(pdf_path)
+    return list(_load_pages(pdf_path, stat.st_mtime, stat.st_size, resolve_engine(engine)))
+
+
+# Read only the first pages from an existing store entry (or override) without
+# parsing the PDF; None when the store is disabled, does not have the document yet
+# or its entry is unreadable (the caller then parses the PDF, which rewrites the entry)
+def get_stored_pages(pdf_path: str, engine: str = "pdfplumber", max_pages: Optional[int] = None) -> Optional[Tuple[List[str], int]]:
+    override = _overrides.get(os.path.abspath(pdf_path))
+    if override is not None:
+        return list(override[:max_pages]), len(override)
+    if not _store_dir:
+        return None
+    stat = os.stat(pdf_path)
+    entry_path = _entry_path(_store_dir, content_hash(pdf_path, stat.st_mtime, stat.st_size), resolve_engine(engine))
+    if not os.path.exists(entry_path):
+        return None
+    try:
+        entry = StoreEntry(entry_path)
+        try:
+            return entry.pages(max_pages), entry.page_count
+        finally:
+            entry.close()
+    except (ValueError, struct.error, zlib.error) as e:
+        logger.warning(f"Ignoring unreadable store entry {entry_path}: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Fill the persistent page text store for a folder of PDFs")
+    parser.add_argument("store", help="store folder")
+    parser.add_argument("input_folder", help="folder of PDFs")
+    parser.add_argument("--engines", nargs="+", default=["pdfplumber", "pymupdf", "pypdf2"], choices=list(ENGINES),
+                        help="text engines to store (ocr: OCR every page, only useful for scanned PDFs)")
+    args = parser.parse_args()
+
+    configure_store(args.store)
+    pdf_files = sorted(f for f in os.listdir(args.input_folder) if f.lower().endswith('.pdf'))
+    for pdf_file in pdf_files:
+        for engine in args.engines:
+            try:
+                get_page_texts(os.path.join(args.input_folder, pdf_file), engine)
+            except Exception as e:
+                logger.error(f"Failed to store {engine} text of {pdf_file}: {e}")
+        logger.info(f"Stored {pdf_file}")
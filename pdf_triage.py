@@ -0,0 +1,97 @@
+import logging
+import os
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from page_text_store import get_page_texts, set_page_override
+
+logger = logging.getLogger(__name__)
+
+# OCR scanned documents for all programs (main_2 --skip-ocr turns this off)
+OCR_ENABLED = True
+
+# A page "has text" with at least this many non-space characters
+MIN_PAGE_CHARS = 20
+# Share of pages with text above which a document takes the normal text path
+TEXT_PAGE_SHARE = 0.5
+# Image coverage (share of the page area) above which a text-less page counts as scanned
+SCANNED_COVERAGE = 0.5
+
+
+class TriageResult(NamedTuple):
+    status: str  # "text", "scanned", "empty", "corrupt" or "unchecked" (PyMuPDF missing)
+    page_count: int = 0
+    text_pages: int = 0
+    scanned_pages: int = 0
+    error: Optional[str] = None
+
+
+# Classify a document from per-page text length and image coverage
+def classify(text_lengths, image_coverage) -> TriageResult:
+    import numpy as np
+
+    text_lengths = np.asarray(text_lengths, dtype=np.int64)
+    image_coverage = np.asarray(image_coverage, dtype=np.float64)
+    page_count = len(text_lengths)
+    if page_count == 0:
+        return TriageResult("corrupt", error="PDF has no pages")
+    has_text = text_lengths >= MIN_PAGE_CHARS
+    scanned = ~has_text & (image_coverage >= SCANNED_COVERAGE)
+    text_pages, scanned_pages = int(has_text.sum()), int(scanned.sum())
+    if text_pages / page_count >= TEXT_PAGE_SHARE:
+        status = "text"
+    elif scanned_pages:
+        status = "scanned"
+    elif not text_lengths.any() and not image_coverage.any():
+        return TriageResult("empty", page_count, error="PDF has no text and no images")
+    else:
+        status = "text"
+    return TriageResult(status, page_count, text_pages, scanned_pages)
+
+
+@lru_cache(maxsize=64)
+def _triage_cached(pdf_path: str, mtime: float, size: int) -> TriageResult:
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return TriageResult("unchecked")
+    text_lengths, image_coverage = [], []
+    try:
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                area = abs(page.rect) or 1.0
+                text_lengths.append(len("".join(page.get_text().split())))
+                covered = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+                image_coverage.append(min(covered / area, 1.0))
+    except Exception as e:
+        return TriageResult("corrupt", error=f"Unreadable PDF: {e}")
+    return classify(text_lengths, image_coverage)
+
+
+# Triage one PDF with PyMuPDF; repeated calls for an unchanged file reuse the result
+def triage_pdf(pdf_path: str) -> TriageResult:
+    try:
+        stat = os.stat(pdf_path)
+    except OSError as e:
+        return TriageResult("corrupt", error=str(e))
+    return _triage_cached(pdf_path, stat.st_mtime, stat.st_size)
+
+
+def prepare_document(pdf_path: str) -> TriageResult:
+    """Triage a PDF before the programs run. Corrupt and empty files come back with an
+    error, so they fail once instead of in every program. A scanned file is OCR'd once
+    (kept in the page text store when enabled) and its OCR text is served to every
+    program through the page text override; the caller clears it afterwards."""
+    triage = triage_pdf(pdf_path)
+    if triage.status != "scanned" or triage.error:
+        if triage.error:
+            logger.warning(f"Triage: {pdf_path} is {triage.status}: {triage.error}")
+        return triage
+    if not OCR_ENABLED:
+        return triage._replace(error="Scanned PDF without a text layer; OCR is disabled")
+    logger.info(f"Triage: {pdf_path} is scanned ({triage.scanned_pages}/{triage.page_count} image pages), running OCR")
+    pages = get_page_texts(pdf_path, "ocr")
+    if not any(page.strip() for page in pages):
+        return triage._replace(error="OCR found no text")
+    set_page_override(pdf_path, pages)
+    return triage
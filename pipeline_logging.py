@@ -0,0 +1,153 @@
+import atexit
+import contextlib
+import contextvars
+import copy
+import json
+import logging
+import multiprocessing
+import queue
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
+
+# Log file of the pipeline and its rotation: at LOG_MAX_BYTES it is renamed to
+# pipeline_log.txt.1 (older ones shift up) and LOG_BACKUPS old files are kept
+LOG_FILE = 'pipeline_log.txt'
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_BACKUPS = 5
+
+# Longest message, traceback and payload value written to the log; the rest is cut
+MAX_MESSAGE_CHARS = 2000
+MAX_TRACEBACK_CHARS = 8000
+MAX_FIELD_CHARS = 200
+
+# PDF and correlation ID of the document this thread is working on
+_document = contextvars.ContextVar("document", default=(None, None))
+
+_handlers: List[logging.Handler] = []
+_listeners: List[QueueListener] = []
+
+
+def truncate(text: str, limit: int = MAX_MESSAGE_CHARS) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [+{len(text) - limit} chars]"
+
+
+# Short form of an extraction result for the log: every value cut to MAX_FIELD_CHARS
+def summarize(value, limit: int = MAX_FIELD_CHARS) -> str:
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{key!r}: {summarize(item, limit)}" for key, item in value.items()) + "}"
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:limit]!r}... [+{len(value) - limit} chars]"
+    return truncate(repr(value), limit)
+
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+@contextlib.contextmanager
+def document_context(pdf_file: str, correlation_id: Optional[str] = None):
+    """Tag every record logged in this block (in this thread) with the PDF and its
+    correlation ID, so one document can be followed through the stages and workers."""
+    token = _document.set((pdf_file, correlation_id or new_correlation_id()))
+    try:
+        yield
+    finally:
+        _document.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, process, thread, pdf,
+    correlation_id, message and exception (when there is one)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "thread": record.threadName,
+            "pdf": getattr(record, "pdf", None),
+            "correlation_id": getattr(record, "correlation_id", None),
+            "message": truncate(record.getMessage()),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = truncate(self.formatException(record.exc_info), MAX_TRACEBACK_CHARS)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _ContextQueueHandler(QueueHandler):
+    """Hands records to the listener thread. The message is formatted and truncated
+    here, in the logging thread, and tagged with the current document, so only a
+    short, picklable record crosses the queue."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = truncate(record.getMessage())
+        record.args = None
+        if record.exc_info:
+            record.exc_text = truncate(logging.Formatter().formatException(record.exc_info), MAX_TRACEBACK_CHARS)
+            record.exc_info = None
+        record.stack_info = None
+        if getattr(record, "pdf", None) is None:
+            record.pdf, record.correlation_id = _document.get()
+        return record
+
+
+def _install_queue_handler(log_queue, level: int):
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_ContextQueueHandler(log_queue))
+    root.setLevel(level)
+
+
+def setup_logging(log_file: str = LOG_FILE, level: int = logging.INFO, console: bool = False):
+    """Log the whole process as JSON lines to a rotating `log_file`. Callers only put
+    records on a queue; a background listener thread does the file I/O. `console`
+    also prints warnings and errors on stderr. Calling it again does nothing."""
+    if _listeners:
+        return
+    file_handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+    _handlers.append(file_handler)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.WARNING)
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        _handlers.append(console_handler)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    _install_queue_handler(log_queue, level)
+    atexit.register(stop_logging)
+
+
+def worker_listener() -> Optional[QueueListener]:
+    """A listener for worker processes: its `queue` goes to setup_worker_logging in
+    each worker, and their records are written by this process' handlers. Stop it
+    once the workers have exited. None when setup_logging has not been called."""
+    if not _handlers:
+        return None
+    listener = QueueListener(multiprocessing.Queue(-1), *_handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def setup_worker_logging(log_queue, level: int = logging.INFO):
+    """In a worker process: send every record to the parent's worker listener."""
+    _install_queue_handler(log_queue, level)
+
+
+def stop_logging():
+    """Write out the queued records and stop the listener threads."""
+    while _listeners:
+        _listeners.pop().stop()
+    while _handlers:
+        _handlers.pop().close()
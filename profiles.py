@@ -0,0 +1,87 @@
+import importlib
+import logging
+import os
+from typing import Dict, Iterable, Optional
+
+from program_registry import PROGRAMS, select_programs
+
+logger = logging.getLogger(__name__)
+
+# Profile used when neither --profile nor the environment names one
+PROFILE_ENV = "PIPELINE_PROFILE"
+DEFAULT_PROFILE = "balanced"
+
+# Named speed/accuracy trade-offs. "text_engine" reads every program's page text
+# with one library; "modules" sets module-level switches, and program modules are
+# only touched when the program is selected (so unselected ones are not imported).
+PROFILES: Dict[str, dict] = {
+    # Quick look at a new batch: PyMuPDF text only, no spaCy NER, no OCR, no fallbacks
+    "fast": {
+        "text_engine": "pymupdf",
+        "modules": {
+            "pdf_triage": {"OCR_ENABLED": False},
+            "program_2": {"NER_FALLBACK": False},
+            "program_3": {"NER_ENABLED": False},
+            "program_7": {"OCR_ENABLED": False},
+            "program_12": {"LAST_PAGES_FALLBACK": False},
+        },
+    },
+    # Each program's own PDF library, NER and fallbacks on, OCR at 300 dpi
+    "balanced": {
+        "text_engine": None,
+        "modules": {
+            "pdf_triage": {"OCR_ENABLED": True},
+            "page_text_store": {"OCR_DPI": 300},
+            "program_2": {"NER_FALLBACK": True},
+            "program_3": {"NER_ENABLED": True},
+            "program_7": {"OCR_ENABLED": True, "OCR_DPI": 300},
+            "program_12": {"LAST_PAGES_FALLBACK": True},
+        },
+    },
+    # As balanced, with OCR at 400 dpi for small print in scanned judgments
+    "thorough": {
+        "text_engine": None,
+        "modules": {
+            "pdf_triage": {"OCR_ENABLED": True},
+            "page_text_store": {"OCR_DPI": 400},
+            "program_2": {"NER_FALLBACK": True},
+            "program_3": {"NER_ENABLED": True},
+            "program_7": {"OCR_ENABLED": True, "OCR_DPI": 400},
+            "program_12": {"LAST_PAGES_FALLBACK": True},
+        },
+    },
+}
+
+_active_profile = DEFAULT_PROFILE
+
+
+def resolve_profile(name: Optional[str] = None) -> str:
+    name = name or os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown profile {name!r}; expected one of {list(PROFILES)}")
+    return name
+
+
+def apply_profile(name: Optional[str] = None, program_numbers: Iterable[int] = None) -> str:
+    """Switch this process to a profile (also in pipeline workers, via main_2.configure_run).
+    Returns the profile's name."""
+    global _active_profile
+    from page_text_store import use_engine
+
+    name = resolve_profile(name)
+    profile = PROFILES[name]
+    use_engine(profile["text_engine"])
+    selected_modules = {PROGRAMS[n][0] for n in select_programs(program_numbers)}
+    for module_name, settings in profile["modules"].items():
+        if module_name.startswith("program_") and module_name not in selected_modules:
+            continue
+        module = importlib.import_module(module_name)
+        for attribute, value in settings.items():
+            setattr(module, attribute, value)
+    _active_profile = name
+    logger.info(f"Using profile '{name}'")
+    return name
+
+
+def active_profile() -> str:
+    return _active_profile
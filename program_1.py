@@ -1,84 +1,56 @@
-import fitz  # PyMuPDF
-import pdfplumber
 import re
-from datetime import datetime
 import logging
-import pandas as pd
 import os
+from batch_writer import split_row
+from section_index import build_section_index
+from date_scanner import first_date, scan_dates
+from header_parser import parse_header
+from page_text_store import get_page_texts
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 def extract_headnotes(pdf_path):
     text = ""
     # Extract all text from PDF
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += "\n" + page_text
+    for page_text in get_page_texts(pdf_path):
+        if page_text:
+            text += "\n" + page_text
     
     headnotes_list = []
+    index = build_section_index(text)
     
-    # 1️⃣ Primary pattern: Ends at "Case Law Cited" or "List of Citations and Other References"
-    headnotes_pattern = re.compile(
-        r"(Headnotes(?:†)?\s*[\n\r]+)(.*?)(?=(Case Law Cited|List of Citations and Other References))",
-        re.DOTALL | re.IGNORECASE
-    )
-    matches = headnotes_pattern.findall(text)
+    # 1️⃣ Primary: Headnotes end at "Case Law Cited" or "List of Citations and Other References"
+    matches = index.sections(("headnotes",), ("case_law_cited", "list_of_citations"))
     
-    # 2️⃣ Fallback pattern: Ends at "List of Acts"
+    # 2️⃣ Fallback: Headnotes end at "List of Acts"
     if not matches:
-        fallback_pattern = re.compile(
-            r"(Headnotes(?:†)?\s*[\n\r]+)(.*?)(?=(List of Acts))",
-            re.DOTALL | re.IGNORECASE
-        )
-        matches = fallback_pattern.findall(text)
-    
-    # Store headnotes
-    for match in matches:
-        title = match[0].strip()
-        content = match[1].strip()
-        headnotes_list.append({
-            "title": title,
-            "content": content
-        })
+        matches = index.sections(("headnotes",), ("list_of_acts",))
     
     # 3️⃣ New section: Issue for Consideration → Headnotes
-    issue_pattern = re.compile(
-        r"(Issue\s+for\s+Consideration\s*[\n\r]+)(.*?)(?=(Headnotes))",
-        re.DOTALL | re.IGNORECASE
-    )
-    issue_matches = issue_pattern.findall(text)
+    matches += index.sections(("issue_for_consideration",), ("headnotes",))
     
-    for match in issue_matches:
-        new_title = match[0].strip()
-        new_content = match[1].strip()
+    # Store headnotes
+    for marker, content in matches:
         headnotes_list.append({
-            "title": new_title,
-            "content": new_content
+            "title": marker.heading,
+            "content": content.strip()
         })
     
     return headnotes_list
 
 def extract_legal_details(pdf_path: str) -> dict:
     try:
-        doc = fitz.open(pdf_path)
+        pages_text = get_page_texts(pdf_path, "pymupdf")
         # Store the total page count
-        total_pages = len(doc)
-        first_page_text = doc[0].get_text()
-        all_text = "".join([page.get_text() for page in doc])
-        type_text = (doc[0].get_text() + doc[1].get_text()) if len(doc) > 1 else doc[0].get_text()
+        total_pages = len(pages_text)
+        all_text = "".join(pages_text)
+        header = parse_header(pdf_path)
 
-        # --- Case Title (Cleaned, Handle No Vs/v) ---
-        title_match = re.search(r'([^\n]+?)\s+v\.?\s+([^\n\(]+)', first_page_text, re.IGNORECASE)
-        if title_match:
-            raw_title = f"{title_match.group(1).strip()} v. {title_match.group(2).strip()}"
-            case_title = re.sub(r'\(.*?\)$', '', raw_title).strip()
-        else:
+        # --- Case Title (from the shared first-page header) ---
+        case_title = header.title
+        if not case_title:
             # Fallback: Extract first three lines from first page
-            lines = [line.strip() for line in first_page_text.splitlines() if line.strip()][:3]
+            lines = [line.strip() for line in header.first_page_text.splitlines() if line.strip()][:3]
             if lines:
                 # Combine first three lines and clean annotations
                 combined_lines = " ".join(lines)
@@ -91,65 +63,17 @@ def extract_legal_details(pdf_path: str) -> dict:
                 case_title = "Not found"
 
         # --- Case Numbers (First Page Only, Cleaned, Deduplicated) ---
-        case_patterns = [
-            r'(?:[\)\(]?\s*)?(?:Nos\.?|No\.?|Number)?\s*([A-Za-z\s]*?(?:C\.A\.|Cr\.A\.|Civil Appeal|Criminal Appeal|Writ Petition|SLP|Review Petition)?\s*\d+(?:[-–/]\d+)?\s*(?:of|\/)\s*\d{4})'
-        ]
-
-        case_nos_raw = []
-        for pattern in case_patterns:
-            matches = re.findall(pattern, first_page_text, re.IGNORECASE)
-            case_nos_raw.extend([m.strip() for m in matches])
-
-        cleaned_case_nos = []
-        for cn in case_nos_raw:
-            if all(cn not in existing and existing not in cn for existing in cleaned_case_nos):
-                cleaned_case_nos.append(cn)
-
-        case_no = cleaned_case_nos[0] if cleaned_case_nos else "Not found"
-        other_case_nos = ", ".join(cleaned_case_nos[1:]) if len(cleaned_case_nos) > 1 else "Not found"
+        case_nos = header.case_numbers
+        case_no = case_nos[0] if case_nos else "Not found"
+        other_case_nos = ", ".join(case_nos[1:]) if len(case_nos) > 1 else "Not found"
 
         # --- Judgment Date ---
-        date_patterns = [
-            r'\b(\d{1,2}(?:st|nd|rd|th)?\s+[A-Za-z]+\s+\d{4})\b',
-            r'\b([A-Za-z]+\s+\d{1,2}(?:st|nd|rd|th)?,\s+\d{4})\b',
-            r'\b(\d{1,2}\s+[A-Za-z]+\s+\d{4})\b',
-            r'\b([A-Za-z]+\s+\d{4})\b',
-            r'\b(\d{1,2}[-/]\d{1,2}[-/]\d{4})\b',
-            r'\b(\d{1,2}\s+[A-Za-z]{3,}\s+\d{4})\b',
-            r'\b(\d{1,2}\s+[A-Za-z]{3}\s+\d{4})\b',
-            r'\b([A-Za-z]{3,}\s+\d{1,2}(?:st|nd|rd|th)?\s+\d{4})\b',
-            r'\b(?:\d{1,2}(?:st|nd|rd|th)?\s+day\s+of\s+([A-Za-z]+)\s*,\s*(\d{4}))\b',
-            r'\b(?:[A-Za-z]+\s+day\s+of\s+([A-Za-z]+)\s*,\s*(\d{4}))\b'
-        ]
         judgement_date = month = year = "Not found"
-        for pattern in date_patterns:
-            match = re.search(pattern, all_text, re.IGNORECASE)
-            if match:
-                if match.lastindex == 1:
-                    date_str = match.group(1).replace(",", "").strip()
-                else:
-                    date_str = f"{match.group(1)} {match.group(2)}".replace(",", "").strip()
-
-                month_abbr = {
-                    'jan': 'January', 'feb': 'February', 'mar': 'March', 'apr': 'April',
-                    'may': 'May', 'jun': 'June', 'jul': 'July', 'aug': 'August',
-                    'sep': 'September', 'oct': 'October', 'nov': 'November', 'dec': 'December'
-                }
-                for abbr, full in month_abbr.items():
-                    date_str = re.sub(rf'\b{abbr}\b', full, date_str, flags=re.IGNORECASE)
-                for fmt in [
-                    "%d %B %Y", "%B %d %Y", "%B %Y", "%d-%m-%Y", "%d/%m/%Y", "%d %b %Y", "%B %d%Y"
-                ]:
-                    try:
-                        dt = datetime.strptime(date_str, fmt)
-                        judgement_date = dt.strftime("%d-%m-%Y") if fmt != "%B %Y" else f"01-{dt.strftime('%m-%Y')}"
-                        month = dt.strftime("%B")
-                        year = dt.strftime("%Y")
-                        break
-                    except ValueError:
-                        continue
-                if judgement_date != "Not found":
-                    break
+        date_token = first_date(scan_dates(all_text))
+        if date_token:
+            judgement_date = date_token.date.strftime("%d-%m-%Y")
+            month = date_token.date.strftime("%B")
+            year = date_token.date.strftime("%Y")
 
         # --- Extract Headnotes ---
         headnotes_data = extract_headnotes(pdf_path)
@@ -174,41 +98,9 @@ def extract_legal_details(pdf_path: str) -> dict:
             headnotes_content = "Not found"
             headnote_extraction_method = "None"
         
-        # Split headnotes if too long
-        headnotes_part1 = headnotes_content
-        headnotes_part2 = ""
-        max_cell_length = 32767  # Excel cell limit
-        if len(headnotes_content) > max_cell_length:
-            headnotes_part1 = headnotes_content[:max_cell_length]
-            headnotes_part2 = headnotes_content[max_cell_length:]
-
-        # --- Document Type Detection ---
-        lines = type_text.splitlines()
-        doc_type = "Judgment"  # Default
-        for i, line in enumerate(lines):
-            if "judgment / order of the supreme court" in line.lower():
-                for j in range(1, 3):
-                    if i + j < len(lines):
-                        next_line = lines[i + j].strip().lower()
-                        if "order" == next_line or next_line.startswith("order"):
-                            doc_type = "Order"
-                            break
-                break
-
-        # --- Judge Names & No. of Judges ---
-        judge_names = []
-        judge_text = "".join([doc[i].get_text() for i in range(min(3, len(doc)))])
-        match = re.search(r'\[([\w\s\.\*&\-\,]+(?:\s+and\s+[\w\s\.\*&\-]+)?)\s*,?\s*(?:J\.J\.|J\.|CJI)\s*\]', judge_text, re.IGNORECASE)
-
-        if match:
-            raw_judges = match.group(1)
-            judge_parts = re.split(r'\s+and\s+|,', raw_judges)
-            for name in judge_parts:
-                clean_name = name.strip()
-                # Exclude judge suffixes
-                if clean_name and clean_name.upper() not in ["J", "JJ", "CJI"] and clean_name not in judge_names:
-                    judge_names.append(clean_name)
-
+        # --- Document Type, Judge Names & No. of Judges ---
+        doc_type = header.document_type
+        judge_names = list(header.bench)
         no_of_judges = len(judge_names)
 
         result = {
@@ -218,18 +110,13 @@ def extract_legal_details(pdf_path: str) -> dict:
             "Judgment Date (Program 1)": judgement_date,
             "Month (Program 1)": month,
             "Year (Program 1)": year,
-            "Headnotes (Program 1)": headnotes_part1,
+            "Headnotes (Program 1)": headnotes_content,
             "Headnote Extraction Method (Program 1)": headnote_extraction_method,
             "Type (Program 1)": doc_type,
             "Judge Names (Program 1)": ", ".join(judge_names) if judge_names else "Not found",
             "No. of Judges (Program 1)": str(no_of_judges) if no_of_judges > 0 else "Not found",
             "Page Count (Program 1)": str(total_pages)
         }
-        
-        if headnotes_part2:
-            result["Headnotes_1 (Program 1)"] = headnotes_part2
-        else:
-            result["Headnotes_1 (Program 1)"] = ""
 
         return result
     except Exception as e:
@@ -238,9 +125,11 @@ def extract_legal_details(pdf_path: str) -> dict:
 
 # Export to Excel (append mode)
 def export_to_excel(data: dict, output_path: str):
+    import pandas as pd
+
     try:
-        # Convert dictionary to DataFrame
-        df = pd.DataFrame([data])
+        # Convert dictionary to DataFrame, moving text past the Excel cell limit into overflow columns
+        df = pd.DataFrame([split_row(data)])
         
         # Check if Excel file exists
         if os.path.exists(output_path):
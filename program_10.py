@@ -1,17 +1,14 @@
 import logging
-import pdfplumber
 import re
+from page_text_store import get_page_texts
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 def extract_text_from_pdf(pdf_file_path):
     try:
         text = ""
-        with pdfplumber.open(pdf_file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                text += page_text
+        for page_text in get_page_texts(pdf_file_path):
+            text += page_text
         return text.strip()
     except Exception as e:
         logger.error(f"Error extracting text from PDF {pdf_file_path}: {str(e)}")
@@ -1,27 +1,17 @@
 import logging
-import pdfplumber
 import re
-import spacy
+from nlp_models import get_nlp
+from page_text_store import get_page_texts
+from pipeline_logging import summarize
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except Exception as e:
-    logger.error(f"Failed to load spaCy model 'en_core_web_sm': {str(e)}")
-    nlp = None
-
 # Extract text from PDF
 def extract_text_from_pdf(pdf_file_path: str) -> str:
     try:
         text = ""
-        with pdfplumber.open(pdf_file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                text += page_text + "\n"
+        for page_text in get_page_texts(pdf_file_path):
+            text += page_text + "\n"
         if not text.strip():
             logger.warning(f"No text extracted from PDF {pdf_file_path}.")
             return ""
@@ -53,7 +43,7 @@ def is_reference_text(text: str) -> bool:
 # Extract case result
 def extract_case_result(pdf_path: str) -> dict:
     try:
-        if not nlp:
+        if not get_nlp():
             return {"case_result": "spaCy model 'en_core_web_sm' not loaded"}
         
         text = extract_text_from_pdf(pdf_path)
@@ -141,7 +131,7 @@ def extract_case_result(pdf_path: str) -> dict:
                 if match:
                     result_text = sentence[match.end():].strip()
                     case_result = f"Result of the case: {result_text}."
-                    logger.info(f"Explicit case result found: {case_result}")
+                    logger.info(f"Explicit case result found: {summarize(case_result)}")
                     return {"case_result": case_result}
         
         # If not found, extract specific outcomes
@@ -174,7 +164,7 @@ def extract_case_result(pdf_path: str) -> dict:
             else:
                 case_result = "Not Found"
         
-        logger.info(f"Extracted case result from {pdf_path}: {case_result}")
+        logger.info(f"Extracted case result from {pdf_path}: {summarize(case_result)}")
         return {"case_result": case_result}
     except Exception as e:
         logger.error(f"Error extracting case result from {pdf_path}: {e}")
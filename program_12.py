@@ -1,21 +1,17 @@
 import logging
-import pdfplumber
 import re
-import pandas as pd
 import os
+from page_text_store import get_page_texts
+from pipeline_logging import summarize
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Extract text from each page of the PDF
 def extract_text_by_page(pdf_path: str) -> list:
     try:
         pages_text = []
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                pages_text.append(page_text.strip())
+        for page_text in get_page_texts(pdf_path):
+            pages_text.append(page_text.strip())
         if not pages_text or all(not page for page in pages_text):
             logger.warning(f"No text extracted from PDF {pdf_path}.")
             return []
@@ -35,6 +31,9 @@ def split_into_paragraphs(text: str) -> list:
     )
     return [p.strip() for p in paragraphs if p and p.strip()]
 
+# Without a conclusion heading, use the last two pages (off in the "fast" profile)
+LAST_PAGES_FALLBACK = True
+
 # Extract conclusion
 def extract_conclusion(pages_text: list) -> str:
     conclusion = "Not Found"
@@ -75,7 +74,7 @@ def extract_conclusion(pages_text: list) -> str:
         if conclusion_found:
             break
 
-    if not conclusion_found:
+    if not conclusion_found and LAST_PAGES_FALLBACK:
         conclusion = ""
         if total_pages >= 2:
             conclusion = pages_text[-2] + "\n" + pages_text[-1]
@@ -102,7 +101,7 @@ def extract_case_details(pdf_path: str) -> dict:
             "Conclusion (Program 12)": conclusion
         }
 
-        logger.info(f"Extracted case details from {pdf_path}: {details}")
+        logger.info(f"Extracted case details from {pdf_path}: {summarize(details)}")
         return details
     except Exception as e:
         logger.error(f"Error in Program 12 for {pdf_path}: {e}")
@@ -110,6 +109,8 @@ def extract_case_details(pdf_path: str) -> dict:
 
 # Export to Excel (append mode)
 def export_to_excel(data: dict, output_path: str):
+    import pandas as pd
+
     try:
         # Convert dictionary to DataFrame
         df = pd.DataFrame([data])
@@ -1,82 +1,23 @@
-import pdfplumber
 import re
-import spacy
 import logging
-import sys
-import pandas as pd
 from typing import Optional, Tuple
 import os
+from date_scanner import scan_dates
+from header_parser import CASE_CATEGORIES, SUBCATEGORY_SHORT_FORMS, DocumentHeader, find_subcategory, normalize_subcategory, parse_header
+from nlp_models import require_nlp
+from page_text_store import get_page_texts
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-    logger.info("spaCy model loaded successfully.")
-except Exception as e:
-    logger.error(f"Failed to load spaCy model: {e}")
-    sys.exit(1)
-
-# Case type mappings
-CASE_CATEGORIES = {
-    "Civil": [
-        "Advisory Jurisdiction", "Arbitration Petition", "Civil Appeal", "Civil Miscellaneous Petition",
-        "Original Suit", "Review Petition (Civil)", "Special Leave Petition (Civil)",
-        "Suo Motu Writ Petition (Civil)", "Suo Motu Contempt Petition (Civil)",
-        "Suo Motu Transfer Petition (Civil)", "Transfer Petition (Civil)", "Transferred Case (Civil)",
-        "Writ Petition (Civil)", "Contempt Petition (Civil)", "Curative Petition (Civil)",
-        "Election Petition (Civil)"
-    ],
-    "Criminal": [
-        "Review Petition (Criminal)", "Special Leave Petition (Criminal)", "Suo Motu Writ (Criminal)",
-        "Suo Motu Contempt Petition (Criminal)", "Suo Motu Transfer Petition (Criminal)",
-        "Suo Motu Writ Petition (Criminal)", "Transfer Petition (Criminal)", "Transferred Case (Criminal)",
-        "Writ Petition (Criminal)", "Contempt Petition (Criminal)", "Criminal Appeal",
-        "Criminal Miscellaneous Petition", "Curative Petition (Criminal)", "Death Reference Case",
-        "Motion (CRL)"
-    ],
-    "Others": [
-        "Ref. U/A 317(1)", "Ref. U/S 14 RTI", "Ref. U/S 143", "Ref. U/S 17 RTI", "Special Reference Case",
-        "Tax Reference Case", "Disciplinary Jurisdiction", "Excise Reference No", "Habeas Corpus Petition",
-        "Miscellaneous Application", "All Sea"
-    ]
-}
-
-# Short form to full form mapping (case-insensitive)
-SUBCATEGORY_SHORT_FORMS = {
-    "writ petition (c)": "Writ Petition (Civil)",
-    "smw (civil)": "Suo Motu Writ Petition (Civil)",
-    "smw (crl)": "Suo Motu Writ (Criminal)",
-    "writ petition (crl)": "Writ Petition (Criminal)",
-    "slp (civil)": "Special Leave Petition (Civil)",
-    "slp (crl)": "Special Leave Petition (Criminal)",
-    "suo motu writ (civil)": "Suo Motu Writ Petition (Civil)",
-    "suo motu writ (crl)": "Suo Motu Writ (Criminal)",
-    "motion (crl)": "Motion (CRL)",
-    "ref. u/a 317(1)": "Ref. U/A 317(1)",
-    "ref. u/s 14 rti": "Ref. U/S 14 RTI",
-    "ref. u/s 143": "Ref. U/S 143",
-    "ref. u/s 17 rti": "Ref. U/S 17 RTI"
-}
-
-# Normalize subcategory to full form
-def normalize_subcategory(subcat: str) -> str:
-    subcat_lower = subcat.lower().strip()
-    for short_form, full_form in SUBCATEGORY_SHORT_FORMS.items():
-        if re.fullmatch(re.escape(short_form), subcat_lower, re.IGNORECASE):
-            return full_form
-    return subcat
+# spaCy NER fallbacks for the case title and party names (off in the "fast" profile)
+NER_FALLBACK = True
 
 # Extract text from PDF
 def extract_text_from_pdf(pdf_file: str) -> str:
     try:
         text = ""
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                text += page_text + "\n"
+        for page_text in get_page_texts(pdf_file):
+            text += page_text + "\n"
         if not text.strip():
             logger.warning("No text extracted from PDF.")
             return ""
@@ -98,194 +39,67 @@ def split_into_paragraphs(text: str) -> list:
     return result
 
 # Extract Case Title, Citation, and Potential Subcategory
-def extract_case_title(text: str, first_paragraph: str) -> Tuple[str, str, Optional[str]]:
+def extract_case_title(text: str, first_paragraph: str, header: DocumentHeader) -> Tuple[str, str, Optional[str]]:
+    citation = header.citation
+    
+    # Title parsed from the first-page header (single-line, split or "In Re")
+    if header.title:
+        logger.info(f"Extracted case title (header): Citation='{citation}', Title='{header.title}', Subcategory='{header.subcategory}'")
+        return citation, header.title, header.subcategory
+    
     # Clean text to remove non-printable and non-ASCII characters
     cleaned_text = re.sub(r'[^\x20-\x7E\n\r\t]', '', text)
     first_page_lines = cleaned_text.splitlines()[:10]  # Check up to 10 lines
-    # Print first 7 lines to terminal
-    print(f"\nFirst 7 lines of extracted text:")
-    for i, line in enumerate(first_page_lines[:7], 1):
-        print(f"Line {i}: {line}")
-    
-    # Log first 7 lines for debugging
     logger.debug(f"Raw first 7 lines: {first_page_lines[:7]}")
-    
-    # Look for citation in the first line
-    citation = "Not found"
-    title = "Not found"
-    subcategory = None
-    citation_pattern = r'\[\d{4}\]\s+\d+\s+S\.C\.R\.\s+\d+\s*:\s*\d+\s+INSC\s+\d+'
-    all_subcats = list(CASE_CATEGORIES["Civil"]) + list(CASE_CATEGORIES["Criminal"]) + list(CASE_CATEGORIES["Others"])
-    all_subcats.extend(SUBCATEGORY_SHORT_FORMS.keys())
-    # Pattern for subcategories (standalone or in parentheses)
-    subcategory_pattern = r'\b(' + '|'.join(re.escape(subcat) for subcat in all_subcats) + r'|special\s*reference|reference\s*case|reference)\b\s*(?:no\.?\s*[0-9/]+\s*(?:of\s*\d{4})?)?'
-    paren_subcat_pattern = r'\(\s*(' + '|'.join(re.escape(subcat) for subcat in all_subcats) + r'|special\s*reference|reference\s*case|reference)\s*(?:no\.?\s*[0-9/]+\s*(?:of\s*\d{4})?)?\s*\)'
-    
-    try:
-        first_line = first_page_lines[0].strip() if first_page_lines else ""
-        citation_match = re.search(citation_pattern, first_line, re.IGNORECASE)
-        if citation_match:
-            citation = citation_match.group(0).strip()
-            logger.debug(f"Found citation: '{citation}'")
-        
-        # Check first page text for single-line title
-        first_page_text = '\n'.join(first_page_lines)
-        title_pattern = r'([^\n]+?)\s+v(?:s|ersus)?\.?\s+([^\n\(]+)(?:\s*\((' + '|'.join(re.escape(subcat) for subcat in all_subcats) + r')\b\s*(?:no\.?\s*[0-9/]+\s*(?:of\s*\d{4})?)?\))?'
-        match = re.search(title_pattern, first_page_text, re.IGNORECASE)
-        if match:
-            filer = match.group(1).strip()
-            against = re.sub(r'\s*etc\.?$', '', match.group(2).strip(), flags=re.IGNORECASE)
-            title = f"{filer} v. {against}"
-            title = re.sub(r'\s+', ' ', title).strip()
-            title = re.sub(r'\s*\(.*?\)$', '', title).strip()
-            if match.group(3):
-                subcategory = normalize_subcategory(match.group(3).strip())
-                if subcategory in ["Special Reference", "Reference Case", "Reference"]:
-                    subcategory = "Special Reference Case"
-                logger.debug(f"Found subcategory in title: '{subcategory}'")
-            logger.info(f"Extracted case title (single-line): Citation='{citation}', Title='{title}', Subcategory='{subcategory}'")
-            return citation, title, subcategory
-        
-        # Line-by-line approach for split titles
-        next_lines = first_page_lines[1:8] if len(first_page_lines) > 1 else []
-        logger.debug(f"Next lines for title: {next_lines}")
-        for i, line in enumerate(next_lines):
-            line = line.strip()
-            versus_match = re.search(r'^\s*v(?:s|ersus)?\.?\s+(.+)', line, re.IGNORECASE)
-            if versus_match and i > 0:
-                first_party = next_lines[i-1].strip() if i-1 >= 0 else ""
-                second_party = re.sub(r'\s*etc\.?$', '', versus_match.group(1).strip(), flags=re.IGNORECASE)
-                # Check if second_party includes subcategory
-                subcat_match = re.search(r'(.+?)\s*\((' + '|'.join(re.escape(subcat) for subcat in all_subcats) + r')\b\s*(?:no\.?\s*[0-9/]+\s*(?:of\s*\d{4})?)?\)', second_party, re.IGNORECASE)
-                if subcat_match:
-                    second_party = subcat_match.group(1).strip()
-                    subcategory = normalize_subcategory(subcat_match.group(2).strip())
-                    if subcategory in ["Special Reference", "Reference Case", "Reference"]:
-                        subcategory = "Special Reference Case"
-                    logger.debug(f"Found subcategory in second party: '{subcategory}'")
-                if first_party and second_party:
-                    title = f"{first_party} v. {second_party}"
-                    title = re.sub(r'\s+', ' ', title).strip()
-                    title = re.sub(r'\s*\(.*?\)$', '', title).strip()
-                    logger.info(f"Extracted case title (line-by-line): Citation='{citation}', Title='{title}', Subcategory='{subcategory}'")
-                    return citation, title, subcategory
-        
-        # Check for "In Re" cases
-        combined_lines = ' '.join(line.strip() for line in next_lines if line.strip())
-        combined_lines = re.sub(r'\s+', ' ', combined_lines).strip()
-        in_re_pattern = r'(In\s+Re[\s:]+)(.+?)(?=\s*(?:etc\.|\(|$))'
-        in_re_match = re.search(in_re_pattern, combined_lines, re.IGNORECASE)
-        if in_re_match:
-            title = f"In Re: {in_re_match.group(2).strip()}"
-            title = re.sub(r'\s*etc\.?$', '', title, flags=re.IGNORECASE)
-            title = re.sub(r'\s+', ' ', title).strip()
-            # Check same line and next lines for subcategory
-            title_line_index = next(i for i, line in enumerate(first_page_lines) if re.search(in_re_pattern, line, re.IGNORECASE))
-            title_line = first_page_lines[title_line_index].strip()
-            subcat_match = re.search(paren_subcat_pattern, title_line, re.IGNORECASE)
-            if subcat_match:
-                subcategory = normalize_subcategory(subcat_match.group(1).strip())
-                if subcategory in ["Special Reference", "Reference Case", "Reference"]:
-                    subcategory = "Special Reference Case"
-                logger.debug(f"Found subcategory in In Re title line: '{subcategory}'")
-            else:
-                # Check subsequent lines (up to 7)
-                for line in first_page_lines[title_line_index + 1:8]:
-                    # Try both patterns for flexibility
-                    subcat_match = re.search(paren_subcat_pattern, line, re.IGNORECASE)
-                    if subcat_match:
-                        subcategory = normalize_subcategory(subcat_match.group(1).strip())
-                        if subcategory in ["Special Reference", "Reference Case", "Reference"]:
-                            subcategory = "Special Reference Case"
-                        logger.debug(f"Found subcategory after In Re on line {first_page_lines.index(line) + 1}: '{subcategory}'")
-                        break
-                    subcat_match = re.search(subcategory_pattern, line, re.IGNORECASE)
-                    if subcat_match:
-                        subcategory = normalize_subcategory(subcat_match.group(1).strip())
-                        if subcategory in ["Special Reference", "Reference Case", "Reference"]:
-                            subcategory = "Special Reference Case"
-                        logger.debug(f"Found subcategory after In Re on line {first_page_lines.index(line) + 1}: '{subcategory}'")
-                        break
-            logger.info(f"Extracted In Re case title: Citation='{citation}', Title='{title}', Subcategory='{subcategory}'")
-            return citation, title, subcategory
-    except Exception as e:
-        logger.error(f"Error in title parsing: {str(e)}")
+    next_lines = first_page_lines[1:8] if len(first_page_lines) > 1 else []
+    combined_lines = ' '.join(line.strip() for line in next_lines if line.strip())
+    combined_lines = re.sub(r'\s+', ' ', combined_lines).strip()
     
     # Fallback: spaCy-based entity recognition
-    try:
-        doc = nlp(combined_lines if combined_lines else first_paragraph[:200])
-        entities = [(ent.text, ent.label_) for ent in doc.ents if ent.label_ in ["PERSON", "ORG", "GPE"]]
-        if len(entities) >= 2:
-            filer = entities[0][0].strip()
-            against = re.sub(r'\s*etc\.?$', '', entities[1][0].strip(), flags=re.IGNORECASE)
-            title = f"{filer} v. {against}"
-            title = re.sub(r'\s*\(.*?\)$', '', title).strip()
-            title = re.sub(r'\s+', ' ', title).strip()
-            # Check next lines for subcategory
-            for line in next_lines:
-                subcat_match = re.search(paren_subcat_pattern, line, re.IGNORECASE)
-                if subcat_match:
-                    subcategory = normalize_subcategory(subcat_match.group(1).strip())
-                    if subcategory in ["Special Reference", "Reference Case", "Reference"]:
-                        subcategory = "Special Reference Case"
-                    logger.debug(f"Found subcategory in fallback: '{subcategory}'")
-                    break
-                subcat_match = re.search(subcategory_pattern, line, re.IGNORECASE)
-                if subcat_match:
-                    subcategory = normalize_subcategory(subcat_match.group(1).strip())
-                    if subcategory in ["Special Reference", "Reference Case", "Reference"]:
-                        subcategory = "Special Reference Case"
-                    logger.debug(f"Found subcategory in fallback: '{subcategory}'")
-                    break
-            logger.info(f"Extracted case title (spaCy-based): Citation='{citation}', Title='{title}', Subcategory='{subcategory}'")
-            return citation, title, subcategory
-    except Exception as e:
-        logger.error(f"Error in spaCy-based title parsing: {str(e)}")
+    if NER_FALLBACK:
+        try:
+            doc = require_nlp()(combined_lines if combined_lines else first_paragraph[:200])
+            entities = [(ent.text, ent.label_) for ent in doc.ents if ent.label_ in ["PERSON", "ORG", "GPE"]]
+            if len(entities) >= 2:
+                filer = entities[0][0].strip()
+                against = re.sub(r'\s*etc\.?$', '', entities[1][0].strip(), flags=re.IGNORECASE)
+                title = f"{filer} v. {against}"
+                title = re.sub(r'\s*\(.*?\)$', '', title).strip()
+                title = re.sub(r'\s+', ' ', title).strip()
+                subcategory = find_subcategory(next_lines)
+                logger.info(f"Extracted case title (spaCy-based): Citation='{citation}', Title='{title}', Subcategory='{subcategory}'")
+                return citation, title, subcategory
+        except Exception as e:
+            logger.error(f"Error in spaCy-based title parsing: {str(e)}")
     
     # Fallback: Clean combined lines or first paragraph
     logger.debug("Falling back to combined lines or first paragraph")
     title = combined_lines if combined_lines else first_paragraph.strip()[:100]
     title = re.sub(r'\s*\(.*no\.?\s*\d+.*|\s*\d{1,2}\s+[A-Za-z]+\s+20\d{2}.*|[\[].*J[\].].*$|\s*etc\.?$', '', title, flags=re.IGNORECASE)
     title = re.sub(r'\s+', ' ', title).strip()
-    # Check next lines for subcategory
-    for line in next_lines:
-        subcat_match = re.search(paren_subcat_pattern, line, re.IGNORECASE)
-        if subcat_match:
-            subcategory = normalize_subcategory(subcat_match.group(1).strip())
-            if subcategory in ["Special Reference", "Reference Case", "Reference"]:
-                subcategory = "Special Reference Case"
-            logger.debug(f"Found subcategory in final fallback: '{subcategory}'")
-            break
-        subcat_match = re.search(subcategory_pattern, line, re.IGNORECASE)
-        if subcat_match:
-            subcategory = normalize_subcategory(subcat_match.group(1).strip())
-            if subcategory in ["Special Reference", "Reference Case", "Reference"]:
-                subcategory = "Special Reference Case"
-            logger.debug(f"Found subcategory in final fallback: '{subcategory}'")
-            break
+    subcategory = find_subcategory(next_lines)
     logger.info(f"Extracted fallback title: Citation='{citation}', Title='{title}', Subcategory='{subcategory}'")
     return citation, title, subcategory
 
+# Words that mark a date as a hearing date when they directly precede it
+HEARING_CONTEXT_PATTERN = re.compile(r'(?:hearing|heard|reserved|arguments\s*advanced|court\s*convened)\s*(?:on|dated)?\s*$', re.IGNORECASE)
+HEARING_CONTEXT_WINDOW = 40
+
 # Extract hearing dates and number of hearings
 def extract_hearing_dates(text: str) -> Tuple[list, int]:
-    date_pattern = r'\d{1,2}(?:st|nd|rd|th)?\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}|\d{1,2}[/-]\d{1,2}[/-]\d{4}'
     hearing_dates = []
-    hearing_context_pattern = r'(hearing|heard|reserved|arguments\s*advanced|court\s*convened)\s*(?:on|dated)?\s*(' + date_pattern + ')'
+    full_dates = [token for token in scan_dates(text) if token.form in ("day_month_year", "month_day_year", "numeric")]
     try:
-        matches = re.findall(hearing_context_pattern, text, re.IGNORECASE)
-        hearing_dates.extend([match[1] for match in matches])
+        for token in full_dates:
+            context = text[max(0, token.start - HEARING_CONTEXT_WINDOW):token.start]
+            if HEARING_CONTEXT_PATTERN.search(context):
+                hearing_dates.append(token.text)
     except Exception as e:
         logger.error(f"Error in hearing dates regex: {str(e)}")
     
+    # Fallback: full dates on the opening pages
     if not hearing_dates:
-        try:
-            all_dates = re.findall(date_pattern, text, re.IGNORECASE)
-            doc = nlp(text[:5000])
-            for ent in doc.ents:
-                if ent.label_ == "DATE" and ent.text in all_dates:
-                    hearing_dates.append(ent.text)
-        except Exception as e:
-            logger.error(f"Error in spaCy date extraction: {str(e)}")
+        hearing_dates = [token.text for token in full_dates if token.end <= 5000]
     
     hearing_dates = list(dict.fromkeys(hearing_dates))
     num_hearings = len(hearing_dates) if hearing_dates else 0
@@ -490,9 +304,9 @@ def extract_party_info(text: str, title: str) -> dict:
                 logger.error(f"Error in keyword pattern regex for {role}: {str(e)}")
 
     # Fallback to spaCy
-    if not filer_name or not against_name:
+    if NER_FALLBACK and (not filer_name or not against_name):
         try:
-            doc = nlp(text[:5000])
+            doc = require_nlp()(text[:5000])
             entities = [(ent.text, ent.label_) for ent in doc.ents if ent.label_ in ['PERSON', 'ORG', 'GPE']]
             for i, (ent_text, ent_label) in enumerate(entities):
                 name = clean_party_name(remove_statute_names(ent_text))
@@ -555,7 +369,7 @@ def extract_parties(pdf_path: str) -> dict:
         }
         
         # Case Title, Citation, and Subcategory
-        citation, case_title, extracted_subcategory = extract_case_title(text, first_paragraph)
+        citation, case_title, extracted_subcategory = extract_case_title(text, first_paragraph, parse_header(pdf_path))
         details['Citation (Program 2)'] = citation
         details['Case Title (Program 2)'] = case_title
         
@@ -601,6 +415,8 @@ def extract_parties(pdf_path: str) -> dict:
 
 # Export to Excel
 def export_to_excel(data: dict, output_path: str):
+    import pandas as pd
+
     try:
         df = pd.DataFrame([data])
         if os.path.exists(output_path):
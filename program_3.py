@@ -1,32 +1,29 @@
-import pdfplumber
 import re
-import spacy
-import langdetect
+import numpy as np
 import logging
-import pandas as pd
 import os
+from typing import List, Tuple
+from statute_gazetteer import find_act_ids
+from nlp_models import require_nlp
+from page_text_store import get_page_texts
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-    logger.info("spaCy model loaded successfully.")
-except Exception as e:
-    logger.error(f"Failed to load spaCy model: {e}")
-    exit(1)
+# spaCy runs over paragraph-aligned chunks: whole judgments are slow in one piece
+# and long ones exceed nlp.max_length
+NER_CHUNK_SIZE = 100000
+NER_PROCESSES = 1
+NER_BATCH_SIZE = 4
+# spaCy LAW entities on top of the section patterns (off in the "fast" profile)
+NER_ENABLED = True
 
 # Extract text from PDF
 def extract_text_from_pdf(pdf_file: str) -> str:
     try:
         text = ""
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                if page_text:
-                    text += page_text + "\n"
+        for page_text in get_page_texts(pdf_file):
+            if page_text:
+                text += page_text + "\n"
         return text.strip()
     except Exception as e:
         logger.error(f"Error extracting text from PDF {pdf_file}: {str(e)}")
@@ -43,72 +40,109 @@ def split_into_paragraphs(text: str) -> list:
     )
     return [p.strip() for p in paragraphs if p and p.strip()]
 
-# Check if a paragraph is a reference
-def is_reference_paragraph(paragraph: str) -> bool:
-    reference_indicators = [
-        r"\bAIR\s+\d{4}\b",
-        r"\bSCC\s+\d+\b",
-        r"\b\d{4}\s+SCR\s+\d+\b",
-        r"\[\d{4}\]\s+\d+\s+SC\s+\d+\b",
-        r"\bvs?\.\s+[A-Za-z\s]+,\s*\d{4}\b",
-        r"\bquoted\s+in\b",
-        r"\brelied\s+upon\b",
-        r"\bcase\s+of\s+[A-Za-z\s]+\s+v\s+",
-        r"\breferred\s+to\s+in\b"
-    ]
-    for pattern in reference_indicators:
-        if re.search(pattern, paragraph, re.IGNORECASE):
-            return True
-    return False
+# Split text into chunks of at most chunk_size characters, cutting at paragraph
+# boundaries where possible; returns (offset, chunk) pairs
+def chunk_text(text: str, chunk_size: int = NER_CHUNK_SIZE) -> List[Tuple[int, str]]:
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            cut = text.rfind("\n\n", start, end)
+            if cut <= start:
+                cut = text.rfind("\n", start, end)
+            if cut > start:
+                end = cut + 1
+        chunks.append((start, text[start:end]))
+        start = end
+    return chunks
 
-# Extract sections (laws, articles, rules, etc.)
+# Run NER over the chunks with nlp.pipe and return (text, start, end, label) with document offsets
+def extract_entities(text: str, labels: Tuple[str, ...] = ("LAW",), chunk_size: int = None, n_process: int = None, batch_size: int = None) -> List[Tuple[str, int, int, str]]:
+    chunks = chunk_text(text, chunk_size or NER_CHUNK_SIZE)
+    docs = require_nlp().pipe(
+        (chunk for _, chunk in chunks),
+        n_process=n_process or NER_PROCESSES,
+        batch_size=batch_size or NER_BATCH_SIZE
+    )
+    entities = []
+    for (offset, _), doc in zip(chunks, docs):
+        for ent in doc.ents:
+            if ent.label_ in labels:
+                entities.append((ent.text, offset + ent.start_char, offset + ent.end_char, ent.label_))
+    return entities
+
+# Patterns for sections (laws, articles, rules, etc.)
+SECTION_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r"(Section\s+\d+[A-Za-z]?(?:\(\d+\))?\s*(?:of\s+)?(?:the\s+)?([A-Za-z\s]+(?:Act|Code|Rules|Regulation|Ordinance)(?:,\s*\d{4})?))",
+    r"(Article\s+\d+[A-Za-z]?(?:\(\d+\))?\s*(?:of\s+)?(?:the\s+)?([A-Za-z\s]+(?:Constitution)(?:,\s*\d{4})?))",
+    r"(Rule\s+\d+[A-Za-z]?(?:\(\d+\))?\s*(?:of\s+)?(?:the\s+)?([A-Za-z\s]+(?:Rules|Regulations)(?:,\s*\d{4})?))",
+    r"\b(Sec\.\s+\d+[A-Za-z]?(?:\(\d+\))?)\b",
+    r"\b(Art\.\s+\d+[A-Za-z]?(?:\(\d+\))?)\b",
+    r"(Section\s+\d+[A-Za-z]?/[A-Za-z\s]+(?:Act|Code|Rules|Regulation|Ordinance)(?:,\s*\d{4})?)",
+    r"(Clause\s+\d+[A-Za-z]?\s*(?:of\s+)?(?:the\s+)?([A-Za-z\s]+(?:Act|Code|Rules|Constitution)(?:,\s*\d{4})?))"
+]]
+
+# Extract sections (laws, articles, rules, etc.): one pass per pattern over the
+# full text plus spaCy LAW entities, de-duplicated in first-seen order
 def extract_sections(text: str) -> str:
-    section_patterns = [
-        r"(Section\s+\d+[A-Za-z]?(?:\(\d+\))?\s*(?:of\s+)?(?:the\s+)?([A-Za-z\s]+(?:Act|Code|Rules|Regulation|Ordinance)(?:,\s*\d{4})?))",
-        r"(Article\s+\d+[A-Za-z]?(?:\(\d+\))?\s*(?:of\s+)?(?:the\s+)?([A-Za-z\s]+(?:Constitution)(?:,\s*\d{4})?))",
-        r"(Rule\s+\d+[A-Za-z]?(?:\(\d+\))?\s*(?:of\s+)?(?:the\s+)?([A-Za-z\s]+(?:Rules|Regulations)(?:,\s*\d{4})?))",
-        r"\b(Sec\.\s+\d+[A-Za-z]?(?:\(\d+\))?)\b",
-        r"\b(Art\.\s+\d+[A-Za-z]?(?:\(\d+\))?)\b",
-        r"(Section\s+\d+[A-Za-z]?/[A-Za-z\s]+(?:Act|Code|Rules|Regulation|Ordinance)(?:,\s*\d{4})?)",
-        r"(Clause\s+\d+[A-Za-z]?\s*(?:of\s+)?(?:the\s+)?([A-Za-z\s]+(?:Act|Code|Rules|Constitution)(?:,\s*\d{4})?))"
-    ]
+    sections = {}
+    for pattern in SECTION_PATTERNS:
+        for match in pattern.finditer(text):
+            sections.setdefault(match.group(0).strip(), None)
     
-    sections = []
-    for pattern in section_patterns:
-        matches = re.finditer(pattern, text, re.IGNORECASE)
-        for match in matches:
-            sections.append(match.group(0).strip())
-    
-    doc = nlp(text)
-    for ent in doc.ents:
-        if ent.label_ == "LAW" and ent.text not in sections:
-            sections.append(ent.text)
-    
-    for para in split_into_paragraphs(text):
-        if is_reference_paragraph(para):
-            continue
-        for pattern in section_patterns:
-            matches = re.finditer(pattern, para, re.IGNORECASE)
-            for match in matches:
-                if match.group(0) not in sections:
-                    sections.append(match.group(0).strip())
+    if NER_ENABLED:
+        for ent_text, _, _, _ in extract_entities(text, ("LAW",)):
+            sections.setdefault(ent_text, None)
     
     return ", ".join(sections) if sections else "Not Found"
 
-# Detect document language
+# Unicode script ranges (inclusive code points) used to tell languages apart without langdetect
+SCRIPT_RANGES = {
+    "Latin": [(0x41, 0x5A), (0x61, 0x7A), (0xC0, 0x24F)],
+    "Devanagari": [(0x900, 0x97F)],
+    "Tamil": [(0xB80, 0xBFF)]
+}
+SCRIPT_LANGUAGES = {"Latin": "English", "Devanagari": "Hindi", "Tamil": "Tamil"}
+SCRIPT_DOMINANCE = 0.9
+LANGUAGE_SAMPLE_SIZE = 1000
+
+# Count the characters of each script in the text
+def script_histogram(text: str) -> dict:
+    code_points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    return {
+        script: int(sum(np.count_nonzero((code_points >= low) & (code_points <= high)) for low, high in ranges))
+        for script, ranges in SCRIPT_RANGES.items()
+    }
+
+# Detect document language from its script, using langdetect only when no script dominates
 def detect_language(text: str) -> str:
+    sample = text[:LANGUAGE_SAMPLE_SIZE]
+    histogram = script_histogram(sample)
+    total = sum(histogram.values())
+    if total == 0:
+        return "English"
+    script, count = max(histogram.items(), key=lambda item: item[1])
+    if count / total >= SCRIPT_DOMINANCE:
+        return SCRIPT_LANGUAGES[script]
+    # Imported here: most documents never reach langdetect
+    import langdetect
+
+    # Make langdetect deterministic between runs
+    langdetect.DetectorFactory.seed = 0
     try:
-        lang = langdetect.detect(text[:1000])
-        if lang == "en":
-            return "English"
-        elif lang == "hi":
-            return "Hindi"
-        elif lang == "ta":
-            return "Tamil"
-        else:
-            return lang.capitalize()
-    except:
+        lang = langdetect.detect(sample)
+    except langdetect.LangDetectException as e:
+        logger.warning(f"langdetect failed, defaulting to English: {e}")
         return "English"
+    if lang == "en":
+        return "English"
+    elif lang == "hi":
+        return "Hindi"
+    elif lang == "ta":
+        return "Tamil"
+    else:
+        return lang.capitalize()
 
 # Main extraction function
 def extract_judges(pdf_path: str) -> dict:
@@ -121,8 +155,11 @@ def extract_judges(pdf_path: str) -> dict:
         if not paragraphs:
             return {"Error (Program 3)": "No paragraphs extracted from PDF"}
         
+        sections = extract_sections(text)
+        act_ids = find_act_ids(sections)
         details = {
-            "Section (Law Mentioned) (Program 3)": extract_sections(text),
+            "Section (Law Mentioned) (Program 3)": sections,
+            "Act IDs (Program 3)": ", ".join(act_ids) if act_ids else "Not Found",
             "Language of the Document (Program 3)": detect_language(text),
             "Country (Program 3)": "India"
         }
@@ -134,6 +171,8 @@ def extract_judges(pdf_path: str) -> dict:
 
 # Export to Excel (append mode)
 def export_to_excel(data: dict, output_path: str):
+    import pandas as pd
+
     try:
         # Convert dictionary to DataFrame
         df = pd.DataFrame([data])
@@ -1,32 +1,105 @@
-import PyPDF2
 import re
 import logging
 import sys
-import pandas as pd
 import os
+from bisect import bisect_left
+from statute_gazetteer import find_act_ids
+from page_text_store import get_page_texts
+from pipeline_logging import summarize
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Function to extract text from PDF
 def extract_text_from_pdf(pdf_path: str) -> str:
     try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                extracted = page.extract_text() or ""
-                text += extracted + " "
-            if not text.strip():
-                logger.warning("No text extracted from PDF.")
-                return ""
-            logger.info(f"Extracted {len(text)} characters from PDF.")
-            return text
+        text = ""
+        for extracted in get_page_texts(pdf_path, "pypdf2"):
+            text += extracted + " "
+        if not text.strip():
+            logger.warning("No text extracted from PDF.")
+            return ""
+        logger.info(f"Extracted {len(text)} characters from PDF.")
+        return text
     except Exception as e:
         logger.error(f"Error reading PDF {pdf_path}: {e}")
         return ""
 
+# Pieces of the act/rule matcher. The old patterns ([A-Z][a-zA-Z\s]*(?:\s*\(...\))*\s*ACT...)
+# nest unbounded quantifiers and backtrack quadratically on long runs of words that
+# are not followed by the keyword; StatuteMatcher produces the same matches from
+# keyword anchors and one scan per word run.
+WORD_RUN = re.compile(r"[A-Z][a-zA-Z\s]*", re.IGNORECASE)
+LETTER = re.compile(r"[A-Z]", re.IGNORECASE)
+SPACES = re.compile(r"\s*")
+PAREN_GROUP = re.compile(r"\s*\([A-Za-z\s,]+\)", re.IGNORECASE)
+STATUTE_PREFIXES = [re.compile(prefix, re.IGNORECASE) for prefix in (r"A of\s+", r"like those contained in\s+", r"of\s+", r"s\s+")]
+
+
+class StatuteMatcher:
+    """Linear-time equivalent of re.findall for the act and rule patterns."""
+
+    def __init__(self, keyword: str):
+        tail = rf"(?:{keyword}|{keyword}S)(?:,\s+\d{{4}}|\s+\d{{4}}|,\s*\d{{4}}(?:\s*\([A-Za-z\s]+\))?)"
+        self.tail = re.compile(tail, re.IGNORECASE)
+        self.anchor = re.compile(rf"(?={tail})", re.IGNORECASE)
+
+    # End of "(...) (...) Keyword, YYYY" following a word run, trying the most parentheses first
+    def _tail_after_parens(self, text: str, pos: int):
+        positions = [pos]
+        while True:
+            match = PAREN_GROUP.match(text, positions[-1])
+            if not match:
+                break
+            positions.append(match.end())
+        for position in reversed(positions):
+            match = self.tail.match(text, SPACES.match(text, position).end())
+            if match:
+                return match.end()
+        return None
+
+    def findall(self, text: str) -> list:
+        anchors = [match.start() for match in self.anchor.finditer(text)]
+        results = []
+        pos = 0
+        while True:
+            run = WORD_RUN.search(text, pos)
+            if not run:
+                break
+            run_start, run_end = run.span()
+            paren_end = self._tail_after_parens(text, run_end)
+            # Greedy matching ends at the last keyword inside the run
+            i = bisect_left(anchors, run_end) - 1
+            last_anchor = anchors[i] if i >= 0 and anchors[i] > run_start else None
+
+            match_start = match_end = None
+            for prefix in STATUTE_PREFIXES + [None]:
+                if prefix:
+                    prefix_match = prefix.match(text, run_start)
+                    if not prefix_match:
+                        continue
+                    start = prefix_match.end()
+                else:
+                    start = run_start
+                if start >= run_end or not LETTER.match(text, start):
+                    continue
+                if paren_end is not None:
+                    match_start, match_end = start, paren_end
+                    break
+                if last_anchor is not None and last_anchor > start:
+                    match_start, match_end = start, self.tail.match(text, last_anchor).end()
+                    break
+
+            if match_start is None:
+                pos = run_end
+                continue
+            results.append(text[match_start:match_end])
+            pos = match_end
+        return results
+
+
+ACT_MATCHER = StatuteMatcher("ACT")
+RULE_MATCHER = StatuteMatcher("RULE")
+
 # Function to extract and categorize unique Acts, Rules, Laws, Procedures, Penal Codes, and Constitutions
 def extract_legal_references(pdf_path: str) -> dict:
     try:
@@ -37,17 +110,15 @@ def extract_legal_references(pdf_path: str) -> dict:
         # Preprocess text to handle line breaks
         text = re.sub(r'\n\s*', ' ', text)
 
-        # Regex patterns for each category
-        act_pattern = r'(?:(?:A of\s+|like those contained in\s+|of\s+|s\s+)?)([A-Z][a-zA-Z\s]*(?:\s*\([A-Za-z\s,]+\))*\s*(?:[Aa][Cc][Tt]|[Aa][Cc][Tt][Ss])(?:,\s+\d{4}|\s+\d{4}|,\s*\d{4}(?:\s*\([A-Za-z\s]+\))?))'
-        rule_pattern = r'(?:(?:A of\s+|like those contained in\s+|of\s+|s\s+)?)([A-Z][a-zA-Z\s]*(?:\s*\([A-Za-z\s,]+\))*\s*(?:[Rr][Uu][Ll][Ee]|[Rr][Uu][Ll][Ee][Ss])(?:,\s+\d{4}|\s+\d{4}|,\s*\d{4}(?:\s*\([A-Za-z\s]+\))?))'
+        # Regex patterns for the remaining categories (acts and rules use StatuteMatcher)
         law_pattern = r'(?:(?:A of\s+|like those contained in\s+|of\s+|s\s+)?)((?:[A-Z][a-zA-Z]+)\s*(?:[Ll][Aa][Ww]|[Ll][Aa][Ww][Ss])(?:,\s+\d{4}|\s+\d{4}|,\s*\d{4}(?:\s*\([A-Za-z\s]+\))?)?)'
         procedure_pattern = r'(?:(?:A of\s+|like those contained in\s+|of\s+|s\s+)?)((?:Code of Criminal Procedure|CrPC|Code of Civil Procedure|CPC),\s+\d{4})'
         penal_code_pattern = r'(?:(?:A of\s+|like those contained in\s+|of\s+|s\s+)?)((?:Penal Code|Indian Penal Code|IPC),\s+\d{4})'
         constitution_pattern = r'(?:(?:A of\s+|like those contained in\s+|of\s+|s\s+)?)((?:Constitution of India|Constitutional)\s*-\s*Article\s*\d+[A-Za-z]?(?:\s*\([A-Za-z\s]+\))?)'
 
         # Extract matches
-        acts_found = re.findall(act_pattern, text, re.IGNORECASE)
-        rules_found = re.findall(rule_pattern, text, re.IGNORECASE)
+        acts_found = ACT_MATCHER.findall(text)
+        rules_found = RULE_MATCHER.findall(text)
         laws_found = re.findall(law_pattern, text, re.IGNORECASE)
         procedures_found = re.findall(procedure_pattern, text, re.IGNORECASE)
         penal_codes_found = re.findall(penal_code_pattern, text, re.IGNORECASE)
@@ -70,6 +141,9 @@ def extract_legal_references(pdf_path: str) -> dict:
             unique_laws = sorted(list(set(law for law in laws_found if law.lower() not in unwanted_laws)))
             unique_laws = unique_laws if unique_laws else ["Not found"]
 
+        # Canonical IDs of the statutes behind the extracted references
+        act_ids = find_act_ids(" ; ".join(unique_acts + unique_rules + unique_procedures + unique_penal_codes + unique_constitutions))
+
         # Prepare output dictionary
         details = {
             "Acts (Program 4)": ", ".join(unique_acts) if unique_acts else "Not found",
@@ -77,11 +151,12 @@ def extract_legal_references(pdf_path: str) -> dict:
             "Laws (Program 4)": ", ".join(unique_laws) if unique_laws else "Not found",
             "Procedures (Program 4)": ", ".join(unique_procedures) if unique_procedures else "Not found",
             "Penal Codes (Program 4)": ", ".join(unique_penal_codes) if unique_penal_codes else "Not found",
-            "Constitutions (Program 4)": ", ".join(unique_constitutions) if unique_constitutions else "Not found"
+            "Constitutions (Program 4)": ", ".join(unique_constitutions) if unique_constitutions else "Not found",
+            "Act IDs (Program 4)": ", ".join(act_ids) if act_ids else "Not found"
         }
 
         # Log extracted references
-        logger.info(f"Extracted legal references from {pdf_path}: {details}")
+        logger.info(f"Extracted legal references from {pdf_path}: {summarize(details)}")
         return details
     except Exception as e:
         logger.error(f"Error in Program 4 for {pdf_path}: {e}")
@@ -89,6 +164,8 @@ def extract_legal_references(pdf_path: str) -> dict:
 
 # Export to Excel (append mode)
 def export_to_excel(data: dict, output_path: str):
+    import pandas as pd
+
     try:
         # Convert dictionary to DataFrame
         df = pd.DataFrame([data])
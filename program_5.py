@@ -1,23 +1,19 @@
-import pdfplumber
 import re
 import logging
-import pandas as pd
 import os
 from typing import List, Tuple
+from citation_parser import join_citations, parse_citations
+from page_text_store import get_page_texts
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Extract text from the PDF
 def extract_text_from_pdf(pdf_path: str) -> str:
     try:
         text = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                if page_text:
-                    text += page_text + "\n"
+        for page_text in get_page_texts(pdf_path):
+            if page_text:
+                text += page_text + "\n"
         if not text.strip():
             logger.warning(f"No text extracted from PDF {pdf_path}.")
             return ""
@@ -32,16 +28,20 @@ def split_into_paragraphs(text: str) -> List[str]:
     paragraphs = re.split(r'\n\s*\n|\n\s*\d+\.\s+', text)
     return [p.strip() for p in paragraphs if p.strip()]
 
+# Case names ("A v. B"); compiled once and only run on paragraphs that contain a "v." token
+CASE_NAME_PATTERN = re.compile(
+    r'(?:[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:vs?\.?|versus|v\/s)\s+(?:[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+&?\s*(?:Ors\.?|Others))?(?:\s*,\s*[0-9]{4})?(?:\s*\[[0-9]{4}\])?(?:\s+[A-Z]+\s+[A-Za-z]+)?)',
+    re.IGNORECASE
+)
+VERSUS_PATTERN = re.compile(r'\s(?:vs?\.?|versus|v\/s)\s', re.IGNORECASE)
+
 def find_citations_in_paragraphs(paragraphs: List[str]) -> List[Tuple[str, str]]:
     """Find paragraphs containing case citations."""
-    case_pattern = re.compile(
-        r'(?:[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:vs?\.?|versus|v\/s)\s+(?:[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+&?\s*(?:Ors\.?|Others))?(?:\s*,\s*[0-9]{4})?(?:\s*\[[0-9]{4}\])?(?:\s+[A-Z]+\s+[A-Za-z]+)?)',
-        re.IGNORECASE
-    )
-        
     citations = []
     for para in paragraphs:
-        matches = case_pattern.findall(para)
+        if not VERSUS_PATTERN.search(para):
+            continue
+        matches = CASE_NAME_PATTERN.findall(para)
         if matches:
             case_names = list(set(matches))
             citations.append((case_names, para))
@@ -57,7 +57,8 @@ def extract_citations(pdf_path: str) -> dict:
 
         details = {
             "Citations Found (Program 5)": "Not found",
-            "Citation Details (Program 5)": "Not found"
+            "Citation Details (Program 5)": "Not found",
+            "Reporter Citations (Program 5)": join_citations(parse_citations(text)) or "Not found"
         }
 
         paragraphs = split_into_paragraphs(text)
@@ -90,6 +91,8 @@ def extract_citations(pdf_path: str) -> dict:
 
 # Export to Excel (append mode)
 def export_to_excel(data: dict, output_path: str):
+    import pandas as pd
+
     try:
         # Convert dictionary to DataFrame
         df = pd.DataFrame([data])
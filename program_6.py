@@ -1,18 +1,16 @@
-import pdfplumber
-import re
 import logging
+from section_index import build_section_index
+from statute_gazetteer import find_act_ids
+from page_text_store import get_page_texts
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 def extract_text_from_pdf(pdf_file):
     try:
         text = ""
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                if page_text:
-                    text += page_text + "\n"
+        for page_text in get_page_texts(pdf_file):
+            if page_text:
+                text += page_text + "\n"
         return text.strip()
     except Exception as e:
         logger.error(f"Error extracting text from PDF {pdf_file}: {str(e)}")
@@ -24,14 +22,22 @@ def extract_acts(pdf_path):
         if not text:
             return {"Error (Program 6)": "No text extracted from PDF"}
         
-        list_of_acts_pattern = r"(List of Acts[\s\S]*?)(?=\n(?:List of Keywords|Case Arising From|$))"
-        match = re.search(list_of_acts_pattern, text, re.IGNORECASE)
+        # List of Acts runs up to the next line starting with "List of Keywords" or "Case Arising From",
+        # or to the end of the text when neither follows
+        index = build_section_index(text)
+        acts_heading = index.find(("list_of_acts",))
+        end_heading = index.find(("list_of_keywords", "case_arising_from"), acts_heading.end, line_start=True) if acts_heading else None
         
-        if not match:
-            return {"List of Acts (Program 6)": "Not Found"}
+        if not acts_heading:
+            return {"List of Acts (Program 6)": "Not Found", "Act IDs (Program 6)": "Not Found"}
         
-        raw_list_of_acts = match.group(1).strip()
-        return {"List of Acts (Program 6)": raw_list_of_acts}
+        end = end_heading.start if end_heading else len(text)
+        raw_list_of_acts = text[acts_heading.start:end].strip()
+        act_ids = find_act_ids(raw_list_of_acts)
+        return {
+            "List of Acts (Program 6)": raw_list_of_acts,
+            "Act IDs (Program 6)": ", ".join(act_ids) if act_ids else "Not Found"
+        }
     except Exception as e:
         logger.error(f"Error in Program 6 for {pdf_path}: {str(e)}")
         return {"Error (Program 6)": str(e)}
\ No newline at end of file
@@ -1,20 +1,28 @@
-import pdfplumber
 import re
 import logging
+from section_index import build_section_index
+from page_text_store import get_page_texts
+from pipeline_logging import summarize
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# End of the background section: an all-caps line, a page number, the order footer or List of Acts
+SECTION_BOUNDARY = re.compile(
+    r"\n{1,2}(?:[A-Z\s]{10,}(?:\n|$)|[0-9]{1,4}$|[A-Z]$|Judgment / Order of the Supreme Court|List of Acts|$)",
+    re.IGNORECASE
+)
+
+# Optional jurisdiction line and one more line kept above the "Case Arising From" heading
+CASE_ARISING_PREFIX = re.compile(r"(?:[A-Z\s:]+JURISDICTION.*?\n)?(?:.*?\n)?\Z", re.IGNORECASE)
+PREFIX_LOOKBACK_LINES = 3
+
 # Extract text from the PDF
 def extract_text_from_pdf(pdf_path: str) -> str:
     try:
         text = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text() or ""
-                if page_text:
-                    text += page_text + "\n"
+        for page_text in get_page_texts(pdf_path):
+            if page_text:
+                text += page_text + "\n"
         if not text.strip():
             logger.warning(f"No text extracted from PDF {pdf_path}.")
             return ""
@@ -35,7 +43,7 @@ def extract_background(pdf_path: str) -> dict:
             "Case Arising From (Program 8)": "Not found"
         }
 
-        section_boundary = r"(?=\n{1,2}(?:[A-Z\s]{10,}(?:\n|$)|[0-9]{1,4}$|[A-Z]$|Judgment / Order of the Supreme Court|List of Acts|$))"
+        section_boundary = r"(?=" + SECTION_BOUNDARY.pattern + ")"
 
         case_keywords = [
             "From the Judgment and Order(?:s)?",
@@ -45,11 +53,17 @@ def extract_background(pdf_path: str) -> dict:
             "Arising From"
         ]
 
-        # Extract Case Arising From
-        case_arising_pattern = r"(?:(?:[A-Z\s:]+JURISDICTION.*?\n)?(?:.*?\n)?)(Case Arising From[\s\S]*?)" + section_boundary
-        match = re.search(case_arising_pattern, text, re.IGNORECASE)
-        if match:
-            details["Case Arising From (Program 8)"] = match.group(0).strip()
+        # Extract Case Arising From: the heading comes from the section index, the
+        # optional jurisdiction line(s) above it are matched within a few lines only
+        index = build_section_index(text)
+        heading = index.find(("case_arising_from",))
+        boundary = SECTION_BOUNDARY.search(text, heading.end) if heading else None
+        if boundary:
+            window_start = heading.start
+            for _ in range(PREFIX_LOOKBACK_LINES):
+                window_start = text.rfind("\n", 0, max(window_start - 1, 0)) + 1
+            prefix = CASE_ARISING_PREFIX.search(text, window_start, heading.start)
+            details["Case Arising From (Program 8)"] = text[prefix.start():boundary.start()].strip()
         else:
             fallback_pattern = r"(?:(?:[A-Z\s:]+JURISDICTION.*?\n)?(?:.*?\n)?)((?:" + "|".join(case_keywords) + r")[\s\S]*?)" + section_boundary
             matches = list(re.finditer(fallback_pattern, text, re.IGNORECASE))
@@ -64,7 +78,7 @@ def extract_background(pdf_path: str) -> dict:
                     best_match = matches[0]
                 details["Case Arising From (Program 8)"] = best_match.group(0).strip()
 
-        logger.info(f"Extracted background details from {pdf_path}: {details}")
+        logger.info(f"Extracted background details from {pdf_path}: {summarize(details)}")
         return details
     except Exception as e:
         logger.error(f"Error in Program 8 for {pdf_path}: {e}")
@@ -1,37 +1,35 @@
-import pdfplumber
 import re
 import logging
+from section_index import build_section_index
+from page_text_store import get_page_texts
+from citation_parser import join_citations, parse_citations
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Extract text from the PDF, skipping the top of the first page
 def extract_text_from_pdf(pdf_path: str) -> str:
     try:
         text = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                page_text = page.extract_text() or ""
-                if page_text:
-                    if page_num == 0:
-                        lines = page_text.split("\n")
-                        filtered_lines = []
-                        skip = True
-                        for line in lines:
-                            if re.search(r"\b(S\.C\.R\.|Supreme Court Reports|\[\d{4}\]\s+\d+\s+S\.C\.R\.|Digital Supreme Court Reports)\b", line, re.IGNORECASE) or \
-                               re.search(r"(Writ Petition|Civil Original Jurisdiction|Under Article \d+)", line, re.IGNORECASE) or \
-                               re.search(r"\b\d{4}\b.*(v\.|vs\.).*\b\d{4}\b", line, re.IGNORECASE) or \
-                               re.search(r"\b(JJ\.|J\.|Justices?|Judges?)\b", line, re.IGNORECASE) or \
-                               re.search(r"\b(Adv\.|Advocates?|Sr\. Advs\.|ASG|Dy\. Adv\. Gen\.)\b", line, re.IGNORECASE) or \
-                               re.search(r"\b(O R D E R|ORDER)\b", line, re.IGNORECASE):
-                                continue
-                            if not skip or not re.search(r"^\s*(\[\d{4}\]|\d+\s+S\.C\.R\.|Digital|Supreme|\b\d+\b|v\.|vs\.|Writ|Jurisdiction|Article|Adv\.|JJ\.|J\.)", line, re.IGNORECASE):
-                                skip = False
-                                filtered_lines.append(line)
-                        page_text = "\n".join(filtered_lines)
-                    if page_text.strip():
-                        text += page_text + "\n"
+        for page_num, page_text in enumerate(get_page_texts(pdf_path)):
+            if page_text:
+                if page_num == 0:
+                    lines = page_text.split("\n")
+                    filtered_lines = []
+                    skip = True
+                    for line in lines:
+                        if re.search(r"\b(S\.C\.R\.|Supreme Court Reports|\[\d{4}\]\s+\d+\s+S\.C\.R\.|Digital Supreme Court Reports)\b", line, re.IGNORECASE) or \
+                           re.search(r"(Writ Petition|Civil Original Jurisdiction|Under Article \d+)", line, re.IGNORECASE) or \
+                           re.search(r"\b\d{4}\b.*(v\.|vs\.).*\b\d{4}\b", line, re.IGNORECASE) or \
+                           re.search(r"\b(JJ\.|J\.|Justices?|Judges?)\b", line, re.IGNORECASE) or \
+                           re.search(r"\b(Adv\.|Advocates?|Sr\. Advs\.|ASG|Dy\. Adv\. Gen\.)\b", line, re.IGNORECASE) or \
+                           re.search(r"\b(O R D E R|ORDER)\b", line, re.IGNORECASE):
+                            continue
+                        if not skip or not re.search(r"^\s*(\[\d{4}\]|\d+\s+S\.C\.R\.|Digital|Supreme|\b\d+\b|v\.|vs\.|Writ|Jurisdiction|Article|Adv\.|JJ\.|J\.)", line, re.IGNORECASE):
+                            skip = False
+                            filtered_lines.append(line)
+                    page_text = "\n".join(filtered_lines)
+                if page_text.strip():
+                    text += page_text + "\n"
         if not text.strip():
             logger.warning(f"No text extracted from PDF {pdf_path}.")
             return ""
@@ -64,9 +62,8 @@ def extract_citations(pdf_path: str) -> dict:
 
         details = {"Precedent Citations (Program 9)": "Not found"}
 
-        # Patterns for titles and unwanted sections
+        # Patterns for unwanted sections
         patterns = {
-            "Citations": r"(List of Citations and Other References|Case Law Cited)\b",
             "Unwanted": r"(List of Acts|List of Keywords)\b"
         }
 
@@ -79,16 +76,15 @@ def extract_citations(pdf_path: str) -> dict:
             r"\(\d{4}\)",
         ]
 
-        # Step 1: Extract Citations using title
+        # Step 1: Extract Citations from the "List of Citations" / "Case Law Cited" section
         citations_paragraphs = []
-        for i, para in enumerate(paragraphs):
-            if re.search(patterns["Citations"], para, re.IGNORECASE):
-                for j in range(i + 1, len(paragraphs)):
-                    if not re.match(r'^\s*\d+\.\s+', paragraphs[j]) and not re.search(r'^(Judgment|Appearances|Facts|Background|Issue|List of Acts|List of Keywords)', paragraphs[j], re.IGNORECASE):
-                        citations_paragraphs.append(paragraphs[j])
-                    else:
-                        break
-                break
+        citations_section = build_section_index(text).section(("list_of_citations", "case_law_cited"))
+        if citations_section:
+            _, section_text = citations_section
+            for para in split_into_paragraphs(section_text):
+                if re.match(r'^\s*\d+\.\s+', para) or re.search(r'^(Judgment|Appearances|Facts|Background|Issue|List of Acts|List of Keywords)', para, re.IGNORECASE):
+                    break
+                citations_paragraphs.append(para)
 
         if citations_paragraphs:
             details["Precedent Citations (Program 9)"] = "\n".join(citations_paragraphs)
@@ -111,6 +107,12 @@ def extract_citations(pdf_path: str) -> dict:
                 details["Precedent Citations (Program 9)"] = "\n".join(best_candidates)
                 logger.info(f"Extracted keyword-based citations from {pdf_path}: {best_candidates[0][:100]}...")
 
+        # Reporter citations (SCR, SCC, AIR, INSC) within the extracted paragraphs
+        if details["Precedent Citations (Program 9)"] != "Not found":
+            details["Reporter Citations (Program 9)"] = join_citations(parse_citations(details["Precedent Citations (Program 9)"])) or "Not found"
+        else:
+            details["Reporter Citations (Program 9)"] = "Not found"
+
         return details
     except Exception as e:
         logger.error(f"Error in Program 9 for {pdf_path}: {e}")
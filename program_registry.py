@@ -0,0 +1,67 @@
+import importlib
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Extraction programs run by the pipeline: number -> (module, function, display name).
+# Modules are imported on first use, so tools that run a few programs skip
+# loading the others (and their models).
+PROGRAMS: Dict[int, Tuple[str, str, str]] = {
+    1: ("program_1", "extract_legal_details", "Legal Details"),
+    2: ("program_2", "extract_parties", "Parties"),
+    3: ("program_3", "extract_judges", "Judges"),
+    4: ("program_4", "extract_legal_references", "Legal References"),
+    5: ("program_5", "extract_citations", "Citations"),
+    6: ("program_6", "extract_acts", "Acts"),
+    7: ("program_7", "extract_citation", "Citation"),
+    8: ("program_8", "extract_background", "Background"),
+    9: ("program_9", "extract_citations", "Precedent Citations"),
+    10: ("program_10", "extract_crime_info", "Crime Info"),
+    11: ("program_11", "extract_case_result", "Case Outcomes"),
+    12: ("program_12", "extract_case_details", "Case Details"),
+}
+
+
+# PDF libraries each program reads page text with (see page_text_store), and the
+# programs that use the shared first-page header
+TEXT_ENGINES: Dict[int, Tuple[str, ...]] = {
+    1: ("pdfplumber", "pymupdf"),
+    4: ("pypdf2",),
+    7: (),
+}
+HEADER_PROGRAMS = {1, 2, 7}
+
+
+@lru_cache(maxsize=None)
+def load_extractor(number: int) -> Callable[[str], dict]:
+    module_name, function_name, _ = PROGRAMS[number]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+# Validated program numbers in pipeline order (all programs when none are given)
+def select_programs(numbers: Iterable[int] = None) -> List[int]:
+    selected = sorted(set(numbers)) if numbers else sorted(PROGRAMS)
+    unknown = [n for n in selected if n not in PROGRAMS]
+    if unknown:
+        raise ValueError(f"Unknown program number(s): {unknown}")
+    return selected
+
+
+# (number, extractor, display name) for the selected programs, in pipeline order
+def load_programs(numbers: Iterable[int] = None) -> List[Tuple[int, Callable[[str], dict], str]]:
+    return [(n, load_extractor(n), PROGRAMS[n][2]) for n in select_programs(numbers)]
+
+
+# Distinct text engines needed by the selected programs
+def text_engines(numbers: Iterable[int]) -> List[str]:
+    engines = []
+    for number in numbers:
+        for engine in TEXT_ENGINES.get(number, ("pdfplumber",)):
+            if engine not in engines:
+                engines.append(engine)
+    return engines
+
+
+# Does an output column belong to program `number`? Matches "X (Program 3)",
+# "Party Details (Program 2) - Filed By" and "Error (Program 3 - Judges)"
+def is_program_column(column: str, number: int) -> bool:
+    return f"(Program {number})" in column or f"(Program {number} - " in column
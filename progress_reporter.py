@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Completions the rolling rate (and so the ETA) is computed over
+RATE_WINDOW = 20
+
+
+def _format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60:02d}:{rest % 60:02d}"
+
+
+class ProgressReporter:
+    """Tracks a batch run: documents done, rolling docs/min, ETA, errors so far and what
+    each worker is running. Every `interval` seconds it redraws a status line on the
+    terminal (a plain log line when stderr is not a terminal) and rewrites `status_path`
+    as JSON for dashboards and scripts.
+
+    `worker_status` maps a worker id to (file, program, start time); the pipeline
+    processes write to it (see main_2.run_programs)."""
+
+    def __init__(self, total: int, status_path: Optional[str] = None, interval: float = 5.0,
+                 worker_status=None, extra: Optional[Callable[[], dict]] = None, stream=None):
+        self.total = total
+        self.status_path = status_path
+        self.interval = interval
+        self.worker_status = worker_status if worker_status is not None else {}
+        self.extra = extra
+        self.stream = stream or sys.stderr
+        self.done = 0
+        self.docs_with_errors = 0
+        self.errors_by_program: Dict[str, int] = {}
+        self.started = time.time()
+        self._completions = deque(maxlen=RATE_WINDOW)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+
+    def document_done(self, pdf_file: str, result: dict):
+        errors = [column for column in result if column.startswith("Error (")]
+        with self._lock:
+            self.done += 1
+            self._completions.append(time.time())
+            if errors:
+                self.docs_with_errors += 1
+            for column in errors:
+                self.errors_by_program[column] = self.errors_by_program.get(column, 0) + 1
+
+    def rate(self) -> float:
+        """Documents per minute over the last RATE_WINDOW completions (since the start
+        until the window fills)."""
+        with self._lock:
+            completions = list(self._completions)
+        if not completions:
+            return 0.0
+        now = time.time()
+        if len(completions) < RATE_WINDOW:
+            return 60 * len(completions) / max(now - self.started, 1e-6)
+        return 60 * (len(completions) - 1) / max(now - completions[0], 1e-6)
+
+    def status(self) -> dict:
+        now = time.time()
+        rate = self.rate()
+        remaining = self.total - self.done
+        eta_seconds = 60 * remaining / rate if rate else None
+        workers = {}
+        for worker, entry in list(self.worker_status.items()):
+            if entry:
+                pdf_file, program, started = entry
+                workers[str(worker)] = {"file": pdf_file, "program": program, "elapsed_s": round(now - started, 1)}
+        status = {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "updated": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)),
+            "elapsed_s": round(now - self.started, 1),
+            "total": self.total,
+            "done": self.done,
+            "remaining": remaining,
+            "docs_per_min": round(rate, 2),
+            "overall_docs_per_min": round(60 * self.done / max(now - self.started, 1e-6), 2),
+            "eta_s": round(eta_seconds) if eta_seconds is not None else None,
+            "eta": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now + eta_seconds)) if eta_seconds is not None else None,
+            "docs_with_errors": self.docs_with_errors,
+            "errors_by_program": dict(self.errors_by_program),
+            "workers": workers,
+        }
+        if self.extra:
+            try:
+                status.update(self.extra())
+            except Exception as e:
+                logger.warning(f"Progress status extra failed: {e}")
+        return status
+
+    def status_line(self, status: dict) -> str:
+        current = "; ".join(f"{w['file']} {w['program']} {w['elapsed_s']:.0f}s" for w in status["workers"].values())
+        return (f"{status['done']}/{status['total']} PDFs | {status['docs_per_min']:.1f} docs/min | "
+                f"ETA {_format_duration(status['eta_s'])} | errors {status['docs_with_errors']}"
+                + (f" | {current}" if current else ""))
+
+    def report(self, final: bool = False):
+        status = self.status()
+        line = self.status_line(status)
+        if self._tty:
+            width = shutil.get_terminal_size().columns - 1 if not final else len(line)
+            self.stream.write("\r\033[K" + line[:width] + ("\n" if final else ""))
+            self.stream.flush()
+        else:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+        if self.status_path:
+            tmp_path = f"{self.status_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(status, f, indent=2)
+            os.replace(tmp_path, self.status_path)
+        return status
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except Exception as e:
+                logger.warning(f"Progress report failed: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="progress-report", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        """Stop the periodic reports and write the final status."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        status = self.report(final=True)
+        logger.info(f"Progress: {self.status_line(status)}")
+        return status
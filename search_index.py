@@ -0,0 +1,181 @@
+import argparse
+import logging
+import math
+import re
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from batch_writer import overflow_column
+
+logger = logging.getLogger(__name__)
+
+# Indexed fields and the result columns they are filled from, in order of preference.
+# Long text may continue in overflow columns (Headnotes_1 (Program 1), ...) in workbooks.
+FIELDS: Dict[str, Tuple[str, ...]] = {
+    "title": ("Case Title (Program 1)", "Case Title (Program 2)"),
+    "citation": ("Citation (Program 7)", "Citation (Program 2)", "Reporter Citations (Program 5)"),
+    "headnotes": ("Headnotes (Program 1)",),
+    "conclusion": ("Conclusion (Program 12)",),
+    "case_result": ("case_result",),
+}
+
+# Programs whose columns feed the index
+INDEXED_PROGRAMS = {1, 2, 5, 7, 11, 12}
+
+# Placeholder values the programs write when nothing was found
+_EMPTY_VALUES = {"", "not found", "none", "nan"}
+
+# Documents are stored once in `documents`; `documents_fts` is an external-content
+# FTS5 index over them kept in sync by triggers; re-adding a file replaces its entry,
+# merged with the stored fields of programs the new row does not cover.
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    file_name TEXT NOT NULL UNIQUE,
+    {", ".join(f"{field} TEXT" for field in FIELDS)}
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    {", ".join(FIELDS)},
+    content='documents', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts (rowid, {", ".join(FIELDS)}) VALUES (new.id, {", ".join(f"new.{field}" for field in FIELDS)});
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, {", ".join(FIELDS)}) VALUES ('delete', old.id, {", ".join(f"old.{field}" for field in FIELDS)});
+END;
+"""
+
+
+# Text of one result column, with its overflow columns appended; None for placeholders
+def _column_text(row: dict, column: str) -> Optional[str]:
+    value = row.get(column)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    text = str(value)
+    part = 1
+    while isinstance(row.get(overflow_column(column, part)), str):
+        text += row[overflow_column(column, part)]
+        part += 1
+    return None if text.strip().lower() in _EMPTY_VALUES else text
+
+
+# Field values of one result row: the first column of each field that has text
+def document_fields(row: dict) -> Dict[str, Optional[str]]:
+    fields = {}
+    for field, columns in FIELDS.items():
+        fields[field] = next((text for text in (_column_text(row, c) for c in columns) if text), None)
+    return fields
+
+
+# Turn free text into an FTS5 query that matches all of its words
+def plain_query(text: str) -> str:
+    terms = re.findall(r"\w+", text)
+    return " ".join(f'"{term}"' for term in terms)
+
+
+class SearchIndex:
+    """Full-text index over the extracted headnotes, conclusions, case results, titles
+    and citations of the processed corpus, stored as a SQLite FTS5 table."""
+
+    def __init__(self, db_path: str):
+        # Written from the pipeline's output stage thread; only one thread uses it at a time
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_row(self, row: dict) -> bool:
+        """Index (or re-index) one result row. Fields whose columns are missing from the
+        row (their programs did not run) keep the stored text, so a run over some of
+        the programs does not drop the others; a field only some of its programs ran
+        for keeps the stored text when they found nothing. The entry is removed when
+        every field ends up empty."""
+        file_name = row["File Name"]
+        fields = document_fields(row)
+        with self.conn:
+            stored = self.conn.execute(
+                f"SELECT {', '.join(FIELDS)} FROM documents WHERE file_name = ?", (file_name,)
+            ).fetchone()
+            if stored:
+                for (field, columns), old in zip(FIELDS.items(), stored):
+                    if not all(column in row for column in columns):
+                        fields[field] = fields[field] or old
+                self.conn.execute("DELETE FROM documents WHERE file_name = ?", (file_name,))
+            if not any(fields.values()):
+                return False
+            self.conn.execute(
+                f"INSERT INTO documents (file_name, {', '.join(FIELDS)}) VALUES (?{', ?' * len(FIELDS)})",
+                [file_name, *fields.values()]
+            )
+        return True
+
+    def remove(self, file_name: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM documents WHERE file_name = ?", (file_name,))
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def search(self, query: str, field: Optional[str] = None, limit: int = 20,
+               raw: bool = False) -> List[Tuple[str, Optional[str], Optional[str], str]]:
+        """(file name, title, citation, snippet) of the best matching judgments, best first.
+        `query` is plain text (all words must match) unless `raw` is set, in which case it
+        is FTS5 syntax ("exact phrase", OR, NEAR(), prefix*, field:term). `field` limits
+        the match to one of FIELDS."""
+        match = query if raw else plain_query(query)
+        if not match:
+            return []
+        if field:
+            if field not in FIELDS:
+                raise ValueError(f"Unknown field {field!r}; expected one of {list(FIELDS)}")
+            match = f"{field} : ({match})"
+        try:
+            return self.conn.execute(
+                "SELECT d.file_name, d.title, d.citation, snippet(documents_fts, -1, '[', ']', '...', 12) "
+                "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                "WHERE documents_fts MATCH ? ORDER BY bm25(documents_fts) LIMIT ?",
+                (match, limit)
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query {match!r}: {e}")
+
+    def optimize(self):
+        """Merge the index segments; worth running after a large import."""
+        with self.conn:
+            self.conn.execute("INSERT INTO documents_fts (documents_fts) VALUES ('optimize')")
+
+    def add_workbook(self, xlsx_path: str) -> int:
+        """Index the rows of an existing batch workbook."""
+        import pandas as pd
+
+        df = pd.read_excel(xlsx_path)
+        return sum(self.add_row(row) for row in df.to_dict('records'))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Search the extracted headnotes, conclusions, case results, titles and citations")
+    parser.add_argument("db", help="search index database (search_index.sqlite in the output folder)")
+    parser.add_argument("query", nargs="?", help="words to search for")
+    parser.add_argument("--field", choices=list(FIELDS), help="search only this field")
+    parser.add_argument("--fts", action="store_true", help="treat the query as FTS5 syntax (phrases, OR, NEAR, prefix*)")
+    parser.add_argument("--limit", type=int, default=20, help="maximum results (default 20)")
+    parser.add_argument("--import-xlsx", nargs="+", default=[], help="add existing batch workbooks to the index")
+    args = parser.parse_args()
+
+    with SearchIndex(args.db) as index:
+        for path in args.import_xlsx:
+            print(f"Indexed {index.add_workbook(path)} rows from {path}")
+        if args.import_xlsx:
+            index.optimize()
+        if args.query:
+            for file_name, title, citation, snippet in index.search(args.query, args.field, args.limit, args.fts):
+                print(f"{file_name}\t{citation or ''}\t{title or ''}\n    {snippet}")
@@ -0,0 +1,97 @@
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+# Known section headings of SCR judgments. Every heading is found in a single
+# pass over the text; the extractors then slice their section out of the index
+# instead of running their own lazy DOTALL regexes over the whole document.
+SECTION_HEADINGS = {
+    "headnotes": r"Headnotes(?:†)?",
+    "issue_for_consideration": r"Issue\s+for\s+Consideration",
+    "case_law_cited": r"Case Law Cited",
+    "list_of_citations": r"List of Citations and Other References",
+    "list_of_acts": r"List of Acts",
+    "list_of_keywords": r"List of Keywords",
+    "case_arising_from": r"Case Arising From",
+}
+
+# Each heading optionally captures the line break that follows it, so callers
+# can tell a real heading ("Headnotes\n") from a mention in running text.
+_HEADING_PATTERN = re.compile(
+    "|".join(
+        rf"(?P<{kind}>{pattern}(?P<{kind}_break>\s*[\n\r]+)?)"
+        for kind, pattern in SECTION_HEADINGS.items()
+    ),
+    re.IGNORECASE
+)
+
+
+class SectionMarker(NamedTuple):
+    kind: str
+    start: int
+    end: int
+    content_start: int
+    heading: str
+    has_break: bool
+    at_line_start: bool
+
+
+class SectionIndex:
+    """Offsets of all known section headings in a document's text."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.markers: List[SectionMarker] = []
+        for match in _HEADING_PATTERN.finditer(text):
+            kind = match.lastgroup
+            start = match.start(kind)
+            line_break = match.group(f"{kind}_break")
+            self.markers.append(SectionMarker(
+                kind=kind,
+                start=start,
+                end=match.start(f"{kind}_break") if line_break is not None else match.end(kind),
+                content_start=match.end(kind),
+                heading=match.group(kind).strip(),
+                has_break=line_break is not None,
+                at_line_start=start > 0 and text[start - 1] == "\n"
+            ))
+
+    def find(self, kinds: Sequence[str], pos: int = 0, line_start: bool = False) -> Optional[SectionMarker]:
+        """Return the first marker of one of `kinds` starting at or after `pos`."""
+        for marker in self.markers:
+            if marker.start >= pos and marker.kind in kinds and (marker.at_line_start or not line_start):
+                return marker
+        return None
+
+    def sections(self, start_kinds: Sequence[str], end_kinds: Sequence[str], require_break: bool = True) -> List[Tuple[SectionMarker, str]]:
+        """Return every (heading, content) pair running from a heading of `start_kinds`
+        up to the next heading of `end_kinds`. Headings with no terminator are skipped."""
+        results = []
+        pos = 0
+        for marker in self.markers:
+            if marker.start < pos or marker.kind not in start_kinds:
+                continue
+            if require_break and not marker.has_break:
+                continue
+            terminator = self.find(end_kinds, marker.content_start)
+            if terminator is None:
+                break
+            results.append((marker, self.text[marker.content_start:terminator.start]))
+            pos = terminator.start
+        return results
+
+    def section(self, start_kinds: Sequence[str], end_kinds: Optional[Sequence[str]] = None, line_start: bool = False) -> Optional[Tuple[SectionMarker, str]]:
+        """Return the first section of `start_kinds`, ending at the next heading of
+        `end_kinds` (any known heading when omitted) or at the end of the text."""
+        marker = self.find(start_kinds)
+        if marker is None:
+            return None
+        terminator = self.find(end_kinds or list(SECTION_HEADINGS), marker.content_start, line_start=line_start)
+        end = terminator.start if terminator else len(self.text)
+        return marker, self.text[marker.content_start:end]
+
+
+# Build (or reuse) the section index for a document's text
+@lru_cache(maxsize=32)
+def build_section_index(text: str) -> SectionIndex:
+    return SectionIndex(text)
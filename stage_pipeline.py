@@ -0,0 +1,148 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+@dataclass
+class Stage:
+    """One step of the pipeline. `func` receives the document's context dict (the
+    outputs of earlier stages, keyed by stage name) and its return value is stored
+    under `name`. `depends_on` defaults to the previous stage."""
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    workers: int = 1
+    depends_on: Optional[Tuple[str, ...]] = None
+
+
+@dataclass
+class StageMetrics:
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    max_queue_depth: int = 0
+    input_queue: Optional[queue.Queue] = field(default=None, repr=False)
+
+    def snapshot(self) -> dict:
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "busy_s": round(self.busy_seconds, 3),
+            "avg_ms": round(1000 * self.busy_seconds / self.processed, 1) if self.processed else 0.0,
+            "queue_depth": self.input_queue.qsize() if self.input_queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+# Order stages so every stage comes after the ones it depends on
+def topological_order(stages: List[Stage]) -> List[Stage]:
+    by_name = {stage.name: stage for stage in stages}
+    dependencies = {}
+    for i, stage in enumerate(stages):
+        deps = stage.depends_on if stage.depends_on is not None else ((stages[i - 1].name,) if i else ())
+        unknown = [d for d in deps if d not in by_name]
+        if unknown:
+            raise ValueError(f"Stage {stage.name} depends on unknown stage(s) {unknown}")
+        dependencies[stage.name] = deps
+    ordered, done = [], set()
+    while len(ordered) < len(stages):
+        ready = [s for s in stages if s.name not in done and all(d in done for d in dependencies[s.name])]
+        if not ready:
+            raise ValueError("Stage dependencies contain a cycle")
+        for stage in ready:
+            ordered.append(stage)
+            done.add(stage.name)
+    return ordered
+
+
+class StagePipeline:
+    """Runs documents through a DAG of stages, one thread pool per stage with a
+    bounded queue in front of each. Consecutive documents overlap: while one is
+    being extracted the next is read and the previous one written. A full queue
+    blocks its producer, so at most about `queue_size` documents wait per stage."""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 2):
+        self.stages = topological_order(stages)
+        self.queue_size = queue_size
+        self.metrics: Dict[str, StageMetrics] = {stage.name: StageMetrics() for stage in self.stages}
+        self._lock = threading.Lock()
+
+    def _put(self, q: queue.Queue, item, stage_name: str):
+        q.put(item)
+        metrics = self.metrics[stage_name]
+        with self._lock:
+            metrics.max_queue_depth = max(metrics.max_queue_depth, q.qsize())
+
+    def _worker(self, stage: Stage, in_queue: queue.Queue, out_queue: Optional[queue.Queue],
+                next_stage: Optional[str], remaining: List[int]):
+        metrics = self.metrics[stage.name]
+        while True:
+            context = in_queue.get()
+            if context is _END:
+                # Let sibling workers see the end too; the last one forwards it
+                in_queue.put(_END)
+                with self._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and out_queue is not None:
+                    out_queue.put(_END)
+                return
+            start = time.perf_counter()
+            try:
+                context[stage.name] = stage.func(context)
+                failed = False
+            except Exception as e:
+                logger.error(f"Stage {stage.name} failed for {context.get('id')}: {e}")
+                context[stage.name] = None
+                failed = True
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                metrics.busy_seconds += elapsed
+                metrics.processed += 1
+                metrics.failed += failed
+            if out_queue is not None:
+                self._put(out_queue, context, next_stage)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Current per-stage counters, times and queue depths (safe to call while running)."""
+        with self._lock:
+            return {name: metrics.snapshot() for name, metrics in self.metrics.items()}
+
+    def run(self, contexts: Iterable[Dict[str, Any]], report_every: Optional[float] = None) -> Dict[str, dict]:
+        """Push every context dict through all stages; returns the final metrics."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        for i, stage in enumerate(self.stages):
+            self.metrics[stage.name].input_queue = queues[i]
+            out_queue = queues[i + 1] if i + 1 < len(self.stages) else None
+            next_stage = self.stages[i + 1].name if i + 1 < len(self.stages) else None
+            remaining = [stage.workers]
+            for w in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(stage, queues[i], out_queue, next_stage, remaining),
+                                          name=f"stage-{stage.name}-{w}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        stop_reporting = threading.Event()
+        if report_every:
+            def report():
+                while not stop_reporting.wait(report_every):
+                    logger.info(f"Pipeline stages: {self.snapshot()}")
+            threading.Thread(target=report, name="stage-report", daemon=True).start()
+
+        for context in contexts:
+            self._put(queues[0], context, self.stages[0].name)
+        queues[0].put(_END)
+        for thread in threads:
+            thread.join()
+        stop_reporting.set()
+        for q in queues:
+            while not q.empty():
+                q.get_nowait()
+        return self.snapshot()
@@ -0,0 +1,188 @@
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# Built-in gazetteer of Indian central and state enactments:
+# (act ID, canonical name, year, other surface forms, whether the name alone without the year is unambiguous)
+STATUTES = [
+    ("constitution-1950", "Constitution of India", 1950, ("Constitution", "Indian Constitution"), True),
+    ("ipc-1860", "Indian Penal Code", 1860, ("Penal Code", "IPC", "I.P.C."), True),
+    ("crpc-1973", "Code of Criminal Procedure", 1973, ("Criminal Procedure Code", "CrPC", "Cr.P.C.", "Cr. P.C."), True),
+    ("cpc-1908", "Code of Civil Procedure", 1908, ("Civil Procedure Code", "CPC", "C.P.C."), True),
+    ("evidence-1872", "Indian Evidence Act", 1872, ("Evidence Act",), True),
+    ("bns-2023", "Bharatiya Nyaya Sanhita", 2023, ("BNS",), True),
+    ("bnss-2023", "Bharatiya Nagarik Suraksha Sanhita", 2023, ("BNSS",), True),
+    ("bsa-2023", "Bharatiya Sakshya Adhiniyam", 2023, ("BSA",), True),
+    ("contract-1872", "Indian Contract Act", 1872, ("Contract Act",), True),
+    ("specific-relief-1963", "Specific Relief Act", 1963, (), True),
+    ("tpa-1882", "Transfer of Property Act", 1882, ("TPA", "T.P. Act"), True),
+    ("limitation-1963", "Limitation Act", 1963, (), True),
+    ("arbitration-1996", "Arbitration and Conciliation Act", 1996, (), True),
+    ("arbitration-1940", "Arbitration Act", 1940, (), True),
+    ("ndps-1985", "Narcotic Drugs and Psychotropic Substances Act", 1985, ("NDPS Act", "N.D.P.S. Act"), True),
+    ("pocso-2012", "Protection of Children from Sexual Offences Act", 2012, ("POCSO Act", "POCSO"), True),
+    ("pc-act-1988", "Prevention of Corruption Act", 1988, ("PC Act",), True),
+    ("pmla-2002", "Prevention of Money Laundering Act", 2002, ("PMLA",), True),
+    ("uapa-1967", "Unlawful Activities (Prevention) Act", 1967, ("UAPA",), True),
+    ("arms-1959", "Arms Act", 1959, (), True),
+    ("it-act-2000", "Information Technology Act", 2000, ("IT Act",), True),
+    ("income-tax-1961", "Income Tax Act", 1961, ("Income-tax Act",), True),
+    ("companies-2013", "Companies Act", 2013, (), True),
+    ("companies-1956", "Companies Act", 1956, (), False),
+    ("ibc-2016", "Insolvency and Bankruptcy Code", 2016, ("IBC",), True),
+    ("sarfaesi-2002", "Securitisation and Reconstruction of Financial Assets and Enforcement of Security Interest Act", 2002, ("SARFAESI Act", "SARFAESI"), True),
+    ("ni-act-1881", "Negotiable Instruments Act", 1881, ("NI Act", "N.I. Act"), True),
+    ("mv-act-1988", "Motor Vehicles Act", 1988, ("MV Act", "M.V. Act"), True),
+    ("land-acquisition-1894", "Land Acquisition Act", 1894, ("LA Act",), True),
+    ("rfctlarr-2013", "Right to Fair Compensation and Transparency in Land Acquisition, Rehabilitation and Resettlement Act", 2013, ("RFCTLARR Act",), True),
+    ("industrial-disputes-1947", "Industrial Disputes Act", 1947, ("ID Act", "I.D. Act"), True),
+    ("hindu-marriage-1955", "Hindu Marriage Act", 1955, (), True),
+    ("hindu-succession-1956", "Hindu Succession Act", 1956, (), True),
+    ("hindu-adoptions-1956", "Hindu Adoptions and Maintenance Act", 1956, (), True),
+    ("special-marriage-1954", "Special Marriage Act", 1954, (), True),
+    ("succession-1925", "Indian Succession Act", 1925, ("Succession Act",), True),
+    ("guardians-wards-1890", "Guardians and Wards Act", 1890, (), True),
+    ("dowry-prohibition-1961", "Dowry Prohibition Act", 1961, (), True),
+    ("pwdva-2005", "Protection of Women from Domestic Violence Act", 2005, ("Domestic Violence Act", "DV Act"), True),
+    ("sc-st-atrocities-1989", "Scheduled Castes and the Scheduled Tribes (Prevention of Atrocities) Act", 1989, ("SC/ST Act", "SC and ST Act", "Atrocities Act"), True),
+    ("juvenile-justice-2015", "Juvenile Justice (Care and Protection of Children) Act", 2015, ("JJ Act",), True),
+    ("juvenile-justice-2000", "Juvenile Justice (Care and Protection of Children) Act", 2000, (), False),
+    ("general-clauses-1897", "General Clauses Act", 1897, (), True),
+    ("rp-act-1951", "Representation of the People Act", 1951, ("RP Act", "R.P. Act"), True),
+    ("rti-2005", "Right to Information Act", 2005, ("RTI Act",), True),
+    ("consumer-protection-2019", "Consumer Protection Act", 2019, (), True),
+    ("consumer-protection-1986", "Consumer Protection Act", 1986, (), False),
+    ("cgst-2017", "Central Goods and Services Tax Act", 2017, ("CGST Act",), True),
+    ("customs-1962", "Customs Act", 1962, (), True),
+    ("central-excise-1944", "Central Excise Act", 1944, (), True),
+    ("electricity-2003", "Electricity Act", 2003, (), True),
+    ("environment-protection-1986", "Environment (Protection) Act", 1986, ("Environment Protection Act",), True),
+    ("forest-conservation-1980", "Forest (Conservation) Act", 1980, (), True),
+    ("indian-forest-1927", "Indian Forest Act", 1927, (), True),
+    ("wildlife-protection-1972", "Wild Life (Protection) Act", 1972, ("Wildlife Protection Act",), True),
+    ("competition-2002", "Competition Act", 2002, (), True),
+    ("registration-1908", "Registration Act", 1908, (), True),
+    ("stamp-1899", "Indian Stamp Act", 1899, ("Stamp Act",), True),
+    ("partnership-1932", "Indian Partnership Act", 1932, ("Partnership Act",), True),
+    ("sale-of-goods-1930", "Sale of Goods Act", 1930, (), True),
+    ("trade-marks-1999", "Trade Marks Act", 1999, (), True),
+    ("copyright-1957", "Copyright Act", 1957, (), True),
+    ("patents-1970", "Patents Act", 1970, (), True),
+    ("rera-2016", "Real Estate (Regulation and Development) Act", 2016, ("RERA",), True),
+    ("service-tax-finance-1994", "Finance Act", 1994, (), False),
+    ("epf-1952", "Employees' Provident Funds and Miscellaneous Provisions Act", 1952, ("EPF Act",), True),
+    ("workmen-compensation-1923", "Workmen's Compensation Act", 1923, ("Employees' Compensation Act",), True),
+    ("payment-of-gratuity-1972", "Payment of Gratuity Act", 1972, (), True),
+    ("contempt-of-courts-1971", "Contempt of Courts Act", 1971, (), True),
+    ("army-act-1950", "Army Act", 1950, (), True),
+    ("mcoca-1999", "Maharashtra Control of Organised Crime Act", 1999, ("MCOCA",), True),
+    ("maharashtra-rent-1999", "Maharashtra Rent Control Act", 1999, (), True),
+    ("delhi-rent-1958", "Delhi Rent Control Act", 1958, (), True),
+    ("up-gangsters-1986", "Uttar Pradesh Gangsters and Anti-Social Activities (Prevention) Act", 1986, ("U.P. Gangsters Act", "UP Gangsters Act"), True),
+    ("up-zamindari-1950", "Uttar Pradesh Zamindari Abolition and Land Reforms Act", 1950, (), True),
+    ("karnataka-land-revenue-1964", "Karnataka Land Revenue Act", 1964, (), True),
+    ("karnataka-land-reforms-1961", "Karnataka Land Reforms Act", 1961, (), True),
+    ("kerala-land-reforms-1963", "Kerala Land Reforms Act", 1963, (), True),
+    ("tn-buildings-lease-1960", "Tamil Nadu Buildings (Lease and Rent Control) Act", 1960, (), True),
+    ("wb-land-reforms-1955", "West Bengal Land Reforms Act", 1955, (), True),
+    ("bombay-stamp-1958", "Bombay Stamp Act", 1958, (), True),
+    ("mp-land-revenue-1959", "Madhya Pradesh Land Revenue Code", 1959, ("M.P. Land Revenue Code",), True),
+    ("punjab-land-revenue-1887", "Punjab Land Revenue Act", 1887, (), True),
+    ("rajasthan-tenancy-1955", "Rajasthan Tenancy Act", 1955, (), True),
+    ("gujarat-tenancy-1948", "Bombay Tenancy and Agricultural Lands Act", 1948, (), True),
+]
+
+# Short forms shared with enactments outside this list (other constitutions, the Ranbir
+# Penal Code, the Bankers' Books Evidence Act, state Stamp Acts, the Limited Liability
+# Partnership Act, the Hindu Succession Act, earlier Limitation, Income Tax, Customs and
+# Electricity Acts, "IT Act" for the Income Tax Act): they only match with their year.
+# Forms that two statutes in the list share (Companies Act, Consumer Protection Act, ...)
+# also need the year; see get_automaton.
+YEAR_REQUIRED = {
+    "Constitution", "Penal Code", "Evidence Act", "Contract Act", "Stamp Act", "Partnership Act",
+    "Succession Act", "Limitation Act", "Arbitration Act", "Income Tax Act", "Income-tax Act",
+    "Customs Act", "Electricity Act", "IT Act",
+}
+
+CANONICAL_NAMES: Dict[str, str] = {act_id: f"{name}, {year}" for act_id, name, year, _, _ in STATUTES}
+
+
+# Lowercase word tokens; punctuation and spacing differences between surface forms disappear
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+class StatuteAutomaton:
+    """Aho-Corasick automaton over word tokens mapping statute mentions to act IDs."""
+
+    def __init__(self, aliases: Dict[Tuple[str, ...], str]):
+        self.children: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[Tuple[int, str]]] = [[]]
+        for tokens, act_id in aliases.items():
+            state = 0
+            for token in tokens:
+                if token not in self.children[state]:
+                    self.children.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                    self.children[state][token] = len(self.children) - 1
+                state = self.children[state][token]
+            self.outputs[state].append((len(tokens), act_id))
+
+        # Breadth-first failure links; depth-one states fail back to the root
+        queue = deque(self.children[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self.children[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and token not in self.children[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.children[fallback].get(token, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    # All (start token, end token, act ID) matches, one pass over the tokens
+    def search(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        matches = []
+        state = 0
+        for i, token in enumerate(tokens):
+            while state and token not in self.children[state]:
+                state = self.fail[state]
+            state = self.children[state].get(token, 0)
+            for length, act_id in self.outputs[state]:
+                matches.append((i - length + 1, i + 1, act_id))
+        return matches
+
+
+@lru_cache(maxsize=1)
+def get_automaton() -> StatuteAutomaton:
+    aliases = {}
+    bare_forms: Dict[Tuple[str, ...], set] = {}
+    for act_id, name, year, other_forms, bare in STATUTES:
+        for form in (name,) + tuple(other_forms):
+            aliases[tuple(tokenize(f"{form}, {year}"))] = act_id
+            bare_forms.setdefault(tuple(tokenize(form)), set()).add(act_id)
+    year_required = {tuple(tokenize(form)) for form in YEAR_REQUIRED}
+    bare_ids = {act_id for act_id, _, _, _, bare in STATUTES if bare}
+    # A form without its year only counts when exactly one statute uses it
+    for tokens, act_ids in bare_forms.items():
+        if len(act_ids) == 1 and tokens not in year_required and act_ids <= bare_ids:
+            aliases.setdefault(tokens, next(iter(act_ids)))
+    return StatuteAutomaton(aliases)
+
+
+# Canonical act IDs mentioned in the text, in order of first mention; overlapping
+# mentions resolve to the leftmost-longest one ("Penal Code, 1860" inside "Indian Penal Code, 1860")
+def find_act_ids(text: str) -> List[str]:
+    matches = get_automaton().search(tokenize(text))
+    matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+    act_ids = {}
+    covered_until = 0
+    for start, end, act_id in matches:
+        if start < covered_until:
+            continue
+        act_ids.setdefault(act_id, None)
+        covered_until = end
+    return list(act_ids)
@@ -0,0 +1,133 @@
+import logging
+import threading
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How often the controller samples the system and may change the worker count
+CONTROL_SECONDS = 10
+# Grow while system CPU use is below this and at least GROW_MEMORY of memory is available
+CPU_TARGET = 0.85
+GROW_MEMORY = 0.25
+# Shrink when available memory falls below this share, before the machine starts to swap
+MIN_MEMORY = 0.10
+# Checks to wait after a shrink before growing again
+GROW_COOLDOWN = 3
+
+
+# (idle, total) CPU jiffies over all cores, from the first line of /proc/stat
+def read_cpu_times(path: str = "/proc/stat") -> Tuple[int, int]:
+    with open(path, 'r') as f:
+        values = [int(value) for value in f.readline().split()[1:]]
+    idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+    return idle, sum(values[:8])  # guest time is already counted in user
+
+
+# Share of the interval the CPUs were busy, between two read_cpu_times samples
+def cpu_utilisation(previous: Tuple[int, int], current: Tuple[int, int]) -> float:
+    idle, total = current[0] - previous[0], current[1] - previous[1]
+    return 1.0 - idle / total if total > 0 else 0.0
+
+
+# MemAvailable / MemTotal from /proc/meminfo
+def available_memory(path: str = "/proc/meminfo") -> float:
+    fields = {}
+    with open(path, 'r') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            fields[name] = int(value.split()[0])
+    return fields["MemAvailable"] / fields["MemTotal"]
+
+
+class ConcurrencyLimiter:
+    """A semaphore whose limit can change while it is held: lowering it lets running
+    documents finish and holds back new ones until the count is below the new limit."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._condition = threading.Condition()
+
+    def set_limit(self, limit: int):
+        with self._condition:
+            self.limit = limit
+            self._condition.notify_all()
+
+    def __enter__(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+
+class WorkerController:
+    """Adjusts a ConcurrencyLimiter between `min_workers` and `max_workers` from system
+    CPU and memory headroom read from /proc (Linux). Every CONTROL_SECONDS it removes a
+    worker when available memory is below MIN_MEMORY, and adds one when CPU use is
+    below CPU_TARGET, memory is above GROW_MEMORY and every current worker is busy.
+    One step per check, so each change can be seen in the log before the next."""
+
+    def __init__(self, limiter: ConcurrencyLimiter, min_workers: int, max_workers: int,
+                 interval: float = CONTROL_SECONDS):
+        self.limiter = limiter
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.interval = interval
+        self.adjustments = 0
+        self._cooldown = 0
+        self._previous_cpu: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self, cpu: float, memory: float) -> int:
+        """Decide the worker count for the measured CPU use and available memory share."""
+        workers = self.limiter.limit
+        target = workers
+        if memory < MIN_MEMORY and workers > self.min_workers:
+            target = workers - 1
+            self._cooldown = GROW_COOLDOWN
+        elif self._cooldown:
+            self._cooldown -= 1
+        elif (cpu < CPU_TARGET and memory >= GROW_MEMORY and workers < self.max_workers
+              and self.limiter.active >= workers):
+            target = workers + 1
+        if target != workers:
+            self.limiter.set_limit(target)
+            self.adjustments += 1
+            logger.info(f"Workers {workers} -> {target}: CPU {cpu:.0%}, memory available {memory:.0%}, "
+                        f"{self.limiter.active} busy")
+        return target
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                current = read_cpu_times()
+                cpu = cpu_utilisation(self._previous_cpu, current) if self._previous_cpu else None
+                self._previous_cpu = current
+                if cpu is not None:
+                    self.check(cpu, available_memory())
+            except Exception as e:
+                logger.warning(f"Worker controller check failed: {e}")
+
+    def start(self):
+        """Start checking in a background thread; without /proc the count stays fixed."""
+        try:
+            self._previous_cpu = read_cpu_times()
+            available_memory()
+        except (OSError, KeyError, ValueError, IndexError) as e:
+            logger.warning(f"Adaptive workers disabled, no /proc CPU and memory figures: {e}")
+            return self
+        logger.info(f"Adaptive workers between {self.min_workers} and {self.max_workers}, starting at {self.limiter.limit}")
+        self._thread = threading.Thread(target=self._run, name="worker-controller", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()